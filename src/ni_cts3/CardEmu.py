@@ -1,9 +1,9 @@
 from warnings import warn
-from ctypes import (c_bool, c_uint8, c_uint16, c_int32, c_uint32, c_double,
-                    byref)
-from typing import Dict, Union, Optional
+from ctypes import (c_bool, c_char, c_uint8, c_uint16, c_int32, c_uint32,
+                    c_double, Array, byref)
+from typing import Dict, Union, Optional, overload
 from enum import IntEnum, unique
-from . import _MPuLib, _check_limits
+from . import _MPuLib, _check_limits, _rx_buffer
 from .Nfc import (TechnologyType, DataRate, NfcTrigger, VicinityDataRate,
                   VicinitySubCarrier)
 from .MPException import CTS3Exception
@@ -248,23 +248,44 @@ def MPC_WaitTypeAActiveState(atqa: bytes, uid: bytes, sak: Union[bytes, int],
                                          c_uint32(timeout_ms)))
 
 
+@overload
 def MPC_WaitAndGetFrame(
         timeout: float) -> Dict[str, Union[bytes, TechnologyType]]:
+    ...
+
+
+@overload
+def MPC_WaitAndGetFrame(
+    timeout: float, *, rx_buffer: Union[bytearray, memoryview]
+) -> Dict[str, Union[memoryview, TechnologyType]]:
+    ...
+
+
+def MPC_WaitAndGetFrame(  # type: ignore[no-untyped-def]
+        timeout, *, rx_buffer=None):
     """
     Waits for an incoming frame
 
     Args:
         timeout: Reception timeout in s
+        rx_buffer: Writable buffer receiving the frame
+        (None to allocate a new frame)
 
     Returns:
         Dictionary made of:
-        - 'rx_frame': Received frame (bytes)
+        - 'rx_frame': Received frame (bytes, or memoryview of rx_buffer)
         - 'rx_type': Received frame type (TechnologyType)
     """
     timeout_ms = round(timeout * 1e3)
     _check_limits(c_uint32, timeout_ms, 'timeout')
-    max_size = 8192
-    data = bytes(max_size)
+    data: Union[bytes, 'Array[c_char]']
+    if rx_buffer is None:
+        max_size = 8192
+        data = bytes(max_size)
+    else:
+        rx_view, data = _rx_buffer(rx_buffer, 1, 'rx_buffer')
+        max_size = len(rx_view)
+        _check_limits(c_uint32, max_size, 'rx_buffer')
     card_type = c_int32()
     bytes_number = c_uint32()
     CTS3Exception._check_error(
@@ -272,7 +293,8 @@ def MPC_WaitAndGetFrame(
                                     byref(card_type), data, c_uint32(max_size),
                                     byref(bytes_number)))
     return {
-        'rx_frame': data[:bytes_number.value],
+        'rx_frame': (data[:bytes_number.value] if rx_buffer is None else
+                     rx_view[:bytes_number.value]),
         'rx_type': TechnologyType(card_type.value)
     }
 
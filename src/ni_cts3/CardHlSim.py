@@ -1,8 +1,8 @@
-from ctypes import (c_bool, c_uint8, c_uint16, c_uint32, c_int32, Structure,
-                    byref)
-from typing import Optional, Union, Dict
+from ctypes import (c_bool, c_char, c_uint8, c_uint16, c_uint32, c_int32,
+                    Structure, Array, byref)
+from typing import Optional, Union, Dict, cast, overload
 from enum import IntEnum, IntFlag, unique
-from . import _MPuLib, _check_limits
+from . import _MPuLib, _check_limits, _OutputBuffer, _rx_buffer
 from .Nfc import (VicinityDataRate, VicinitySubCarrier, NfcMode,
                   TechnologyType, NfcDataRate, NfcUnit, _unit_autoselect)
 from .CardEmu import CardEmulationMode
@@ -439,31 +439,51 @@ def MPC_GetBufferedRawFrame(
         - 'rx_type': Received frame type (TechnologyType)
     """
     max_size = 65538
-    data = bytes(max_size)
     rx_size = c_uint32()
     rx_type = c_int32()
-    ret = _MPuLib.MPC_GetBufferedRawFrame(c_uint8(0), byref(rx_type), data,
-                                          byref(rx_size))
-    if ret == CTS3ErrorCode.ERRSIM_NO_FRAME_AVAILABLE.value:
-        return None
-    CTS3Exception._check_error(ret)
-    return {
-        'rx_frame': data[:rx_size.value],
-        'rx_type': TechnologyType(rx_type.value)
-    }
+    with _OutputBuffer(max_size) as data:
+        ret = _MPuLib.MPC_GetBufferedRawFrame(c_uint8(0), byref(rx_type), data,
+                                              byref(rx_size))
+        if ret == CTS3ErrorCode.ERRSIM_NO_FRAME_AVAILABLE.value:
+            return None
+        CTS3Exception._check_error(ret)
+        return {
+            'rx_frame': cast(bytes, data[:rx_size.value]),
+            'rx_type': TechnologyType(rx_type.value)
+        }
 
 
+@overload
 def MPC_GetRawFrame() -> Optional[Dict[str, Union[bytes, TechnologyType]]]:
+    ...
+
+
+@overload
+def MPC_GetRawFrame(
+    *, rx_buffer: Union[bytearray, memoryview]
+) -> Optional[Dict[str, Union[memoryview, TechnologyType]]]:
+    ...
+
+
+def MPC_GetRawFrame(*, rx_buffer=None):  # type: ignore[no-untyped-def]
     """
     Peeks last received frame
 
+    Args:
+        rx_buffer: Writable buffer of at least 65538 bytes receiving the frame
+        (None to allocate a new frame)
+
     Returns:
         Dictionary made of:
-        - 'rx_frame': Last received frame (bytes)
+        - 'rx_frame': Last received frame (bytes, or memoryview of rx_buffer)
         - 'rx_type': Received frame type (TechnologyType)
     """
     max_size = 65538
-    data = bytes(max_size)
+    data: Union[bytes, 'Array[c_char]']
+    if rx_buffer is None:
+        data = bytes(max_size)
+    else:
+        rx_view, data = _rx_buffer(rx_buffer, max_size, 'rx_buffer')
     rx_size = c_uint32()
     rx_type = c_int32()
     ret = _MPuLib.MPC_GetRawFrame(c_uint8(0), byref(rx_type), data,
@@ -472,7 +492,8 @@ def MPC_GetRawFrame() -> Optional[Dict[str, Union[bytes, TechnologyType]]]:
         return None
     CTS3Exception._check_error(ret)
     return {
-        'rx_frame': data[:rx_size.value],
+        'rx_frame': (data[:rx_size.value]
+                     if rx_buffer is None else rx_view[:rx_size.value]),
         'rx_type': TechnologyType(rx_type.value)
     }
 
@@ -505,18 +526,18 @@ def MPS_GetAPDU2() -> Optional[Dict[str, bytes]]:
         - 'data': APDU data (bytes)
     """
     header = _APDUHeader()
-    data = bytes(0xFFFF)
     length = c_uint32()
     apdu_len = c_uint32()
-    ret = _MPuLib.MPS_GetAPDU2(c_uint8(0), byref(header), data, byref(length),
-                               byref(apdu_len))
-    if ret == CTS3ErrorCode.ERRSIM_NO_APDU_AVAILABLE.value:
-        return None
-    CTS3Exception._check_error(ret)
-    return {
-        'header': header.get_bytes()[:apdu_len.value - length.value],
-        'data': data[:length.value]
-    }
+    with _OutputBuffer(0xFFFF) as data:
+        ret = _MPuLib.MPS_GetAPDU2(c_uint8(0), byref(header), data,
+                                   byref(length), byref(apdu_len))
+        if ret == CTS3ErrorCode.ERRSIM_NO_APDU_AVAILABLE.value:
+            return None
+        CTS3Exception._check_error(ret)
+        return {
+            'header': header.get_bytes()[:apdu_len.value - length.value],
+            'data': cast(bytes, data[:length.value])
+        }
 
 
 class _TypeNFC_ATR_REQ(Structure):
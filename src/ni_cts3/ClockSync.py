@@ -0,0 +1,248 @@
+from collections import deque
+from threading import Thread, Event, Lock
+from time import time
+from typing import Any, Callable, Deque, Optional, Tuple, NamedTuple
+from . import MPS_GetTickCount
+from .MPStatus import CTS3ErrorCode
+from .MPException import CTS3Exception
+from .Device import Device
+
+# Device tick counter period in s (32-bit ms counter)
+_tick_period = 0x100000000 / 1e3
+
+
+class ClockSample(NamedTuple):
+    """
+    Device clock sample
+
+    Attributes:
+        host_time: Host time at the middle of the request in s
+        device_time: Device time since startup in s (unwrapped)
+        rtt: Request round-trip time in s
+    """
+    host_time: float
+    device_time: float
+    rtt: float
+
+
+class ClockSync:
+    """
+    Device to host clock correlation
+
+    MPS_GetTickCount is sampled periodically and the device time is modeled
+    as an offset plus a drift against host time. The fit is weighted by the
+    inverse square of each sample round-trip time, which averages out the
+    1 ms tick resolution over the sampling window.
+
+    MPS_GetTickCount returns 0 when the link fails, so null readings and
+    readings slower than max_rtt are discarded. A device restart is only
+    declared once two consecutive readings went backwards.
+
+    Attributes:
+        device: Device session used to sample the clock
+        interval: Sampling period in s
+        burst: Number of requests per sample (lowest round-trip time is kept)
+        max_rtt: Maximum round-trip time of a valid reading in s
+        clock: Host clock
+        error: Error raised by last background sample
+    """
+
+    def __init__(self,
+                 device: Device,
+                 interval: float = 1.0,
+                 window: int = 600,
+                 burst: int = 5,
+                 clock: Callable[[], float] = time,
+                 max_rtt: float = 0.1):
+        """
+        Inits ClockSync
+
+        Args:
+            device: Device session used to sample the clock
+            interval: Sampling period in s
+            window: Number of samples used by the fit
+            burst: Number of requests per sample
+            clock: Host clock
+            max_rtt: Maximum round-trip time of a valid reading in s
+        """
+        if not isinstance(device, Device):
+            raise TypeError('device must be an instance of Device')
+        if window < 2:
+            raise ValueError('window must be greater than 1')
+        if burst < 1:
+            raise ValueError('burst must be positive')
+        self.device = device
+        self.interval = interval
+        self.burst = burst
+        self.clock = clock
+        self.max_rtt = max_rtt
+        self.error: Optional[CTS3Exception] = None
+        self._samples: Deque[ClockSample] = deque(maxlen=window)
+        self._lock = Lock()
+        # Last raw tick count and number of wraparounds
+        self._last_ticks: Optional[int] = None
+        self._wraps = 0
+        # First backwards tick count, pending confirmation of a restart
+        self._restart: Optional[int] = None
+        # (host reference, device reference, device/host rate)
+        self._model: Optional[Tuple[float, float, float]] = None
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def __enter__(self) -> 'ClockSync':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    @property
+    def ready(self) -> bool:
+        """True if at least one sample has been taken"""
+        return self._model is not None
+
+    @property
+    def drift(self) -> float:
+        """Device clock drift relative to host clock in ppm"""
+        model = self._model
+        return 0.0 if model is None else (model[2] - 1.0) * 1e6
+
+    @property
+    def samples(self) -> Tuple[ClockSample, ...]:
+        """Samples used by the fit"""
+        with self._lock:
+            return tuple(self._samples)
+
+    def start(self) -> None:
+        """Starts periodic sampling in background"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name='CTS3 clock sync',
+                              daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops periodic sampling"""
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+
+    def sample(self) -> ClockSample:
+        """
+        Samples device clock and updates the model
+
+        Returns:
+            Sample with the lowest round-trip time of the burst
+        """
+        best: ClockSample = self.device.call(self._measure)
+        with self._lock:
+            self._samples.append(best)
+            self._fit()
+        return best
+
+    def device_to_host(self, device_time: float) -> float:
+        """
+        Converts a device time to host time
+
+        Args:
+            device_time: Device time since startup in s
+            (as returned by MPS_GetTickCount)
+
+        Returns:
+            Host time
+        """
+        model = self._model
+        if model is None:
+            raise RuntimeError('no clock sample available')
+        host_ref, device_ref, rate = model
+        # The wrapped counter value closest to the reference is used
+        wraps = round((device_ref - device_time) / _tick_period)
+        device_time += wraps * _tick_period
+        return host_ref + (device_time - device_ref) / rate
+
+    def host_to_device(self, host_time: Optional[float] = None) -> float:
+        """
+        Converts a host time to device time
+
+        Args:
+            host_time: Host time (current time if None)
+
+        Returns:
+            Device time since startup in s (as returned by MPS_GetTickCount)
+        """
+        model = self._model
+        if model is None:
+            raise RuntimeError('no clock sample available')
+        if host_time is None:
+            host_time = self.clock()
+        host_ref, device_ref, rate = model
+        return (device_ref + (host_time - host_ref) * rate) % _tick_period
+
+    def _measure(self) -> ClockSample:
+        """Reads device clock (called from the device thread)"""
+        best: Optional[Tuple[float, float, int]] = None
+        for _ in range(self.burst):
+            t0 = self.clock()
+            t = round(MPS_GetTickCount() * 1e3)
+            t1 = self.clock()
+            # Null tick count is returned on link error
+            if t == 0 or t1 - t0 > self.max_rtt:
+                continue
+            if best is None or t1 - t0 < best[1] - best[0]:
+                best = t0, t1, t
+        if best is None:
+            raise CTS3Exception(CTS3ErrorCode.DLLCOMERROR)
+        before, after, ticks = best
+        with self._lock:
+            last_ticks = self._last_ticks
+            if last_ticks is not None and ticks < last_ticks:
+                if last_ticks - ticks > 0x80000000:
+                    self._wraps += 1
+                elif self._restart is None or ticks < self._restart:
+                    # Wait for next reading to tell a restart from a glitch
+                    self._restart = ticks
+                    raise CTS3Exception('device clock went backwards')
+                else:
+                    # Device has been restarted
+                    self._wraps = 0
+                    self._samples.clear()
+            self._restart = None
+            self._last_ticks = ticks
+            wraps = self._wraps
+        # Counter is truncated to the ms: half a tick is added
+        device_time = (ticks + 0.5) / 1e3 + wraps * _tick_period
+        return ClockSample((before + after) / 2, device_time, after - before)
+
+    def _fit(self) -> None:
+        """Fits offset and drift on samples (called with lock held)"""
+        samples = self._samples
+        weights = [1.0 / max(s.rtt, 1e-6)**2 for s in samples]
+        total = sum(weights)
+        host_ref = sum(w * s.host_time for w, s in zip(weights,
+                                                       samples)) / total
+        device_ref = sum(w * s.device_time for w, s in zip(weights,
+                                                           samples)) / total
+        sxx = 0.0
+        sxy = 0.0
+        for w, s in zip(weights, samples):
+            x = s.host_time - host_ref
+            sxx += w * x * x
+            sxy += w * x * (s.device_time - device_ref)
+        # Drift cannot be estimated until samples span more than one tick
+        rate = sxy / sxx if sxx > 0 and len(samples) > 1 else 1.0
+        if not 0.99 < rate < 1.01:
+            rate = 1.0
+        self._model = (host_ref, device_ref, rate)
+
+    def _run(self) -> None:
+        """Periodic sampling thread"""
+        while not self._stop.is_set():
+            try:
+                self.sample()
+                self.error = None
+            except CTS3Exception as ex:
+                self.error = ex
+            self._stop.wait(self.interval)
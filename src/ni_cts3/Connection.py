@@ -0,0 +1,219 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Thread, Event, Lock
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Union, cast
+from warnings import warn
+from . import (OpenCommunication, CloseCommunication, SetDLLParameter,
+               GetDLLParameter, LibraryParameter, MPOS_OpenResource,
+               MPOS_CloseResource, MPOS_GetResourceID, ResourceType,
+               ResourceBlockingMode)
+from .MPException import CTS3Exception
+from .Device import Device
+
+
+class ConnectionManager:
+    """
+    Device connection supervisor
+
+    The link is probed periodically while the device is idle. On failure,
+    the communication channel is reopened with exponential backoff and
+    the resources opened through the manager are opened again. A probe
+    which does not return in time leaves the device thread blocked, so
+    the session is moved to a new device thread before reconnecting.
+
+    Attributes:
+        device: Supervised device session
+        probe_interval: Delay between two probes in s
+        probe_timeout: Maximum probe duration in s
+        connect_timeout: TCP connection timeout used to reconnect in s
+        max_backoff: Maximum delay between two reconnection attempts in s
+        on_disconnect: Callback called when link failure is detected
+        on_reconnect: Callback called with recovery duration in s
+        when link is restored
+    """
+
+    def __init__(self,
+                 device: Device,
+                 probe_interval: float = 1.0,
+                 probe_timeout: float = 0.5,
+                 connect_timeout: float = 0.5,
+                 max_backoff: float = 5.0,
+                 probe: Callable[[], Any] = MPOS_GetResourceID):
+        """
+        Inits ConnectionManager
+
+        Args:
+            device: Device session to supervise
+            probe_interval: Delay between two probes in s
+            probe_timeout: Maximum probe duration in s
+            connect_timeout: TCP connection timeout used to reconnect in s
+            max_backoff: Maximum delay between two reconnection attempts in s
+            probe: Cheap function raising CTS3Exception when link is down
+        """
+        if not isinstance(device, Device):
+            raise TypeError('device must be an instance of Device')
+        self.device = device
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.connect_timeout = connect_timeout
+        self.max_backoff = max_backoff
+        self.on_disconnect: Optional[Callable[['ConnectionManager'],
+                                              None]] = None
+        self.on_reconnect: Optional[Callable[['ConnectionManager', float],
+                                             None]] = None
+        self._probe = probe
+        self._resources: Dict[Optional[int], ResourceBlockingMode] = {}
+        self._resources_lock = Lock()
+        self._healthy = False
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._failures: List[float] = []
+
+    def __enter__(self) -> 'ConnectionManager':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    @property
+    def healthy(self) -> bool:
+        """True if last probe succeeded"""
+        return self._healthy
+
+    @property
+    def failures(self) -> List[float]:
+        """Recovery duration in s of each detected link failure"""
+        return list(self._failures)
+
+    def start(self) -> None:
+        """Opens the device if needed and starts link supervision"""
+        if self._thread is not None:
+            return
+        self.device.open()
+        self._healthy = True
+        self._stop.clear()
+        self._thread = Thread(target=self._run,
+                              name=f'CTS3 {self.device.host} monitor',
+                              daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops link supervision (device is left open)"""
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+
+    def open_resource(
+        self,
+        resource_id: Union[int, ResourceType, None] = None,
+        blocking_mode: ResourceBlockingMode = ResourceBlockingMode.NOT_BLOCKING
+    ) -> None:
+        """
+        Opens a resource which is opened again after reconnection
+
+        Args:
+            resource_id: Resource identifier
+            blocking_mode: Resource allocation mode
+        """
+        self.device.call(MPOS_OpenResource, resource_id, blocking_mode)
+        with self._resources_lock:
+            self._resources[resource_id] = blocking_mode
+
+    def close_resource(
+            self, resource_id: Union[int, ResourceType, None] = None) -> None:
+        """
+        Closes a resource opened with open_resource
+
+        Args:
+            resource_id: Resource identifier
+        """
+        with self._resources_lock:
+            if resource_id is None:
+                self._resources.clear()
+            else:
+                self._resources.pop(resource_id, None)
+        self.device.call(MPOS_CloseResource, resource_id)
+
+    def check(self) -> bool:
+        """
+        Probes the link immediately
+
+        Returns:
+            True if link is up
+        """
+        with self.device.lock:
+            try:
+                self.device.submit(self._probe).result(self.probe_timeout)
+                self._healthy = True
+            except CTS3Exception:
+                self._healthy = False
+            except FutureTimeoutError:
+                # Do not queue next calls behind the blocked probe
+                self.device._renew_thread()
+                self._healthy = False
+        return self._healthy
+
+    def reconnect(self) -> float:
+        """
+        Reopens the communication channel until it succeeds
+
+        Returns:
+            Recovery duration in s
+        """
+        start = monotonic()
+        backoff = min(0.05, self.max_backoff)
+        with self.device.lock:
+            while True:
+                try:
+                    self.device.call(self._reopen)
+                    break
+                except CTS3Exception:
+                    if self._stop.wait(backoff):
+                        raise
+                    backoff = min(2 * backoff, self.max_backoff)
+        self._healthy = True
+        return monotonic() - start
+
+    def _reopen(self) -> None:
+        """Reopens channel and resources from the device thread"""
+        CloseCommunication()
+        timeout = cast(float, GetDLLParameter(
+            LibraryParameter.TCP_CONNECT_TIMEOUT))
+        SetDLLParameter(LibraryParameter.TCP_CONNECT_TIMEOUT,
+                        self.connect_timeout)
+        try:
+            OpenCommunication(self.device.host, self.device.log)
+        finally:
+            SetDLLParameter(LibraryParameter.TCP_CONNECT_TIMEOUT, timeout)
+        with self._resources_lock:
+            resources = list(self._resources.items())
+        for resource_id, blocking_mode in resources:
+            MPOS_OpenResource(resource_id, blocking_mode)
+
+    def _run(self) -> None:
+        """Link supervision thread"""
+        while not self._stop.wait(self.probe_interval):
+            if not self.device.lock.acquire(blocking=False):
+                # Device is busy: a failure will be reported by the call
+                continue
+            try:
+                if self.check():
+                    continue
+                if self.on_disconnect is not None:
+                    self.on_disconnect(self)
+                try:
+                    duration = self.reconnect()
+                except CTS3Exception:
+                    break  # Supervision stopped while reconnecting
+                self._failures.append(duration)
+                if self.on_reconnect is not None:
+                    self.on_reconnect(self, duration)
+            except Exception as ex:
+                # Supervision goes on after an unexpected error
+                warn(f'{self.device!r} supervision error: {ex!r}',
+                     RuntimeWarning)
+            finally:
+                self.device.lock.release()
@@ -0,0 +1,213 @@
+from concurrent.futures import (Future, ThreadPoolExecutor,
+                                TimeoutError as FutureTimeoutError)
+from functools import partial
+from importlib import import_module
+from ipaddress import IPv4Address
+from threading import Lock, RLock, get_ident
+from typing import Any, Callable, Optional, Union
+from warnings import warn
+from . import OpenCommunication, CloseCommunication, AbortCoupler
+from .MPException import CTS3Exception
+
+# Modules searched when a wrapper is called by name on a Device
+_wrapper_modules = ('ni_cts3', 'ni_cts3.Nfc', 'ni_cts3.CardEmu',
+                    'ni_cts3.CardEmuSeq', 'ni_cts3.CardHlSim',
+                    'ni_cts3.TermEmuSeq', 'ni_cts3.Measurement',
+                    'ni_cts3.Daq', 'ni_cts3.Wlc')
+
+
+def _find_wrapper(name: str) -> Callable[..., Any]:
+    """
+    Looks up a wrapper function by name
+
+    Args:
+        name: Wrapper function name
+
+    Returns:
+        Wrapper function
+    """
+    for module_name in _wrapper_modules:
+        func = getattr(import_module(module_name), name, None)
+        if callable(func):
+            return func  # type: ignore[no-any-return]
+    raise AttributeError(f"no wrapper function named '{name}'")
+
+
+class Device:
+    """
+    CTS3 session
+
+    Every call is executed on a thread dedicated to the device, which owns
+    the communication channel (MPuLib must be used in MULTITHREADED mode).
+    Several devices can then be driven in parallel from one process.
+
+    Calls issued with call hold lock, so that a sequence of calls run
+    under `with device.lock:` is not interleaved with calls from other
+    threads. Helpers running a device in background must therefore use
+    call (from a worker thread if needed) rather than submit.
+
+    Attributes:
+        host: Host name or IP address
+        log: True to output firmware log to stderr
+        lock: Lock serializing call sequences issued from several threads
+    """
+
+    def __init__(self, host: Union[str, IPv4Address], log: bool = False):
+        """
+        Inits Device
+
+        Args:
+            host: Host name or IP address
+            log: True to output firmware log to stderr
+        """
+        if not isinstance(host, (str, IPv4Address)):
+            raise TypeError('host must be an instance of str or IPv4Address')
+        self.host = str(host)
+        self.log = log
+        self.lock = RLock()
+        # Protects executor replacement, not held while waiting the device
+        self._state_lock = Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread_id = 0
+
+    def __repr__(self) -> str:
+        return f"Device('{self.host}')"
+
+    def __enter__(self) -> 'Device':
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        """
+        Gets a wrapper function bound to the device
+
+        Args:
+            name: Wrapper function name (e.g. 'MPC_SelectType')
+
+        Returns:
+            Function calling the wrapper on the device
+        """
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return partial(self.call, _find_wrapper(name))
+
+    @property
+    def is_open(self) -> bool:
+        """True if the communication channel is open"""
+        return self._executor is not None
+
+    def open(self) -> None:
+        """Opens the communication channel"""
+        with self.lock:
+            if self._executor is not None:
+                return
+            executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f'CTS3 {self.host}')
+            try:
+                executor.submit(self._open_channel).result()
+            except BaseException:
+                executor.shutdown()
+                raise
+            with self._state_lock:
+                self._executor = executor
+
+    def _open_channel(self) -> None:
+        """Opens the communication channel from the device thread"""
+        self._thread_id = get_ident()
+        OpenCommunication(self.host, self.log)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        Closes the communication channel
+
+        Calls already queued are executed before the channel is closed. If
+        the device thread does not close the channel in time, the current
+        command is aborted and the thread is abandoned.
+
+        Args:
+            timeout: Maximum time to wait for the device thread in s
+            (None to wait indefinitely)
+        """
+        # A call sequence holding lock must not prevent closing
+        with self._state_lock:
+            executor = self._executor
+            if executor is None:
+                return
+            self._executor = None
+            future = executor.submit(CloseCommunication)
+        executor.shutdown(wait=False)
+        try:
+            future.result(timeout)
+        except FutureTimeoutError:
+            try:
+                self.abort()
+            except CTS3Exception:
+                pass
+            warn(f'{self!r} thread did not close the communication channel '
+                 f'within {timeout} s', RuntimeWarning)
+
+    def _renew_thread(self) -> None:
+        """
+        Moves the session to a new device thread
+
+        Used when the device thread is blocked in a call which does not
+        return. The blocked thread closes its channel once released, the
+        channel of the new thread must be opened again.
+        """
+        with self._state_lock:
+            previous = self._executor
+            if previous is None:
+                return
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f'CTS3 {self.host}')
+            self._thread_id = self._executor.submit(get_ident).result()
+            previous.submit(CloseCommunication)
+            previous.shutdown(wait=False)
+
+    def submit(self, func: Callable[..., Any], *args: Any,
+               **kwargs: Any) -> 'Future[Any]':
+        """
+        Schedules a call on the device thread
+
+        Calls are executed in submission order, but lock is not taken:
+        submitted calls may run between the calls of a sequence issued by
+        another thread. Use call unless the caller already holds lock.
+
+        Args:
+            func: Function to call (e.g. MPC_SelectType)
+            *args: Function positional arguments
+            **kwargs: Function keyword arguments
+
+        Returns:
+            Call result future
+        """
+        executor = self._executor
+        if executor is None:
+            raise RuntimeError(f'{self!r} is not open')
+        return executor.submit(func, *args, **kwargs)
+
+    def call(self, func: Callable[..., Any], *args: Any,
+             **kwargs: Any) -> Any:
+        """
+        Calls a function on the device thread and waits for its result
+
+        Args:
+            func: Function to call (e.g. MPC_SelectType)
+            *args: Function positional arguments
+            **kwargs: Function keyword arguments
+
+        Returns:
+            Function result
+        """
+        if self.is_open and get_ident() == self._thread_id:
+            # Nested call from a function already running on the device
+            return func(*args, **kwargs)
+        with self.lock:
+            return self.submit(func, *args, **kwargs).result()
+
+    def abort(self) -> None:
+        """Aborts the command currently executed by the device"""
+        AbortCoupler(self.host)
@@ -0,0 +1,291 @@
+import json
+import os
+from ipaddress import IPv4Address
+from pathlib import Path
+from threading import Thread, Condition, Event
+from time import time
+from typing import Callable, Dict, List, Optional, Union, NamedTuple
+from . import TCPEnumerateDevices, USBEnumerateDevices
+
+
+class DiscoveredDevice(NamedTuple):
+    """
+    Detected device
+
+    Attributes:
+        serial: Device serial number
+        address: Device IP address (None for USB link)
+        link: Link type ('TCP' or 'USB')
+        timestamp: Detection time (as returned by time.time)
+    """
+    serial: str
+    address: Optional[IPv4Address]
+    link: str
+    timestamp: float
+
+
+def _tcp_devices() -> List[DiscoveredDevice]:
+    """Enumerates devices over Ethernet"""
+    now = time()
+    return [DiscoveredDevice(serial, address, 'TCP', now)
+            for serial, address in TCPEnumerateDevices().items()]
+
+
+def _usb_devices() -> List[DiscoveredDevice]:
+    """Enumerates devices over USB link"""
+    now = time()
+    return [DiscoveredDevice(serial, None, 'USB', now)
+            for serial in USBEnumerateDevices()]
+
+
+class DeviceDiscovery:
+    """
+    Cached device discovery
+
+    Ethernet and USB enumerations run concurrently (MPuLib must be used in
+    MULTITHREADED mode), and each one updates the cache as soon as it
+    completes. Cached results are used until they are older than the TTL,
+    and may be persisted to a file to be reused by the next process. A
+    refresh in which an enumeration failed does not renew the cache age.
+
+    A device detected over both links is reported with its Ethernet entry,
+    which holds its IP address.
+
+    Attributes:
+        ttl: Cached results lifetime in s
+        cache_path: Path to cache file (None to disable persistence)
+        last_error: Error raised by last failed enumeration
+    """
+
+    def __init__(self,
+                 ttl: float = 60.0,
+                 tcp: bool = True,
+                 usb: bool = True,
+                 cache_path: Union[str, Path, None] = None):
+        """
+        Inits DeviceDiscovery
+
+        Args:
+            ttl: Cached results lifetime in s
+            tcp: True to detect devices over Ethernet
+            usb: True to detect devices over USB link
+            cache_path: Path to cache file (None to disable persistence)
+        """
+        self.ttl = ttl
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.last_error: Optional[Exception] = None
+        self._enumerators: Dict[str, Callable[[], List[DiscoveredDevice]]] = {}
+        if tcp:
+            self._enumerators['TCP'] = _tcp_devices
+        if usb:
+            self._enumerators['USB'] = _usb_devices
+        # Devices detected by each link, and merged view
+        self._links: Dict[str, Dict[str, DiscoveredDevice]] = {}
+        self._entries: Dict[str, DiscoveredDevice] = {}
+        self._last_refresh = 0.0
+        self._pending = 0
+        self._failed = False
+        self._generation = 0
+        self._cond = Condition()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._load()
+
+    @property
+    def age(self) -> float:
+        """Time elapsed since last successful enumeration in s"""
+        return time() - self._last_refresh
+
+    @property
+    def refreshing(self) -> bool:
+        """True if an enumeration is in progress"""
+        return self._pending > 0
+
+    def devices(self,
+                max_age: Optional[float] = None,
+                wait: bool = True) -> Dict[str, DiscoveredDevice]:
+        """
+        Gets detected devices
+
+        Args:
+            max_age: Maximum cached results age in s (ttl if None)
+            wait: False to return cached results immediately
+            while a refresh runs in background
+
+        Returns:
+            Dictionary made of:
+            - Device serial number (str): Device (DiscoveredDevice)
+        """
+        if self.age > (self.ttl if max_age is None else max_age):
+            self.refresh(wait)
+        return dict(self._entries)
+
+    def resolve(self,
+                serial: str,
+                timeout: Optional[float] = None) -> Optional[DiscoveredDevice]:
+        """
+        Gets a device from its serial number
+
+        A cached entry is returned immediately. Otherwise the method returns
+        as soon as the device is reported by any enumeration.
+
+        Args:
+            serial: Device serial number
+            timeout: Maximum waiting time in s (None to wait for
+            enumeration completion)
+
+        Returns:
+            Device, or None if not detected
+        """
+        entry = self._entries.get(serial)
+        if entry is not None:
+            if time() - entry.timestamp > self.ttl:
+                self.refresh(wait=False)
+            return entry
+        with self._cond:
+            generation = self._start()
+            self._cond.wait_for(
+                lambda: serial in self._entries or
+                self._generation != generation or not self._pending,
+                timeout)
+            return self._entries.get(serial)
+
+    def refresh(self, wait: bool = True) -> None:
+        """
+        Enumerates devices
+
+        Args:
+            wait: False to return without waiting for enumeration completion
+        """
+        with self._cond:
+            generation = self._start()
+            if wait:
+                self._cond.wait_for(
+                    lambda: self._generation != generation or
+                    not self._pending)
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """
+        Starts periodic refresh in background
+
+        Args:
+            interval: Refresh period in s (half ttl if None)
+        """
+        if self._thread is not None:
+            return
+        period = self.ttl / 2 if interval is None else interval
+        self._stop.clear()
+        self._thread = Thread(target=self._run, args=(period, ),
+                              name='CTS3 discovery', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops periodic refresh"""
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+
+    def _run(self, period: float) -> None:
+        """Periodic refresh thread"""
+        while True:
+            self.refresh(wait=True)
+            if self._stop.wait(period):
+                break
+
+    def _start(self) -> int:
+        """
+        Starts enumerations if none is in progress (called with lock held)
+
+        Returns:
+            Enumerations generation
+        """
+        if not self._pending and self._enumerators:
+            self._generation += 1
+            self._pending = len(self._enumerators)
+            self._failed = False
+            for link, enumerate_func in self._enumerators.items():
+                Thread(target=self._enumerate,
+                       args=(link, enumerate_func, self._generation),
+                       name=f'CTS3 {link} discovery',
+                       daemon=True).start()
+        return self._generation
+
+    def _enumerate(self, link: str,
+                   enumerate_func: Callable[[], List[DiscoveredDevice]],
+                   generation: int) -> None:
+        """Runs one enumeration and merges its result into cache"""
+        try:
+            found: Optional[List[DiscoveredDevice]] = enumerate_func()
+        except Exception as ex:
+            found = None
+            self.last_error = ex
+        with self._cond:
+            try:
+                if found is None:
+                    self._failed = True
+                else:
+                    self._links[link] = {entry.serial: entry
+                                         for entry in found}
+                    self._merge()
+            finally:
+                # Waiters are released whatever the enumeration outcome
+                self._pending -= 1
+                if not self._pending:
+                    if not self._failed:
+                        self._last_refresh = time()
+                    self._save()
+                self._cond.notify_all()
+
+    def _merge(self) -> None:
+        """Merges devices of all links (called with lock held)"""
+        entries: Dict[str, DiscoveredDevice] = {}
+        for link_entries in self._links.values():
+            for serial, entry in link_entries.items():
+                current = entries.get(serial)
+                # Entry with an IP address is preferred whatever the order
+                if current is None or (current.address is None and
+                                       entry.address is not None):
+                    entries[serial] = entry
+        self._entries = entries
+
+    def _load(self) -> None:
+        """Loads cached results from file"""
+        if self.cache_path is None:
+            return
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                cache = json.load(f)
+            links: Dict[str, Dict[str, DiscoveredDevice]] = {}
+            for serial, address, link, timestamp in cache['devices']:
+                links.setdefault(link, {})[serial] = DiscoveredDevice(
+                    serial, IPv4Address(address) if address else None, link,
+                    timestamp)
+            last_refresh = float(cache['timestamp'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return  # Missing or invalid cache file
+        with self._cond:
+            self._links = links
+            self._merge()
+            self._last_refresh = last_refresh
+
+    def _save(self) -> None:
+        """Saves cached results to file"""
+        if self.cache_path is None:
+            return
+        cache = {
+            'timestamp': self._last_refresh,
+            'devices': [[entry.serial,
+                         str(entry.address) if entry.address else None,
+                         entry.link, entry.timestamp]
+                        for entries in self._links.values()
+                        for entry in entries.values()]
+        }
+        temp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
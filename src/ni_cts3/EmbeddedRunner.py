@@ -0,0 +1,245 @@
+from asyncio import AbstractEventLoop, Future, get_event_loop
+from collections import deque
+from threading import Condition, Thread
+from typing import Any, Callable, Deque, Iterator, List, Optional, Tuple
+from . import (LaunchEmbeddedScript, StartEmbeddedApplication,
+               EmbeddedScriptMode, _current_host)
+from .Device import Device
+
+
+def _wake(future: 'Future[None]') -> None:
+    """Wakes up an asynchronous reader"""
+    if not future.done():
+        future.set_result(None)
+
+
+class EmbeddedRun:
+    """
+    Embedded script or application output stream
+
+    Output chunks are queued by the library callback without blocking, then
+    read with iteration or asynchronous iteration. Iteration ends when the
+    script terminates or when the run is closed.
+
+    The callback must not block the device, so no backpressure is applied:
+    at most capacity chunks are kept, and the oldest chunks are dropped
+    when the output is not read fast enough.
+
+    Attributes:
+        host: Host of the device running the script
+        command: Script command or application path
+        return_code: Script return code (None while running)
+        error: Error raised by the launching function
+        dropped: Number of chunks dropped because the queue was full
+    """
+
+    def __init__(self, host: str, command: str, capacity: int = 10000):
+        """
+        Inits EmbeddedRun
+
+        Args:
+            host: Host of the device running the script
+            command: Script command or application path
+            capacity: Maximum number of queued output chunks
+        """
+        if capacity < 1:
+            raise ValueError('capacity must be positive')
+        self.host = host
+        self.command = command
+        self.return_code: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.dropped = 0
+        self._chunks: Deque[bytes] = deque(maxlen=capacity)
+        self._done = False
+        self._cond = Condition()
+        self._waiters: List[Tuple[AbstractEventLoop, 'Future[None]']] = []
+
+    def __repr__(self) -> str:
+        return f"EmbeddedRun('{self.host}', '{self.command}')"
+
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Iterates over output chunks
+
+        Returns:
+            Iterator over output chunks
+        """
+        while True:
+            chunk = self.read()
+            if chunk is None:
+                return
+            yield chunk
+
+    def __aiter__(self) -> 'EmbeddedRun':
+        return self
+
+    async def __anext__(self) -> bytes:
+        loop = get_event_loop()
+        while True:
+            with self._cond:
+                if self._chunks:
+                    return self._chunks.popleft()
+                if self._done:
+                    if self.error is not None:
+                        raise self.error
+                    raise StopAsyncIteration
+                future: 'Future[None]' = loop.create_future()
+                waiter = (loop, future)
+                self._waiters.append(waiter)
+            try:
+                await future
+            finally:
+                with self._cond:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    @property
+    def done(self) -> bool:
+        """True if the script has terminated or the run has been closed"""
+        return self._done
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Reads next output chunk
+
+        Args:
+            timeout: Maximum waiting time in s (None to wait indefinitely)
+
+        Returns:
+            Output chunk, or None if the run is over or timeout expired
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._chunks or self._done, timeout)
+            if self._chunks:
+                return self._chunks.popleft()
+            if self._done and self.error is not None:
+                raise self.error
+            return None
+
+    def output(self) -> bytes:
+        """
+        Waits for termination and gets the whole output
+
+        Returns:
+            Concatenated output chunks
+        """
+        return b''.join(self)
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Waits for termination
+
+        Args:
+            timeout: Maximum waiting time in s (None to wait indefinitely)
+
+        Returns:
+            Script return code (None if still running)
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._done, timeout)
+            if self._done and self.error is not None:
+                raise self.error
+            return self.return_code
+
+    def close(self) -> None:
+        """Stops output iteration (the script is not stopped)"""
+        self._finish(None, None)
+
+    def _callback(self, data: bytes) -> int:
+        """Library output callback (must not block)"""
+        with self._cond:
+            if not self._done:
+                if len(self._chunks) == self._chunks.maxlen:
+                    self.dropped += 1
+                self._chunks.append(data if data else b'')
+                self._notify()
+        return 0
+
+    def _finish(self, return_code: Optional[int],
+                error: Optional[BaseException]) -> None:
+        """Marks the run as terminated"""
+        with self._cond:
+            if self._done:
+                return
+            self.return_code = return_code
+            self.error = error
+            self._done = True
+            self._notify()
+
+    def _notify(self) -> None:
+        """Wakes up readers (called with lock held)"""
+        self._cond.notify_all()
+        for loop, future in self._waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        self._waiters.clear()
+
+
+def _launch(run: EmbeddedRun, func: Callable[..., Any], *args: Any) -> None:
+    """Runs a launching function and reports its termination"""
+    try:
+        run._finish(func(*args), None)
+    except BaseException as ex:
+        run._finish(None, ex)
+
+
+def run_embedded_script(script_command: str,
+                        timeout: float,
+                        device: Device,
+                        capacity: int = 10000) -> EmbeddedRun:
+    """
+    Launches an embedded script and streams its output
+
+    The script runs on the device thread, which owns the communication
+    channel (MPuLib must be used in MULTITHREADED mode), once the device
+    lock is available. Scripts on different devices run concurrently.
+
+    Args:
+        script_command: Script to run
+        timeout: Execution timeout in s
+        device: Device session running the script
+        capacity: Maximum number of queued output chunks
+
+    Returns:
+        Script output stream
+    """
+    if not isinstance(device, Device):
+        raise TypeError('device must be an instance of Device')
+    run = EmbeddedRun(device.host, script_command, capacity)
+    # Waits for the device lock without blocking the caller
+    Thread(target=_launch,
+           args=(run, device.call, LaunchEmbeddedScript, script_command,
+                 timeout, EmbeddedScriptMode.EMBEDDED_WAIT_TERMINATION,
+                 run._callback),
+           name=f'CTS3 {device.host} script',
+           daemon=True).start()
+    return run
+
+
+def start_embedded_application(application_path: str,
+                               args: str,
+                               device: Optional[Device] = None,
+                               capacity: int = 10000) -> EmbeddedRun:
+    """
+    Launches an embedded C program and streams its output
+
+    Iteration over the output lasts until the run is closed.
+
+    Args:
+        application_path: Embedded C program path
+        args: Program parameters
+        device: Device session starting the program
+        (current communication channel if None)
+        capacity: Maximum number of queued output chunks
+
+    Returns:
+        Program output stream
+    """
+    if device is None:
+        host = _current_host()
+        run = EmbeddedRun(host, application_path, capacity)
+        StartEmbeddedApplication(application_path, args, run._callback)
+    else:
+        run = EmbeddedRun(device.host, application_path, capacity)
+        device.call(StartEmbeddedApplication, application_path, args,
+                    run._callback)
+    return run
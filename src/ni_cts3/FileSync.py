@@ -0,0 +1,192 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from pathlib import Path
+from time import time
+from typing import (Any, Dict, Iterable, List, Mapping, Optional, Union,
+                    NamedTuple)
+from . import UploadClientFile, MPS_GetTickCount
+from .Device import Device
+
+# Device tick counter period in s (32-bit ms counter)
+_tick_period = 0x100000000 / 1e3
+
+# Maximum boot time estimation error in s
+_boot_time_tolerance = 10.0
+
+
+class SyncResult(NamedTuple):
+    """
+    Files synchronization result on one device
+
+    Attributes:
+        host: Device host name or IP address
+        uploaded: Uploaded remote file names
+        skipped: Unchanged remote file names
+        errors: Remote file names which failed to upload
+        and the related error
+        error: Error which stopped the synchronization (None if completed)
+    """
+    host: str
+    uploaded: List[str]
+    skipped: List[str]
+    errors: Dict[str, Exception]
+    error: Optional[Exception] = None
+
+
+def _file_hash(path: Path) -> str:
+    """
+    Computes file content hash
+
+    Args:
+        path: Path to file
+
+    Returns:
+        SHA-256 hexadecimal digest
+    """
+    digest = sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(0x100000), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_path(manifest_dir: Path, host: str) -> Path:
+    """Gets device manifest path"""
+    return manifest_dir / f"{host.replace(':', '_')}.json"
+
+
+def _load_manifest(path: Path) -> Dict[str, Any]:
+    """Loads device manifest (empty if missing or invalid)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if isinstance(manifest, dict) and isinstance(
+                manifest.get('files'), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'boot_time': None, 'files': {}}
+
+
+def _save_manifest(path: Path, manifest: Dict[str, Any]) -> None:
+    """Saves device manifest"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(temp_path, path)
+
+
+def _same_boot(previous: Optional[float], current: float) -> bool:
+    """
+    Checks if two boot time estimations refer to the same device boot
+
+    Args:
+        previous: Boot time stored in manifest
+        current: Current boot time estimation
+
+    Returns:
+        True if device has not been rebooted
+    """
+    if previous is None:
+        return False
+    # Tick counter wraps around every 49.7 days
+    delta = (current - previous) % _tick_period
+    return min(delta, _tick_period - delta) < _boot_time_tolerance
+
+
+def _sync_device(host: str, files: Dict[str, Path], hashes: Dict[str, str],
+                 manifest_dir: Path, force: bool) -> SyncResult:
+    """Uploads changed files (called from the device thread)"""
+    result = SyncResult(host, [], [], {})
+    path = _manifest_path(manifest_dir, host)
+    try:
+        manifest = _load_manifest(path)
+        boot_time = time() - MPS_GetTickCount()
+    except Exception as ex:
+        return result._replace(error=ex)
+    known = manifest['files']
+    if force or not _same_boot(manifest.get('boot_time'), boot_time):
+        # '/home/default/tmp' content is lost on reboot
+        known = {}
+    try:
+        for remote_name, local_path in files.items():
+            if known.get(remote_name) == hashes[remote_name]:
+                result.skipped.append(remote_name)
+                continue
+            try:
+                UploadClientFile(local_path, remote_name)
+            except Exception as ex:
+                known.pop(remote_name, None)
+                result.errors[remote_name] = ex
+            else:
+                known[remote_name] = hashes[remote_name]
+                result.uploaded.append(remote_name)
+    finally:
+        try:
+            _save_manifest(path, {'boot_time': boot_time, 'files': known})
+        except Exception as ex:
+            # Files are uploaded again next time
+            result = result._replace(error=ex)
+    return result
+
+
+def sync_files(devices: Iterable[Device],
+               files: Union[Iterable[Union[str, Path]],
+                            Mapping[str, Union[str, Path]]],
+               manifest_dir: Union[str, Path, None] = None,
+               force: bool = False) -> Dict[str, SyncResult]:
+    """
+    Uploads files to the CTS3 '/home/default/tmp' directory of several devices
+
+    A manifest of uploaded files content hash is kept for each device, and
+    files already present on the device are not uploaded again. Devices are
+    processed concurrently, each one under its lock. Errors are reported
+    in the result of the device which raised them.
+
+    Args:
+        devices: Opened devices
+        files: Paths to files to upload (uploaded with their own name),
+        or dictionary of remote file name: path to file
+        manifest_dir: Manifests directory ('~/.cache/ni_cts3' if None)
+        force: True to upload all files
+
+    Returns:
+        Dictionary made of:
+        - Device host (str): Synchronization result (SyncResult)
+    """
+    if isinstance(files, Mapping):
+        file_map = {name: Path(path) for name, path in files.items()}
+    else:
+        file_map = {}
+        for path in files:
+            local_path = Path(path)
+            previous = file_map.setdefault(local_path.name, local_path)
+            if previous != local_path:
+                raise ValueError(f"'{previous}' and '{local_path}' would be "
+                                 'uploaded with the same name')
+    if manifest_dir is None:
+        directory = Path.home() / '.cache' / 'ni_cts3'
+    else:
+        directory = Path(manifest_dir)
+    # Local files are hashed once for all devices
+    hashes = {name: _file_hash(path) for name, path in file_map.items()}
+    device_list = list(devices)
+    if not device_list:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(device_list),
+                            thread_name_prefix='CTS3 sync') as pool:
+        futures = {
+            device.host: pool.submit(device.call, _sync_device, device.host,
+                                     file_map, hashes, directory, force)
+            for device in device_list
+        }
+        results = {}
+        for host, future in futures.items():
+            try:
+                results[host] = future.result()
+            except Exception as ex:  # e.g. device not open
+                results[host] = SyncResult(host, [], [], {}, ex)
+        return results
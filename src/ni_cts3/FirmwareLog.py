@@ -0,0 +1,553 @@
+import sys
+from collections import deque
+from json import loads
+from os import read, pipe, write, close, rename, remove
+from pathlib import Path
+from platform import processor
+from shlex import split
+from subprocess import Popen, PIPE, DEVNULL
+from threading import Thread, Event, Lock
+from time import time, monotonic
+from typing import (Deque, Dict, List, NamedTuple, Optional, TextIO, Tuple,
+                    Union)
+from warnings import warn
+if sys.platform != 'win32':
+    from selectors import DefaultSelector, EVENT_READ
+
+# Follow log as JSON entries, starting with last entry
+_LOG_CMD = 'journalctl --unit=tgapp --follow --lines=1 --output=json'
+
+# Running from CTS3 embedded environment
+_embedded = sys.platform == 'linux' and processor().startswith('armv7')
+
+
+def _log_host(host: str) -> str:
+    """Gets the connection string of the device whose log is redirected"""
+    return 'localhost' if _embedded else host
+
+
+class FirmwareLogRecord(NamedTuple):
+    """
+    Firmware log entry
+
+    Attributes:
+        host: Connection string of the device
+        timestamp: Entry date in s since epoch (device clock if available)
+        priority: Syslog priority (0: emergency to 7: debug)
+        message: Log message
+    """
+    host: str
+    timestamp: float
+    priority: int
+    message: str
+
+
+def _parse_entry(host: str, line: str) -> FirmwareLogRecord:
+    """
+    Parses a journal entry
+
+    Args:
+        host: Connection string of the device
+        line: Journal entry in JSON format
+
+    Returns:
+        Log record
+    """
+    try:
+        entry = loads(line)
+        message = entry.get('MESSAGE', '')
+        if isinstance(message, list):
+            # Non-printable message is exported as a bytes array
+            message = bytes(message).decode('ascii', 'replace')
+        timestamp = entry.get('__REALTIME_TIMESTAMP')
+        return FirmwareLogRecord(
+            host,
+            int(timestamp) / 1e6 if timestamp else time(),
+            int(entry.get('PRIORITY', 6)), str(message).rstrip('\n'))
+    except (ValueError, TypeError, AttributeError):
+        return FirmwareLogRecord(host, time(), 6, line.rstrip('\n'))
+
+
+class _HostLog:
+    """
+    Log redirection of one device
+
+    Attributes:
+        host: Connection string
+        process: Log redirection subprocess
+        records: Last log records
+        started: Event raised when log redirection is established or failed
+        running: True if log redirection is established
+        pending: Incomplete line received
+        tokens: Remaining lines allowed on stderr
+        last_refill: Date of last tokens refill
+        suppressed: Number of lines not written on stderr
+    """
+
+    def __init__(self, host: str, process: 'Popen[bytes]', capacity: int):
+        """
+        Inits _HostLog
+
+        Args:
+            host: Connection string
+            process: Log redirection subprocess
+            capacity: Maximum number of kept records
+        """
+        self.host = host
+        self.process = process
+        self.records: Deque[FirmwareLogRecord] = deque(maxlen=capacity)
+        self.started = Event()
+        self.running = False
+        self.pending = b''
+        self.tokens = 0.0
+        self.last_refill = monotonic()
+        self.suppressed = 0
+
+
+class _FileSink:
+    """
+    Size-based rotating log file
+
+    Attributes:
+        path: Log file path
+        max_bytes: Size above which the file is rotated
+        backup_count: Number of rotated files kept
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int,
+                 backup_count: int):
+        """
+        Inits _FileSink
+
+        Args:
+            path: Log file path
+            max_bytes: Size above which the file is rotated
+            backup_count: Number of rotated files kept
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file: TextIO = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, record: FirmwareLogRecord) -> None:
+        """
+        Appends a record to the file
+
+        Args:
+            record: Log record
+        """
+        self._file.write(f'{record.timestamp:.6f}\t{record.host}\t'
+                         f'{record.priority}\t{record.message}\n')
+        if self.max_bytes > 0 and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def flush(self) -> None:
+        """Flushes written records"""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Closes the file"""
+        self._file.close()
+
+    def _rotate(self) -> None:
+        """Renames current file and starts a new one"""
+        self._file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = Path(f'{self.path}.{index}')
+                if source.exists():
+                    target = Path(f'{self.path}.{index + 1}')
+                    if target.exists():
+                        remove(str(target))
+                    rename(str(source), str(target))
+            target = Path(f'{self.path}.1')
+            if target.exists():
+                remove(str(target))
+            rename(str(self.path), str(target))
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+
+
+class _FirmwareLogCollector:
+    """
+    Firmware logs collector multiplexing all devices in a single thread
+
+    Attributes:
+        capacity: Maximum number of records kept per device
+        rate_limit: Maximum number of lines per s written on stderr
+        (0 for no limit)
+        burst: Maximum number of lines written on stderr at once
+        to_stderr: True to write log lines on stderr
+        sink: Optional log file
+    """
+
+    def __init__(self) -> None:
+        """Inits _FirmwareLogCollector"""
+        self.capacity = 10000
+        self.rate_limit = 0.0
+        self.burst = 100
+        self.to_stderr = True
+        self.sink: Optional[_FileSink] = None
+        self._lock = Lock()
+        self._sink_lock = Lock()
+        self._logs: Dict[str, _HostLog] = {}
+        self._history: Dict[str, Deque[FirmwareLogRecord]] = {}
+        self._thread: Optional[Thread] = None
+        self._wakeup: Optional[Tuple[int, int]] = None
+        self._changes: List[_HostLog] = []
+
+    def start(self, host: str, timeout: float = 10.0) -> bool:
+        """
+        Starts log redirection of a device
+
+        Args:
+            host: Connection string
+            timeout: Maximum time to wait for the redirection in s
+
+        Returns:
+            True if log redirection is established
+        """
+        host = _log_host(host)
+        # Concurrent starts of a device share the same redirection
+        with self._lock:
+            log = self._logs.get(host)
+            if log is None:
+                try:
+                    if _embedded:
+                        process = Popen(_LOG_CMD, shell=True, stdout=PIPE,
+                                        stderr=DEVNULL)
+                    else:
+                        # Running from remote environment, open SSH
+                        # connection
+                        ssh_cmd = ('ssh -Tnq -l default '
+                                   f'-o StrictHostKeyChecking=no {host}')
+                        process = Popen(split(f'{ssh_cmd} {_LOG_CMD}'),
+                                        stdout=PIPE, stderr=DEVNULL)
+                except OSError:
+                    return False
+                log = _HostLog(host, process, self.capacity)
+                log.tokens = float(self.burst)
+                self._logs[host] = log
+                self._history[host] = log.records
+                if sys.platform == 'win32':
+                    Thread(target=self._read_lines, args=(log, ),
+                           daemon=True).start()
+                else:
+                    self._changes.append(log)
+                    self._ensure_thread()
+        # Last log entry is read to ensure link is established
+        log.started.wait(timeout)
+        if not log.running:
+            with self._lock:
+                failed = self._logs.get(host) is log
+            if failed:
+                self.stop(host)
+        return log.running
+
+    def stop(self, host: str) -> None:
+        """
+        Stops log redirection of a device
+
+        Args:
+            host: Connection string
+        """
+        host = _log_host(host)
+        with self._lock:
+            log = self._logs.pop(host, None)
+            if log is None:
+                return
+        log.running = False
+        log.process.terminate()
+        log.process.wait()
+        with self._lock:
+            if sys.platform == 'win32' or self._wakeup is None:
+                if log.process.stdout is not None:
+                    log.process.stdout.close()
+            else:
+                # Pipe is closed by collector thread once unregistered
+                self._changes.append(log)
+                self._notify()
+        with self._sink_lock:
+            if self.sink is not None:
+                self.sink.flush()
+
+    def stop_all(self) -> None:
+        """Stops all log redirections"""
+        for host in list(self._logs):
+            self.stop(host)
+        self.set_sink(None)
+
+    def set_sink(self, sink: Optional[_FileSink]) -> None:
+        """
+        Replaces the log file
+
+        Args:
+            sink: New log file (None to stop writing to file)
+        """
+        # Previous file is closed once no record is being written
+        with self._sink_lock:
+            previous = self.sink
+            self.sink = sink
+            if previous is not None:
+                previous.close()
+
+    def is_running(self, host: str) -> bool:
+        """
+        Indicates whether the log of a device is redirected
+
+        Args:
+            host: Connection string
+
+        Returns:
+            True if log redirection is established
+        """
+        log = self._logs.get(_log_host(host))
+        return log is not None and log.running
+
+    def records(self, host: Optional[str]) -> List[FirmwareLogRecord]:
+        """
+        Gets last log records
+
+        Args:
+            host: Connection string (None for all devices)
+
+        Returns:
+            Log records sorted by date
+        """
+        with self._lock:
+            if host is not None:
+                history = self._history.get(_log_host(host))
+                return list(history) if history is not None else []
+            records = [
+                record for history in self._history.values()
+                for record in history
+            ]
+        records.sort(key=lambda record: record.timestamp)
+        return records
+
+    def _ensure_thread(self) -> None:
+        """Starts collector thread if needed"""
+        if self._wakeup is None:
+            self._wakeup = pipe()
+            self._thread = Thread(target=self._run,
+                                  args=self._wakeup,
+                                  name='CTS3 firmware logs',
+                                  daemon=True)
+            self._thread.start()
+        else:
+            self._notify()
+
+    def _notify(self) -> None:
+        """Wakes collector thread up"""
+        if self._wakeup is not None:
+            write(self._wakeup[1], b'\0')
+
+    def _run(self, wakeup_fd: int, notify_fd: int) -> None:
+        """
+        Collector thread multiplexing all devices pipes
+
+        Args:
+            wakeup_fd: Read end of the wake-up pipe
+            notify_fd: Write end of the wake-up pipe
+        """
+        selector = DefaultSelector()
+        selector.register(wakeup_fd, EVENT_READ)
+        try:
+            self._collect(selector, wakeup_fd)
+        except Exception as ex:
+            warn(f'Firmware log collector stopped: {ex!r}', RuntimeWarning)
+        finally:
+            with self._lock:
+                if self._wakeup == (wakeup_fd, notify_fd):
+                    # Stopped on error: remaining redirections can not be
+                    # read anymore
+                    logs = list(self._logs.values()) + self._changes
+                    self._logs.clear()
+                    self._changes = []
+                    self._thread = None
+                    self._wakeup = None
+                else:
+                    logs = []
+            for log in logs:
+                log.running = False
+                log.started.set()
+                if log.process.poll() is None:
+                    log.process.terminate()
+                    log.process.wait()
+                if log.process.stdout is not None:
+                    log.process.stdout.close()
+            selector.close()
+            close(wakeup_fd)
+            close(notify_fd)
+
+    def _collect(self, selector: 'DefaultSelector', wakeup_fd: int) -> None:
+        """
+        Collector thread loop, returning when no device is left
+
+        Args:
+            selector: Selector polling wake-up and devices pipes
+            wakeup_fd: Read end of the wake-up pipe
+        """
+        while True:
+            with self._lock:
+                changes = self._changes
+                self._changes = []
+            for log in changes:
+                stdout = log.process.stdout
+                if stdout is None:
+                    log.started.set()
+                elif self._logs.get(log.host) is log:
+                    selector.register(stdout, EVENT_READ, log)
+                else:
+                    try:
+                        selector.unregister(stdout)
+                    except KeyError:
+                        pass  # Already unregistered on end of file
+                    stdout.close()
+            with self._lock:
+                if not self._logs and not self._changes:
+                    # No more device: next start spawns a new thread
+                    self._thread = None
+                    self._wakeup = None
+                    return
+            for key, _ in selector.select():
+                if key.data is None:
+                    read(wakeup_fd, 4096)
+                    continue
+                log = key.data
+                try:
+                    data = read(key.fd, 65536)
+                except OSError:
+                    data = b''
+                if len(data) == 0:
+                    # Subprocess ended
+                    selector.unregister(key.fileobj)
+                    log.running = False
+                    log.started.set()
+                    continue
+                lines = (log.pending + data).split(b'\n')
+                log.pending = lines.pop()
+                for line in lines:
+                    try:
+                        self._on_line(log,
+                                      line.decode('utf-8', 'replace'))
+                    except Exception as ex:
+                        # One bad record must not stop other devices
+                        warn(f'Firmware log of {log.host} lost: {ex!r}',
+                             RuntimeWarning)
+
+    def _read_lines(self, log: _HostLog) -> None:
+        """
+        Reader thread of one device (platforms not able to poll pipes)
+
+        Args:
+            log: Log redirection
+        """
+        stdout = log.process.stdout
+        try:
+            if stdout is not None:
+                for line in stdout:
+                    self._on_line(log, line.decode('utf-8', 'replace'))
+        except (OSError, ValueError):
+            pass
+        log.running = False
+        log.started.set()
+
+    def _on_line(self, log: _HostLog, line: str) -> None:
+        """
+        Processes a received log line
+
+        Args:
+            log: Log redirection
+            line: Journal entry
+        """
+        if not log.running:
+            # First line is the last entry logged before redirection
+            log.running = True
+            log.started.set()
+            return
+        record = _parse_entry(log.host, line)
+        log.records.append(record)
+        with self._sink_lock:
+            if self.sink is not None:
+                self.sink.write(record)
+        if not self.to_stderr:
+            return
+        if self.rate_limit > 0:
+            now = monotonic()
+            log.tokens = min(
+                float(self.burst),
+                log.tokens + (now - log.last_refill) * self.rate_limit)
+            log.last_refill = now
+            if log.tokens < 1.0:
+                log.suppressed += 1
+                return
+            log.tokens -= 1.0
+            if log.suppressed:
+                sys.stderr.write(f'{{{log.host}}}\t'
+                                 f'({log.suppressed} lines suppressed)\n')
+                log.suppressed = 0
+        sys.stderr.write(f'{{{log.host}}}\t{record.message}\n')
+
+
+_collector = _FirmwareLogCollector()
+
+
+def get_firmware_log(host: Optional[str] = None) -> List[FirmwareLogRecord]:
+    """
+    Gets the last firmware log entries received
+
+    Args:
+        host: Connection string (None for all devices)
+
+    Returns:
+        Log records sorted by date
+    """
+    return _collector.records(host)
+
+
+def configure_firmware_log(capacity: Optional[int] = None,
+                           rate_limit: Optional[float] = None,
+                           burst: Optional[int] = None,
+                           to_stderr: Optional[bool] = None) -> None:
+    """
+    Configures firmware log redirection
+
+    Args:
+        capacity: Number of entries kept per device
+        (applies to redirections started afterwards)
+        rate_limit: Maximum number of lines per s written on stderr
+        per device (0 for no limit)
+        burst: Maximum number of lines written on stderr at once per device
+        to_stderr: True to write firmware log on stderr
+    """
+    if capacity is not None:
+        if capacity < 1:
+            raise ValueError('capacity must be greater than 0')
+        _collector.capacity = capacity
+    if rate_limit is not None:
+        if rate_limit < 0:
+            raise ValueError('rate_limit must be positive')
+        _collector.rate_limit = rate_limit
+    if burst is not None:
+        if burst < 1:
+            raise ValueError('burst must be greater than 0')
+        _collector.burst = burst
+    if to_stderr is not None:
+        _collector.to_stderr = to_stderr
+
+
+def set_firmware_log_file(path: Union[str, Path, None],
+                          max_bytes: int = 10 * 1024 * 1024,
+                          backup_count: int = 5) -> None:
+    """
+    Writes firmware log of all devices to a rotating file
+
+    Args:
+        path: Log file path (None to stop writing to file)
+        max_bytes: Size above which the file is rotated (0 for no rotation)
+        backup_count: Number of rotated files kept
+    """
+    _collector.set_sink(
+        _FileSink(path, max_bytes, backup_count) if path else None)
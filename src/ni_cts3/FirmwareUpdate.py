@@ -0,0 +1,279 @@
+from concurrent.futures import ThreadPoolExecutor
+from ipaddress import IPv4Address
+from pathlib import Path
+from threading import Lock
+from time import monotonic, sleep
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Union,
+                    NamedTuple)
+from . import (UpdateFirmware, MPS_ListVersions, MPS_SelectActivePartition,
+               Reboot, OpenCommunication)
+from .Daq import Daq_FlashFirmware
+from .MPException import CTS3Exception
+from .Device import Device
+
+
+class UpdateResult(NamedTuple):
+    """
+    Firmware update result
+
+    Attributes:
+        host: Device host name or IP address
+        success: True if the device has been updated and verified
+        partition: Updated partition index
+        attempts: Number of update attempts
+        duration: Total update time in s
+        versions: Firmware versions read on the updated partition
+        error: Error of the last failed attempt
+    """
+    host: str
+    success: bool
+    partition: int
+    attempts: int
+    duration: float
+    versions: Dict[str, Union[str, int, bool]]
+    error: Optional[BaseException]
+
+
+class FirmwareUpdater:
+    """
+    Fleet firmware update orchestrator
+
+    Devices are updated concurrently, at most max_concurrent at a time.
+    By default the partition which is not in use is updated, then verified
+    with MPS_ListVersions, activated and booted. The updated partition is
+    chosen once per device. Failed transfers and checks are retried, but
+    activation and reboot are not, so that a retry never overwrites the
+    partition which was in use.
+
+    Attributes:
+        package: Firmware package path
+        max_concurrent: Maximum number of devices updated simultaneously
+        partition: Partition to update (inactive partition if None)
+        flash_daq: True to flash the DAQ with the updated partition firmware
+        activate: True to activate the updated partition
+        reboot: True to reboot on the activated partition and check it
+        expected_version: Expected application version (None to only check
+        compatibility)
+        max_retries: Number of additional attempts for failed devices
+        boot_timeout: Maximum time to reconnect after reboot in s
+        on_progress: Callback called with host and progress percentage
+    """
+
+    def __init__(self,
+                 package: Union[str, Path],
+                 devices: Iterable[Union[str, IPv4Address, Device]],
+                 max_concurrent: int = 4,
+                 partition: Optional[int] = None,
+                 flash_daq: bool = False,
+                 activate: bool = True,
+                 reboot: bool = True,
+                 expected_version: Optional[str] = None,
+                 max_retries: int = 1,
+                 boot_timeout: float = 300.0,
+                 on_progress: Optional[Callable[[str, int], None]] = None):
+        """
+        Inits FirmwareUpdater
+
+        Args:
+            package: Firmware package path
+            devices: Devices, host names or IP addresses
+            max_concurrent: Maximum number of devices updated simultaneously
+            partition: Partition to update (inactive partition if None)
+            flash_daq: True to flash the DAQ with the updated partition
+            firmware
+            activate: True to activate the updated partition
+            reboot: True to reboot on the activated partition and check it
+            expected_version: Expected application version (None to only
+            check compatibility)
+            max_retries: Number of additional attempts for failed devices
+            boot_timeout: Maximum time to reconnect after reboot in s
+            on_progress: Callback called with host and progress percentage
+        """
+        if max_concurrent < 1:
+            raise ValueError('max_concurrent must be positive')
+        self.package = Path(package)
+        self.max_concurrent = max_concurrent
+        self.partition = partition
+        self.flash_daq = flash_daq
+        self.activate = activate
+        self.reboot = reboot
+        self.expected_version = expected_version
+        self.max_retries = max_retries
+        self.boot_timeout = boot_timeout
+        self.on_progress = on_progress
+        self._devices = [d if isinstance(d, Device) else Device(d)
+                         for d in devices]
+        self._progress: Dict[str, int] = {d.host: 0
+                                          for d in self._devices}
+        self._lock = Lock()
+
+    @property
+    def progress(self) -> Dict[str, int]:
+        """Progress percentage of each device"""
+        with self._lock:
+            return dict(self._progress)
+
+    @property
+    def overall_progress(self) -> float:
+        """Mean progress percentage"""
+        with self._lock:
+            values = list(self._progress.values())
+        return sum(values) / len(values) if values else 0.0
+
+    def run(self) -> List[UpdateResult]:
+        """
+        Updates all devices
+
+        Returns:
+            Update result of each device
+        """
+        with ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                thread_name_prefix='CTS3 update') as pool:
+            return list(pool.map(self._update_device, self._devices))
+
+    def _set_progress(self, host: str, value: int) -> None:
+        """Records device progress"""
+        with self._lock:
+            self._progress[host] = value
+        if self.on_progress is not None:
+            self.on_progress(host, value)
+
+    def _update_device(self, device: Device) -> UpdateResult:
+        """Updates one device with retries"""
+        start = monotonic()
+        owned = not device.is_open
+        error: Optional[BaseException] = None
+        partition: Optional[int] = self.partition
+        versions: Dict[str, Union[str, int, bool]] = {}
+        attempts = 0
+        success = False
+        try:
+            while attempts <= self.max_retries:
+                attempts += 1
+                self._set_progress(device.host, 0)
+                try:
+                    device.open()
+                    if partition is None:
+                        # Chosen once: a retry must not pick the partition
+                        # activated by a previous attempt
+                        partition = device.call(self._inactive_partition)
+                    versions = device.call(self._flash, device, partition)
+                    error = None
+                    break
+                except Exception as ex:
+                    error = ex
+                    self._close(device)
+            if error is None and partition is not None:
+                # Not retried once the partition has been activated
+                try:
+                    device.call(self._activate, device, partition)
+                    self._set_progress(device.host, 100)
+                    success = True
+                except Exception as ex:
+                    error = ex
+                    # Channel may be lost (e.g. failure after reboot)
+                    self._close(device)
+        finally:
+            try:
+                if owned:
+                    device.close()
+                else:
+                    device.open()
+            except Exception:
+                pass
+        return UpdateResult(device.host, success,
+                            -1 if partition is None else partition, attempts,
+                            monotonic() - start, versions, error)
+
+    @staticmethod
+    def _close(device: Device) -> None:
+        """Closes a device after a failed step"""
+        try:
+            device.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _inactive_partition() -> int:
+        """Gets the partition not in use (called from the device thread)"""
+        active = int(MPS_ListVersions(0)['active_partition'])
+        return 2 if active == 1 else 1
+
+    def _flash(self, device: Device, partition: int) -> Any:
+        """Update and check sequence (called from the device thread)"""
+        host = device.host
+
+        def call_back(value: int) -> int:
+            # Transfer is reported as 0-90 % when DAQ flash follows
+            scale = 0.9 if self.flash_daq else 1.0
+            self._set_progress(host, min(99, int(value * scale)))
+            return 0
+
+        UpdateFirmware(self.package, partition, call_back)
+        versions = MPS_ListVersions(partition)
+        if not versions['compatibility']:
+            raise RuntimeError(
+                f'partition {partition} firmware is not compatible')
+        if (self.expected_version is not None and
+                versions['application_version'] != self.expected_version):
+            raise RuntimeError(
+                f"partition {partition} version is "
+                f"{versions['application_version']} instead of "
+                f'{self.expected_version}')
+        if self.flash_daq:
+
+            def daq_call_back(value: int) -> int:
+                self._set_progress(host, min(99, 90 + value // 10))
+                return 0
+
+            Daq_FlashFirmware(partition, daq_call_back)
+        return versions
+
+    def _activate(self, device: Device, partition: int) -> None:
+        """Activation sequence (called from the device thread)"""
+        if self.activate:
+            MPS_SelectActivePartition(partition)
+            if self.reboot:
+                Reboot()
+                self._reconnect(device)
+                active = int(MPS_ListVersions(0)['active_partition'])
+                if active != partition:
+                    raise RuntimeError(
+                        f'partition {active} active instead of {partition}')
+
+    def _reconnect(self, device: Device) -> None:
+        """Reopens communication after reboot (called from device thread)"""
+        deadline = monotonic() + self.boot_timeout
+        sleep(5.0)  # Shutdown delay
+        while True:
+            try:
+                OpenCommunication(device.host, device.log)
+                return
+            except CTS3Exception:
+                if monotonic() > deadline:
+                    raise
+                sleep(2.0)
+
+
+def format_update_report(results: Iterable[UpdateResult]) -> str:
+    """
+    Formats firmware update results
+
+    Args:
+        results: Update results
+
+    Returns:
+        Summary report
+    """
+    results = list(results)
+    succeeded = sum(1 for r in results if r.success)
+    lines = [f'{succeeded}/{len(results)} devices updated']
+    for r in results:
+        if r.success:
+            status = (f"OK   partition {r.partition} "
+                      f"{r.versions.get('application_version', '')}")
+        else:
+            status = f'FAIL {r.error}'
+        lines.append(f'{r.host:<20} {status} '
+                     f'({r.attempts} attempt(s), {r.duration:.0f} s)')
+    return '\n'.join(lines)
@@ -0,0 +1,366 @@
+import multiprocessing
+import pickle
+from collections import deque
+from ipaddress import IPv4Address
+from multiprocessing.connection import wait
+from time import perf_counter
+from typing import (Any, Callable, Deque, Dict, Iterable, Iterator, List,
+                    Optional, Tuple, Union, NamedTuple)
+from . import (OpenCommunication, CloseCommunication, MPOS_OpenResource,
+               MPOS_CloseResource, ResourceType)
+
+# Worker messages
+_READY = 0
+_FAILED = 1
+_DONE = 2
+
+_Task = Tuple[int, Callable[..., Any], Tuple[Any, ...], Dict[str, Any]]
+
+
+class FleetResult(NamedTuple):
+    """
+    Task result
+
+    Attributes:
+        task_id: Task identifier
+        host: Host of the device which executed the task
+        value: Value returned by the task function
+        error: Exception raised by the task function (None if succeeded)
+        duration: Task execution time in s
+    """
+    task_id: int
+    host: str
+    value: Any
+    error: Optional[BaseException]
+    duration: float
+
+
+def _picklable_error(ex: BaseException) -> BaseException:
+    """Gets an exception which can be sent to the parent process"""
+    try:
+        pickle.loads(pickle.dumps(ex))
+        return ex
+    except Exception:
+        return RuntimeError(f'{type(ex).__name__}: {ex}')
+
+
+def _worker(host: str, resources: List[ResourceType], log: bool,
+            conn: Any) -> None:
+    """
+    Fleet worker process main function
+
+    Args:
+        host: Device host name or IP address
+        resources: Resources to open
+        log: True to output firmware log to stderr
+        conn: Connection to the parent process
+    """
+    try:
+        OpenCommunication(host, log)
+        for resource in resources:
+            MPOS_OpenResource(resource)
+    except BaseException as ex:
+        conn.send((_FAILED, -1, _picklable_error(ex), 0.0))
+        return
+    conn.send((_READY, -1, None, 0.0))
+    try:
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            task_id, func, args, kwargs = task
+            start = perf_counter()
+            try:
+                outcome: Tuple[Any, Optional[BaseException]] = (
+                    func(*args, **kwargs), None)
+            except Exception as ex:
+                outcome = (None, ex)
+            duration = perf_counter() - start
+            try:
+                payload = pickle.dumps(outcome)
+            except Exception as ex:  # Unpicklable return value
+                payload = pickle.dumps((None, _picklable_error(ex)))
+            conn.send((_DONE, task_id, payload, duration))
+    except EOFError:
+        pass  # Parent process stopped
+    finally:
+        for resource in resources:
+            try:
+                MPOS_CloseResource(resource)
+            except Exception:
+                pass
+        CloseCommunication()
+
+
+class _Worker:
+    """Worker process state"""
+
+    def __init__(self, host: str, process: Any, conn: Any):
+        self.host = host
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        # Tasks sent to the worker and not completed yet
+        self.tasks: Deque[_Task] = deque()
+
+
+class FleetRunner:
+    """
+    Parallel test runner over several devices
+
+    One worker process is spawned per device (MPuLib state is per process).
+    Each worker opens the communication channel and resources once, then
+    executes the tasks dispatched to it. Tasks are only dispatched to
+    workers which are ready, and a worker holds at most `prefetch` tasks:
+    the next queued task goes to the first worker which completes one, so
+    faster devices execute more tasks. Tasks of a worker which dies are
+    dispatched again to other workers.
+
+    Task functions and arguments must be picklable, and the calling script
+    must be protected by an `if __name__ == '__main__':` guard.
+
+    Attributes:
+        hosts: Devices host name or IP address
+        prefetch: Maximum number of tasks dispatched to a worker
+        max_retries: Number of times a task is dispatched again when the
+        worker executing it dies
+        completed: Number of tasks completed by each host
+    """
+
+    def __init__(self,
+                 hosts: Iterable[Union[str, IPv4Address]],
+                 resources: Iterable[ResourceType] = (),
+                 log: bool = False,
+                 prefetch: int = 2,
+                 max_retries: int = 1):
+        """
+        Inits FleetRunner
+
+        Args:
+            hosts: Devices host name or IP address
+            resources: Resources opened by each worker
+            log: True to output firmware log to stderr
+            prefetch: Maximum number of tasks dispatched to a worker
+            max_retries: Number of times a task is dispatched again when the
+            worker executing it dies
+        """
+        self.hosts = [str(host) for host in hosts]
+        if not self.hosts:
+            raise ValueError('hosts must not be empty')
+        if prefetch < 1:
+            raise ValueError('prefetch must be positive')
+        self.prefetch = prefetch
+        self.max_retries = max_retries
+        self.completed: Dict[str, int] = {host: 0 for host in self.hosts}
+        self._resources = list(resources)
+        self._log = log
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: Dict[Any, _Worker] = {}
+        self._queue: Deque[_Task] = deque()
+        self._retries: Dict[int, int] = {}
+        self._pending = 0
+        self._next_id = 0
+        self._errors: Dict[str, BaseException] = {}
+        self._abandoned: Deque[FleetResult] = deque()
+        # Results received by map and not delivered yet
+        self._deferred: Deque[FleetResult] = deque()
+
+    def __enter__(self) -> 'FleetRunner':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted tasks not completed yet"""
+        return self._pending
+
+    @property
+    def ready(self) -> List[str]:
+        """Hosts whose worker has opened the communication channel"""
+        return [w.host for w in self._workers.values() if w.ready]
+
+    @property
+    def errors(self) -> Dict[str, BaseException]:
+        """Error which stopped each failed worker"""
+        return dict(self._errors)
+
+    def start(self) -> None:
+        """Spawns worker processes"""
+        if self._workers:
+            return
+        for host in self.hosts:
+            conn, child_conn = self._context.Pipe()
+            process = self._context.Process(
+                target=_worker,
+                args=(host, self._resources, self._log, child_conn),
+                name=f'CTS3 {host}',
+                daemon=True)
+            process.start()
+            child_conn.close()
+            self._workers[conn] = _Worker(host, process, conn)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops worker processes once dispatched tasks are executed
+
+        Args:
+            timeout: Maximum time to wait for each worker in s
+        """
+        for worker in self._workers.values():
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass  # Worker already stopped
+        for worker in self._workers.values():
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+            worker.conn.close()
+        self._workers.clear()
+
+    def submit(self, func: Callable[..., Any], *args: Any,
+               **kwargs: Any) -> int:
+        """
+        Queues a task
+
+        Args:
+            func: Task function (called from a worker process)
+            *args: Function positional arguments
+            **kwargs: Function keyword arguments
+
+        Returns:
+            Task identifier
+        """
+        if not self._workers:
+            self.start()
+        task_id = self._next_id
+        self._next_id += 1
+        self._queue.append((task_id, func, args, kwargs))
+        self._pending += 1
+        self._dispatch()
+        return task_id
+
+    def map(self, func: Callable[..., Any],
+            iterable: Iterable[Any]) -> Iterator[FleetResult]:
+        """
+        Executes a task for each item
+
+        Args:
+            func: Task function called with each item
+            iterable: Function argument for each task
+
+        Returns:
+            Iterator over results in completion order
+            (results of other tasks remain available from results)
+        """
+        task_ids = {self.submit(func, item) for item in iterable}
+        if not task_ids:
+            return
+        for result in self._receive():
+            if result.task_id in task_ids:
+                task_ids.discard(result.task_id)
+                yield result
+                if not task_ids:
+                    break
+            else:
+                self._deferred.append(result)
+
+    def results(self,
+                timeout: Optional[float] = None) -> Iterator[FleetResult]:
+        """
+        Streams task results until all submitted tasks are completed
+
+        Tasks are dispatched to workers while results are iterated.
+
+        Args:
+            timeout: Maximum time to wait for each result in s
+
+        Returns:
+            Iterator over results in completion order
+        """
+        while self._deferred:
+            yield self._deferred.popleft()
+        yield from self._receive(timeout)
+
+    def _receive(self,
+                 timeout: Optional[float] = None) -> Iterator[FleetResult]:
+        """
+        Dispatches tasks and receives results until all tasks are completed
+
+        Args:
+            timeout: Maximum time to wait for each result in s
+
+        Returns:
+            Iterator over results in completion order
+        """
+        while self._pending:
+            if self._abandoned:
+                self._pending -= 1
+                yield self._abandoned.popleft()
+                continue
+            if not self._workers:
+                raise RuntimeError(
+                    f'all fleet workers stopped: {self._errors}')
+            ready = wait(list(self._workers), timeout)
+            if not ready:
+                raise TimeoutError('no task result received')
+            for conn in ready:
+                worker = self._workers[conn]
+                try:
+                    kind, task_id, payload, duration = worker.conn.recv()
+                except (EOFError, OSError):
+                    self._lost(worker)
+                    continue
+                if kind == _READY:
+                    worker.ready = True
+                elif kind == _FAILED:
+                    self._errors[worker.host] = payload
+                elif kind == _DONE:
+                    worker.tasks.popleft()
+                    self.completed[worker.host] += 1
+                    self._pending -= 1
+                    value, error = pickle.loads(payload)
+                    yield FleetResult(task_id, worker.host, value, error,
+                                      duration)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Sends queued tasks to ready workers with free slots"""
+        for worker in self._workers.values():
+            if not worker.ready:
+                continue
+            while self._queue and len(worker.tasks) < self.prefetch:
+                task = self._queue.popleft()
+                try:
+                    worker.conn.send(task)
+                except OSError:
+                    self._queue.appendleft(task)
+                    break
+                worker.tasks.append(task)
+
+    def _lost(self, worker: _Worker) -> None:
+        """Handles a stopped worker"""
+        del self._workers[worker.conn]
+        worker.process.join()
+        worker.conn.close()
+        if worker.host not in self._errors:
+            self._errors[worker.host] = RuntimeError(
+                f'worker stopped (exit code {worker.process.exitcode})')
+        # The task being executed may have crashed the worker: it is retried
+        # a limited number of times, other tasks are dispatched again
+        for index, task in enumerate(reversed(worker.tasks)):
+            task_id = task[0]
+            if worker.ready and index == len(worker.tasks) - 1:
+                retries = self._retries.get(task_id, 0)
+                if retries >= self.max_retries:
+                    self._abandoned.append(
+                        FleetResult(task_id, worker.host, None,
+                                    self._errors[worker.host], 0.0))
+                    continue
+                self._retries[task_id] = retries + 1
+            self._queue.appendleft(task)
+        worker.tasks.clear()
@@ -0,0 +1,200 @@
+from array import array
+from ctypes import c_uint8, byref, create_string_buffer, string_at
+from typing import Iterable, Iterator, List, Optional, Tuple, NamedTuple
+from . import _MPuLib, _check_limits
+from .MPStatus import CTS3ErrorCode
+from .MPException import CTS3Exception
+from .Device import Device
+
+# Pre-built address and length arguments
+_uint8 = [c_uint8(value) for value in range(256)]
+
+
+class I2cTransaction(NamedTuple):
+    """
+    I²C transaction
+
+    Attributes:
+        address: 7-bit I²C slave address (0x1E and 0x77 are reserved)
+        write: Data to write (empty for a read only transaction)
+        read: Size of data to read after write (0 for a write only
+        transaction)
+    """
+    address: int
+    write: bytes = b''
+    read: int = 0
+
+
+class I2cBatchResult:
+    """
+    Compact I²C batch result
+
+    Data read by all transactions are concatenated in a single buffer.
+
+    Attributes:
+        data: Concatenated data read
+        offsets: Start of each transaction data in data, followed by the
+        total size
+        status: CTS3ErrorCode value of each executed transaction
+        executed: Number of executed transactions
+    """
+
+    def __init__(self, data: bytes, offsets: 'array[int]',
+                 status: 'array[int]', executed: int):
+        self.data = data
+        self.offsets = offsets
+        self.status = status
+        self.executed = executed
+
+    def __repr__(self) -> str:
+        return (f'I2cBatchResult({len(self)} transactions, '
+                f'{len(self.data)} bytes, {self.errors} errors)')
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def __getitem__(self, index: int) -> bytes:
+        """
+        Gets data read by a transaction
+
+        Args:
+            index: Transaction index
+
+        Returns:
+            Data read
+        """
+        if index < 0:
+            index += len(self)
+        return self.data[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self) -> Iterator[bytes]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def errors(self) -> int:
+        """Number of failed or not executed transactions"""
+        ok = CTS3ErrorCode.RET_OK.value
+        failed = sum(1 for status in self.status[:self.executed]
+                     if status != ok)
+        return failed + len(self) - self.executed
+
+    def check(self) -> None:
+        """Raises the error of the first failed transaction"""
+        ok = CTS3ErrorCode.RET_OK.value
+        for status in self.status[:self.executed]:
+            if status != ok:
+                CTS3Exception._check_error(status)
+
+
+def _prepare(
+    transactions: Iterable[Tuple[int, bytes, int]]
+) -> List[Tuple[int, bytes, int]]:
+    """Validates transactions once before execution"""
+    prepared = []
+    for address, write, read in transactions:
+        if not isinstance(address, int):
+            raise TypeError('address must be an instance of int')
+        # 7-bit addressing
+        if not 0 <= address <= 0x7F:
+            raise OverflowError('address is out of range')
+        if not isinstance(write, bytes):
+            raise TypeError('write must be an instance of bytes')
+        _check_limits(c_uint8, len(write), 'write')
+        if not isinstance(read, int):
+            raise TypeError('read must be an instance of int')
+        _check_limits(c_uint8, read, 'read')
+        prepared.append((address, write, read))
+    return prepared
+
+
+def _execute(transactions: List[Tuple[int, bytes, int]], aux: int,
+             stop_on_error: bool) -> I2cBatchResult:
+    """Executes prepared transactions"""
+    if aux == 1:
+        write_func = _MPuLib.MPS_I2cAux1Write
+        read_func = _MPuLib.MPS_I2cAux1Read
+    else:
+        write_func = _MPuLib.MPS_I2cAuxWrite
+        read_func = _MPuLib.MPS_I2cAuxRead
+    ok = CTS3ErrorCode.RET_OK.value
+    uint8 = _uint8
+    buffer = create_string_buffer(255)
+    size = c_uint8()
+    size_ref = byref(size)
+    data = bytearray()
+    offsets = array('L', [0])
+    status = array('i', [ok]) * len(transactions)
+    executed = 0
+    for index, (address, write, read) in enumerate(transactions):
+        ret = ok
+        if write:
+            ret = write_func(uint8[address], uint8[len(write)], write)
+        if ret == ok and read:
+            size.value = read
+            ret = read_func(uint8[address], size_ref, buffer)
+            if ret == ok:
+                data += string_at(buffer, size.value)
+        status[index] = ret
+        executed += 1
+        offsets.append(len(data))
+        if ret != ok and stop_on_error:
+            break
+    # Transactions not executed are empty
+    offsets.extend([len(data)] * (len(transactions) + 1 - len(offsets)))
+    return I2cBatchResult(bytes(data), offsets, status, executed)
+
+
+def i2c_batch(transactions: Iterable[Tuple[int, bytes, int]],
+              aux: int = 2,
+              stop_on_error: bool = False,
+              device: Optional[Device] = None) -> I2cBatchResult:
+    """
+    Executes several I²C transactions on an AUX front connector
+
+    Transactions are validated once, then executed in a single loop with
+    reused arguments and read buffer. Each transaction writes its data,
+    then reads the requested size from the same slave.
+
+    Args:
+        transactions: List of (address, write data, read size)
+        aux: AUX connector (1 or 2)
+        stop_on_error: True to stop at the first failed transaction
+        device: Device session executing the batch
+        (current communication channel if None)
+
+    Returns:
+        Batch result
+    """
+    if aux not in (1, 2):
+        raise ValueError(f'aux must be 1 or 2 (got {aux})')
+    prepared = _prepare(transactions)
+    if device is None:
+        return _execute(prepared, aux, stop_on_error)
+    result: I2cBatchResult = device.call(_execute, prepared, aux,
+                                         stop_on_error)
+    return result
+
+
+def i2c_read_registers(address: int,
+                       registers: Iterable[int],
+                       size: int = 1,
+                       aux: int = 2,
+                       device: Optional[Device] = None) -> I2cBatchResult:
+    """
+    Reads 8-bit addressed registers of an I²C slave
+
+    Args:
+        address: 7-bit I²C slave address (0x1E and 0x77 are reserved)
+        registers: Registers to read
+        size: Size of each register
+        aux: AUX connector (1 or 2)
+        device: Device session executing the batch
+        (current communication channel if None)
+
+    Returns:
+        Batch result, one transaction per register
+    """
+    return i2c_batch(
+        [(address, bytes([register]), size) for register in registers],
+        aux, False, device)
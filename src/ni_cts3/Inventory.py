@@ -0,0 +1,209 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import time
+from typing import (Dict, FrozenSet, Iterable, Optional, Tuple, Union,
+                    NamedTuple)
+from . import (MPS_GetVersion, MPS_GetVersion2, MPS_GetHardRev,
+               MPS_ListVersions, MPS_CouplerCheckLicense, LicenseId,
+               _current_host, _invalidation_hooks)
+from .Daq import Daq_GetInfo
+from .MPException import CTS3Exception
+from .Device import Device
+
+
+class PartitionInfo(NamedTuple):
+    """
+    Firmware installed on a partition
+
+    Attributes:
+        partition: Partition index
+        os_version: OS version
+        application_version: Application version
+        fpga_version: FPGA version
+        daq_version: DAQ version
+        compatibility: CTS3 revision compatibility
+    """
+    partition: int
+    os_version: str
+    application_version: str
+    fpga_version: str
+    daq_version: str
+    compatibility: bool
+
+
+class Inventory(NamedTuple):
+    """
+    Device inventory
+
+    Attributes:
+        host: Host name or IP address
+        version: Product name and system version
+        information: Product information in XML format
+        hardware_revision: Hardware revision
+        hardware_variant: Hardware variant
+        active_partition: Index of the partition currently in use
+        partitions: Firmware installed on each partition
+        daq_info: DAQ board version (None if not available)
+        licenses: Active embedded licenses
+        timestamp: Inventory time (as returned by time.time)
+    """
+    host: str
+    version: str
+    information: str
+    hardware_revision: str
+    hardware_variant: int
+    active_partition: int
+    partitions: Tuple[PartitionInfo, ...]
+    daq_info: Optional[str]
+    licenses: FrozenSet[LicenseId]
+    timestamp: float
+
+    def has_license(self, embedded_license: LicenseId) -> bool:
+        """
+        Checks embedded license validity
+
+        Args:
+            embedded_license: License to be checked
+
+        Returns:
+            True if license is active
+        """
+        return embedded_license in self.licenses
+
+    def partition(self, index: Optional[int] = None) -> PartitionInfo:
+        """
+        Gets firmware installed on a partition
+
+        Args:
+            index: Partition index (active partition if None)
+
+        Returns:
+            Partition firmware
+        """
+        if index is None:
+            index = self.active_partition
+        for info in self.partitions:
+            if info.partition == index:
+                return info
+        raise KeyError(f'partition {index} not available')
+
+
+_lock = Lock()
+
+# Inventory by host
+_inventories: Dict[str, Inventory] = {}
+
+
+def _forget_host(host: str) -> None:
+    """Drops inventory known for a host"""
+    with _lock:
+        _inventories.pop(host, None)
+
+
+_invalidation_hooks.append(_forget_host)
+
+
+def _collect(host: str, partitions: Iterable[int]) -> Inventory:
+    """Reads inventory from current device"""
+    hard_rev = MPS_GetHardRev()
+    active = int(MPS_ListVersions(0)['active_partition'])
+    partition_list = []
+    for index in partitions:
+        try:
+            versions = MPS_ListVersions(index)
+        except CTS3Exception:
+            continue  # Partition not available
+        partition_list.append(
+            PartitionInfo(index, str(versions['os_version']),
+                          str(versions['application_version']),
+                          str(versions['fpga_version']),
+                          str(versions['daq_version']),
+                          bool(versions['compatibility'])))
+    try:
+        daq_info: Optional[str] = Daq_GetInfo()
+    except CTS3Exception:
+        daq_info = None
+    return Inventory(host=host,
+                     version=MPS_GetVersion(),
+                     information=MPS_GetVersion2(),
+                     hardware_revision=str(hard_rev['revision']),
+                     hardware_variant=int(hard_rev['variant']),
+                     active_partition=active,
+                     partitions=tuple(partition_list),
+                     daq_info=daq_info,
+                     licenses=frozenset(lic for lic in LicenseId
+                                        if MPS_CouplerCheckLicense(lic)),
+                     timestamp=time())
+
+
+def get_inventory(refresh: bool = False,
+                  partitions: Iterable[int] = (1, 2)) -> Inventory:
+    """
+    Gets current device inventory
+
+    The inventory is read once and cached until the device firmware or
+    licenses are updated, or the device is rebooted.
+
+    Args:
+        refresh: True to read inventory again
+        partitions: Indexes of partitions to list
+
+    Returns:
+        Device inventory
+    """
+    host = _current_host()
+    if not refresh:
+        with _lock:
+            inventory = _inventories.get(host)
+        if inventory is not None:
+            return inventory
+    inventory = _collect(host, partitions)
+    with _lock:
+        _inventories[host] = inventory
+    return inventory
+
+
+def get_inventories(
+        devices: Iterable[Device],
+        refresh: bool = False,
+        partitions: Iterable[int] = (1, 2)
+) -> Dict[str, Union[Inventory, Exception]]:
+    """
+    Gets several devices inventory concurrently
+
+    Each device is read under its lock.
+
+    Args:
+        devices: Opened devices
+        refresh: True to read inventories again
+        partitions: Indexes of partitions to list
+
+    Returns:
+        Dictionary made of:
+        - Device host (str): Device inventory (Inventory), or error raised
+        while reading it (Exception)
+    """
+    partition_list = list(partitions)
+    device_list = list(devices)
+    if not device_list:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(device_list),
+                            thread_name_prefix='CTS3 inventory') as pool:
+        futures = {
+            device.host: pool.submit(device.call, get_inventory, refresh,
+                                     partition_list)
+            for device in device_list
+        }
+        inventories: Dict[str, Union[Inventory, Exception]] = {}
+        for host, future in futures.items():
+            try:
+                inventories[host] = future.result()
+            except Exception as ex:
+                inventories[host] = ex
+        return inventories
+
+
+def clear_inventory_cache() -> None:
+    """Drops all cached inventories"""
+    with _lock:
+        _inventories.clear()
@@ -0,0 +1,406 @@
+import json
+import os
+import sys
+import tempfile
+from ipaddress import IPv4Address
+from pathlib import Path
+from time import time, sleep
+from uuid import uuid4
+from typing import Any, Dict, List, Optional, Tuple, Union, NamedTuple
+from . import MPOS_OpenResource, MPOS_CloseResource, ResourceType
+
+
+class LeaseRecord(NamedTuple):
+    """
+    Completed lease
+
+    Attributes:
+        pid: Lease holder process identifier
+        requested: Request time (as returned by time.time)
+        granted: Grant time
+        released: Release time
+    """
+    pid: int
+    requested: float
+    granted: float
+    released: float
+
+    @property
+    def wait_time(self) -> float:
+        """Time spent waiting for the lease in s"""
+        return self.granted - self.requested
+
+    @property
+    def hold_time(self) -> float:
+        """Time the resource was held in s"""
+        return self.released - self.granted
+
+
+def _pid_alive(pid: int) -> bool:
+    """Checks if a local process is running"""
+    if sys.platform == 'win32':
+        return True  # os.kill would terminate the process
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # Process owned by another user
+    return True
+
+
+class Lease:
+    """
+    Time-bounded resource lease
+
+    Attributes:
+        host: Device host name or IP address
+        resource: Leased resource
+        requested: Request time (as returned by time.time)
+        granted: Grant time
+        expires: Expiry time
+    """
+
+    def __init__(self, manager: 'LeaseManager', host: str,
+                 resource: ResourceType, ticket: Path, requested: float,
+                 granted: float, expires: float, opened: bool):
+        self.host = host
+        self.resource = resource
+        self.requested = requested
+        self.granted = granted
+        self.expires = expires
+        self._manager = manager
+        self._ticket = ticket
+        self._opened = opened
+        self._released = False
+
+    def __repr__(self) -> str:
+        return (f"Lease('{self.host}', {self.resource.name}, "
+                f'remaining={self.remaining:.1f})')
+
+    def __enter__(self) -> 'Lease':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    @property
+    def wait_time(self) -> float:
+        """Time spent waiting for the lease in s"""
+        return self.granted - self.requested
+
+    @property
+    def remaining(self) -> float:
+        """Time before the lease expires in s"""
+        return 0.0 if self._released else max(0.0, self.expires - time())
+
+    @property
+    def expired(self) -> bool:
+        """True if the lease has expired or has been taken over"""
+        return self.remaining <= 0.0 or not self._ticket.exists()
+
+    def renew(self, duration: float) -> None:
+        """
+        Extends the lease
+
+        Args:
+            duration: New lease duration from now in s
+        """
+        if self.expired:
+            raise RuntimeError(f'{self!r} has expired')
+        expires = time() + duration
+        # Ticket modification time holds the renewed expiry
+        try:
+            os.utime(self._ticket, (expires, expires))
+        except FileNotFoundError:
+            self.expires = time()
+            raise RuntimeError(f'{self!r} has been taken over') from None
+        self.expires = expires
+
+    def release(self) -> None:
+        """Releases the resource"""
+        if self._released:
+            return
+        self._released = True
+        try:
+            if self._opened:
+                MPOS_CloseResource(self.resource)
+        finally:
+            self._manager._release(self)
+
+
+class LeaseManager:
+    """
+    Cross-process resource lease manager
+
+    Requests for a resource of a host are queued in first-in first-out
+    order using ticket files in a local directory shared by all processes.
+    The lease holder owns the resource until it releases it or its lease
+    expires, the expiry of a renewed lease being the modification time of
+    its ticket. Each lease is logged to measure waiting times and resource
+    utilization.
+
+    Attributes:
+        lock_dir: Tickets directory
+        poll_interval: Ticket queue polling period in s
+        stale_timeout: Time after which a waiting ticket which has not
+        been refreshed is discarded in s
+    """
+
+    def __init__(self,
+                 lock_dir: Union[str, Path, None] = None,
+                 poll_interval: float = 0.05,
+                 stale_timeout: float = 10.0):
+        """
+        Inits LeaseManager
+
+        Args:
+            lock_dir: Tickets directory (system temporary directory
+            subfolder if None)
+            poll_interval: Ticket queue polling period in s
+            stale_timeout: Time after which a waiting ticket which has not
+            been refreshed is discarded in s
+        """
+        if lock_dir is None:
+            self.lock_dir = Path(tempfile.gettempdir()) / 'ni_cts3_leases'
+        else:
+            self.lock_dir = Path(lock_dir)
+        self.poll_interval = poll_interval
+        self.stale_timeout = stale_timeout
+
+    def acquire(self,
+                host: Union[str, IPv4Address],
+                resource: ResourceType = ResourceType.CTS3_NFC_RESOURCE_ID,
+                duration: float = 300.0,
+                timeout: Optional[float] = None,
+                open_resource: bool = False) -> Lease:
+        """
+        Waits for a resource lease
+
+        Args:
+            host: Device host name or IP address
+            resource: Resource to lease
+            duration: Lease duration in s
+            timeout: Maximum waiting time in s (None to wait indefinitely)
+            open_resource: True to open the resource on the current
+            communication channel once the lease is granted
+
+        Returns:
+            Granted lease
+        """
+        if not isinstance(resource, ResourceType):
+            raise TypeError(
+                'resource must be an instance of ResourceType IntEnum')
+        host = str(host)
+        directory = self._directory(host, resource)
+        requested = time()
+        ticket = self._create_ticket(directory, requested)
+        try:
+            while True:
+                head = self._head(directory)
+                if head == ticket:
+                    granted = time()
+                    expires = granted + duration
+                    try:
+                        self._write_ticket(ticket, requested, granted,
+                                           expires)
+                        break
+                    except FileNotFoundError:
+                        # Discarded as stale just before being granted
+                        ticket = self._create_ticket(directory, requested)
+                        continue
+                now = time()
+                if timeout is not None and now - requested >= timeout:
+                    raise TimeoutError(
+                        f'{resource.name} lease on {host} not granted '
+                        f'within {timeout} s')
+                # Waiting ticket is refreshed to show requester is alive
+                try:
+                    os.utime(ticket)
+                except FileNotFoundError:
+                    # Discarded as stale (e.g. process was suspended)
+                    ticket = self._create_ticket(directory, requested)
+                sleep(self.poll_interval)
+            if open_resource:
+                MPOS_OpenResource(resource)
+        except BaseException:
+            self._remove(ticket)
+            raise
+        return Lease(self, host, resource, ticket, requested, granted,
+                     expires, open_resource)
+
+    def queue_length(
+        self,
+        host: Union[str, IPv4Address],
+        resource: ResourceType = ResourceType.CTS3_NFC_RESOURCE_ID
+    ) -> int:
+        """
+        Gets the number of pending requests, including current lease
+
+        Args:
+            host: Device host name or IP address
+            resource: Leased resource
+
+        Returns:
+            Number of tickets
+        """
+        return len(self._tickets(self._directory(str(host), resource)))
+
+    def history(
+        self,
+        host: Union[str, IPv4Address],
+        resource: ResourceType = ResourceType.CTS3_NFC_RESOURCE_ID,
+        since: float = 0.0
+    ) -> List[LeaseRecord]:
+        """
+        Gets completed leases
+
+        Args:
+            host: Device host name or IP address
+            resource: Leased resource
+            since: Minimum release time (as returned by time.time)
+
+        Returns:
+            Completed leases
+        """
+        path = self._directory(str(host), resource) / 'history.jsonl'
+        records = []
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = LeaseRecord(*json.loads(line))
+                    except (ValueError, TypeError):
+                        continue
+                    if record.released >= since:
+                        records.append(record)
+        except OSError:
+            pass
+        return records
+
+    def utilization(
+        self,
+        host: Union[str, IPv4Address],
+        resource: ResourceType = ResourceType.CTS3_NFC_RESOURCE_ID,
+        period: float = 3600.0
+    ) -> Dict[str, float]:
+        """
+        Computes resource usage statistics
+
+        Args:
+            host: Device host name or IP address
+            resource: Leased resource
+            period: Analysis period ending now in s
+
+        Returns:
+            Dictionary made of:
+            - 'utilization': Fraction of the period the resource was held
+            - 'leases': Number of leases
+            - 'mean_wait': Mean waiting time in s
+            - 'max_wait': Maximum waiting time in s
+        """
+        end = time()
+        start = end - period
+        records = self.history(host, resource, start)
+        held = sum(r.released - max(r.granted, start) for r in records)
+        waits = [r.wait_time for r in records]
+        return {
+            'utilization': held / period if period > 0 else 0.0,
+            'leases': len(records),
+            'mean_wait': sum(waits) / len(waits) if waits else 0.0,
+            'max_wait': max(waits) if waits else 0.0
+        }
+
+    def _directory(self, host: str, resource: ResourceType) -> Path:
+        """Gets tickets directory of a resource"""
+        name = f"{host.replace(':', '_')}_{resource.name}"
+        directory = self.lock_dir / name
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    def _tickets(self, directory: Path) -> List[Tuple[int, Path]]:
+        """Lists tickets by queue order"""
+        tickets = []
+        for path in directory.glob('ticket_*'):
+            try:
+                tickets.append((int(path.name.split('_')[1]), path))
+            except (IndexError, ValueError):
+                continue
+        tickets.sort()
+        return tickets
+
+    def _create_ticket(self, directory: Path, requested: float) -> Path:
+        """Creates a ticket at the end of the queue"""
+        tickets = self._tickets(directory)
+        number = tickets[-1][0] + 1 if tickets else 0
+        # Concurrent requests may get the same number: they are then ordered
+        # by their random suffix
+        path = directory / f'ticket_{number:012d}_{uuid4().hex[:12]}'
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), 'requested': requested}, f)
+        return path
+
+    def _write_ticket(self, path: Path, requested: float, granted: float,
+                      expires: float) -> None:
+        """Records lease grant into ticket (which must still exist)"""
+        # A discarded ticket is not created again
+        fd = os.open(path, os.O_WRONLY | os.O_TRUNC)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    'pid': os.getpid(),
+                    'requested': requested,
+                    'granted': granted,
+                    'expires': expires
+                }, f)
+
+    def _head(self, directory: Path) -> Optional[Path]:
+        """Gets the first valid ticket, discarding stale ones"""
+        for _, path in self._tickets(directory):
+            if not self._stale(path):
+                return path
+            self._remove(path)
+        return None
+
+    def _stale(self, path: Path) -> bool:
+        """Checks if a ticket has been abandoned or its lease has expired"""
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return False  # Removed concurrently or not accessible
+        try:
+            with open(path, encoding='utf-8') as f:
+                content = json.load(f)
+        except FileNotFoundError:
+            return False  # Removed concurrently
+        except (OSError, ValueError):
+            # Ticket being written
+            return time() - mtime > self.stale_timeout
+        pid = content.get('pid')
+        if pid != os.getpid() and isinstance(pid, int) and not _pid_alive(pid):
+            return True
+        if 'expires' in content:
+            # Renewal postpones expiry through modification time
+            return time() > max(float(content['expires']), mtime)
+        return time() - mtime > self.stale_timeout
+
+    def _remove(self, path: Path) -> None:
+        """Removes a ticket"""
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _release(self, lease: Lease) -> None:
+        """Removes lease ticket and logs the lease"""
+        released = time()
+        self._remove(lease._ticket)
+        path = lease._ticket.parent / 'history.jsonl'
+        line = json.dumps(
+            [os.getpid(), lease.requested, lease.granted,
+             min(released, lease.expires)])
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+        except OSError:
+            pass
@@ -5,6 +5,18 @@ from typing import Union
 from warnings import warn
 
 
+# Status codes reported as UserWarning instead of raising an exception
+_user_warnings = frozenset({
+    CTS3ErrorCode.ERR_TIME_FDT_MAX.value,
+    CTS3ErrorCode.ERR_TIME_FDT_MIN.value,
+    CTS3ErrorCode.ERR_TIME_TR1_MAX.value,
+    CTS3ErrorCode.ERR_TIME_TR1_MIN.value,
+    CTS3ErrorCode.ERR_PHASE_DRIFT.value,
+    CTS3ErrorCode.ERR_ADJUST_THRESHOLD_RF_FIELD.value,
+    CTS3ErrorCode.RET_INCOMPATIBLE_BOOT_VERSION.value
+})
+
+
 class CTS3Exception(Exception):
     """
     CTS3 exception
@@ -34,21 +46,17 @@ class CTS3Exception(Exception):
         Args:
             status: CTS3 status
         """
-        try:
-            ret = CTS3ErrorCode(status)
-        except ValueError:
-            raise CTS3Exception(f'Unknown error code 0x{status:04x}')
-        if (ret == CTS3ErrorCode.ERR_TIME_FDT_MAX
-                or ret == CTS3ErrorCode.ERR_TIME_FDT_MIN
-                or ret == CTS3ErrorCode.ERR_TIME_TR1_MAX
-                or ret == CTS3ErrorCode.ERR_TIME_TR1_MIN
-                or ret == CTS3ErrorCode.ERR_PHASE_DRIFT
-                or ret == CTS3ErrorCode.ERR_ADJUST_THRESHOLD_RF_FIELD
-                or ret == CTS3ErrorCode.RET_INCOMPATIBLE_BOOT_VERSION):
+        if status == 0:  # RET_OK
+            return
+        if status in _user_warnings:
             warn(GetErrorMessageFromCode(status), UserWarning, 3)
-        elif ret == CTS3ErrorCode.ERR_NO_VALID_ATR_REQ_RECEIVED:
+        elif status == CTS3ErrorCode.ERR_NO_VALID_ATR_REQ_RECEIVED:
             warn(GetErrorMessageFromCode(status), Warning, 3)
-        elif ret != CTS3ErrorCode.RET_OK:
+        else:
+            try:
+                ret = CTS3ErrorCode(status)
+            except ValueError:
+                raise CTS3Exception(f'Unknown error code 0x{status:04x}')
             raise CTS3Exception(ret)
 
 
@@ -90,3 +98,29 @@ class CTS3MifareException(Exception):
             raise CTS3MifareException(MifareErrorCode(error.value))
         if status > 1:
             raise CTS3Exception(CTS3ErrorCode(status))
+
+
+class CTS3TimeoutException(CTS3Exception):
+    """
+    CTS3 command aborted by a watchdog
+
+    Attributes:
+        host: Host of the device on which the command was aborted
+        timeout: Watchdog timeout in s
+    """
+
+    def __init__(self, host: str, timeout: float):
+        """
+        Inits CTS3TimeoutException
+
+        Args:
+            host: Host of the device on which the command was aborted
+            timeout: Watchdog timeout in s
+        """
+        CTS3Exception.__init__(
+            self, f'Command aborted on {host} after {timeout} s timeout')
+        self.host = host
+        self.timeout = timeout
+
+    def __reduce__(self):  # type: ignore[no-untyped-def]
+        return (CTS3TimeoutException, (self.host, self.timeout))
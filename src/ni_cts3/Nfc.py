@@ -2,13 +2,14 @@ from warnings import warn
 from pathlib import Path
 from typing import Dict, Union, Optional, List, Tuple, Callable, cast, overload
 from enum import IntEnum, IntFlag, unique
-from . import _MPuLib, _MPuLib_variadic, _check_limits, _get_connection_string
+from . import (_MPuLib, _MPuLib_variadic, _check_limits, _check_limits_list,
+               _get_connection_string, _OutputBuffer, _rx_buffer)
 from .MPStatus import CTS3ErrorCode
 from .MPException import CTS3Exception, CTS3MifareException
 from ctypes import (c_uint8, c_int16, c_uint16, c_int32, c_uint32, c_uint64,
                     c_bool, c_char, c_char_p, c_int, c_float, c_double,
-                    c_size_t, Structure, Union as C_Union, byref, POINTER,
-                    CFUNCTYPE)
+                    c_size_t, Structure, Union as C_Union, Array, byref,
+                    POINTER, CFUNCTYPE)
 
 _callback_dict: Dict[str, Optional[Callable[
     [c_uint32, c_uint32, c_char_p, c_size_t], c_int32]]] = {}
@@ -445,9 +446,31 @@ def MPC_SelectDataRate(pcd_data_rate: DataRate,
                                    c_uint16(picc_data_rate)))
 
 
+@overload
 def MPC_ExchangeCmd(
         tx_frame: bytes,
         tx_bits_number: Optional[int] = None) -> Dict[str, Union[bytes, int]]:
+    ...
+
+
+@overload
+def MPC_ExchangeCmd(
+        tx_frame: bytes, tx_bits_number: Optional[int], *,
+        rx_buffer: Union[bytearray,
+                         memoryview]) -> Dict[str, Union[memoryview, int]]:
+    ...
+
+
+@overload
+def MPC_ExchangeCmd(
+        tx_frame: bytes, *,
+        rx_buffer: Union[bytearray,
+                         memoryview]) -> Dict[str, Union[memoryview, int]]:
+    ...
+
+
+def MPC_ExchangeCmd(  # type: ignore[no-untyped-def]
+        tx_frame, tx_bits_number=None, *, rx_buffer=None):
     """
     Exchanges a low level command
 
@@ -455,15 +478,21 @@ def MPC_ExchangeCmd(
         tx_frame: Frame to transmit
         tx_bits_number: Number of bits to transmit
         (8 × tx_frame length if None)
+        rx_buffer: Writable buffer of at least 5000 bytes receiving the frame
+        (None to allocate a new frame)
 
     Returns:
         Dictionary made of:
-        - 'rx_frame': Received frame (bytes)
+        - 'rx_frame': Received frame (bytes, or memoryview of rx_buffer)
         - 'rx_bits_number': Number of received bits (int)
     """
     if tx_frame and not isinstance(tx_frame, bytes):
         raise TypeError('tx_frame must be an instance of bytes')
-    data = bytes(5000)
+    data: Union[bytes, 'Array[c_char]']
+    if rx_buffer is None:
+        data = bytes(5000)
+    else:
+        rx_view, data = _rx_buffer(rx_buffer, 5000, 'rx_buffer')
     rx_bits = c_uint32()
     if tx_frame:
         if tx_bits_number is None:
@@ -480,6 +509,11 @@ def MPC_ExchangeCmd(
     bytes_number = int(rx_bits.value / 8)
     if rx_bits.value % 8 > 0:
         bytes_number += 1
+    if rx_buffer is not None:
+        return {
+            'rx_frame': rx_view[:bytes_number],
+            'rx_bits_number': rx_bits.value
+        }
     return {'rx_frame': data[:bytes_number], 'rx_bits_number': rx_bits.value}
 
 
@@ -488,26 +522,48 @@ def MPC_DeselectSequence() -> None:
     CTS3Exception._check_error(_MPuLib.MPC_DeselectSequence(c_uint8(0)))
 
 
+@overload
 def MPC_SendFrameProtocol(tx_frame: bytes) -> bytes:
+    ...
+
+
+@overload
+def MPC_SendFrameProtocol(
+        tx_frame: bytes, *, rx_buffer: Union[bytearray,
+                                             memoryview]) -> memoryview:
+    ...
+
+
+def MPC_SendFrameProtocol(  # type: ignore[no-untyped-def]
+        tx_frame, *, rx_buffer=None):
     """
     Exchanges an ISO14443-4 frame
 
     Args:
         tx_frame: Frame to transmit
+        rx_buffer: Writable buffer of at least 65535 bytes receiving the frame
+        (None to allocate a new frame)
 
     Returns:
-        Received frame
+        Received frame (bytes, or memoryview of rx_buffer)
     """
-    data = bytes(0xFFFF)
     length = c_uint32()
     if not isinstance(tx_frame, bytes):
         raise TypeError('tx_frame must be an instance of bytes')
     _check_limits(c_uint32, len(tx_frame), 'tx_frame')
-    CTS3Exception._check_error(
-        _MPuLib.MPC_SendFrameProtocol(c_uint8(0), tx_frame,
-                                      c_uint32(len(tx_frame)), data,
-                                      byref(length)))
-    return data[:length.value]
+    if rx_buffer is not None:
+        rx_view, data = _rx_buffer(rx_buffer, 0xFFFF, 'rx_buffer')
+        CTS3Exception._check_error(
+            _MPuLib.MPC_SendFrameProtocol(c_uint8(0), tx_frame,
+                                          c_uint32(len(tx_frame)), data,
+                                          byref(length)))
+        return rx_view[:length.value]
+    with _OutputBuffer(0xFFFF) as data:
+        CTS3Exception._check_error(
+            _MPuLib.MPC_SendFrameProtocol(c_uint8(0), tx_frame,
+                                          c_uint32(len(tx_frame)), data,
+                                          byref(length)))
+        return data[:length.value]
 
 
 def MPC_SendAPDU(header: Union[bytes, int],
@@ -1251,27 +1307,25 @@ def MPC_FelicaCheck(idm, service_codes,
             'blocks must be an instance of FelicaBlock list or int list')
     _check_limits(c_uint8, len(blocks), 'blocks')
 
-    services_list = (c_uint16 * len(service_codes))()
-    for i in range(len(service_codes)):
-        if isinstance(service_codes[i], FelicaService):
-            services_list[i] = c_uint16(service_codes[i]._get_int())
-        elif isinstance(service_codes[i], int):
-            _check_limits(c_uint16, service_codes[i], 'service_codes')
-            services_list[i] = c_uint16(service_codes[i])
-        else:
-            raise TypeError(
-                'service_codes must be an instance of FelicaService list '
-                'or int list')
-    blocks_list = (c_uint32 * len(blocks))()
-    for i in range(len(blocks)):
-        if isinstance(blocks[i], FelicaBlock):
-            blocks_list[i] = c_uint32(blocks[i]._get_int())
-        elif isinstance(blocks[i], int):
-            _check_limits(c_uint32, blocks[i], 'blocks')
-            blocks_list[i] = c_uint32(blocks[i])
-        else:
-            raise TypeError(
-                'blocks must be an instance of FelicaBlock list or int list')
+    services = [
+        service._get_int() if isinstance(service, FelicaService) else service
+        for service in service_codes
+    ]
+    if any(not isinstance(service, int) for service in services):
+        raise TypeError(
+            'service_codes must be an instance of FelicaService list '
+            'or int list')
+    _check_limits_list(c_uint16, services, 'service_codes')
+    services_list = (c_uint16 * len(services))(*services)
+    blocks_values = [
+        block._get_int() if isinstance(block, FelicaBlock) else block
+        for block in blocks
+    ]
+    if any(not isinstance(block, int) for block in blocks_values):
+        raise TypeError(
+            'blocks must be an instance of FelicaBlock list or int list')
+    _check_limits_list(c_uint32, blocks_values, 'blocks')
+    blocks_list = (c_uint32 * len(blocks_values))(*blocks_values)
 
     data = bytes(16 * len(blocks))
     idm2 = bytes(8)
@@ -1363,27 +1417,25 @@ def MPC_FelicaUpdate(idm, service_codes, blocks,
             not isinstance(i, bytes) or len(i) != 16 for i in data):
         raise TypeError('blocks_data must be an instance of 16-byte list')
 
-    services_list = (c_uint16 * len(service_codes))()
-    for i in range(len(service_codes)):
-        if isinstance(service_codes[i], FelicaService):
-            services_list[i] = c_uint16(service_codes[i]._get_int())
-        elif isinstance(service_codes[i], int):
-            _check_limits(c_uint16, service_codes[i], 'service_codes')
-            services_list[i] = c_uint16(service_codes[i])
-        else:
-            raise TypeError(
-                'service_codes must be an instance of FelicaService list '
-                'or int list')
-    blocks_list = (c_uint32 * len(blocks))()
-    for i in range(len(blocks)):
-        if isinstance(blocks[i], FelicaBlock):
-            blocks_list[i] = c_uint32(blocks[i]._get_int())
-        elif isinstance(blocks[i], int):
-            _check_limits(c_uint32, blocks[i], 'blocks')
-            blocks_list[i] = c_uint32(blocks[i])
-        else:
-            raise TypeError(
-                'blocks must be an instance of FelicaBlock list or int list')
+    services = [
+        service._get_int() if isinstance(service, FelicaService) else service
+        for service in service_codes
+    ]
+    if any(not isinstance(service, int) for service in services):
+        raise TypeError(
+            'service_codes must be an instance of FelicaService list '
+            'or int list')
+    _check_limits_list(c_uint16, services, 'service_codes')
+    services_list = (c_uint16 * len(services))(*services)
+    blocks_values = [
+        block._get_int() if isinstance(block, FelicaBlock) else block
+        for block in blocks
+    ]
+    if any(not isinstance(block, int) for block in blocks_values):
+        raise TypeError(
+            'blocks must be an instance of FelicaBlock list or int list')
+    _check_limits_list(c_uint32, blocks_values, 'blocks')
+    blocks_list = (c_uint32 * len(blocks_values))(*blocks_values)
 
     idm2 = bytes(8)
     status1 = c_uint8()
@@ -2246,16 +2298,12 @@ def MPC_SetModulationShape(pattern_index: int,
             not isinstance(i, int) for i in rising_edge_per_mille):
         raise TypeError(
             'rising_edge_per_mille must be an instance of integers list')
-    falling = (c_uint16 * len(falling_edge_per_mille))()
-    for i in range(len(falling_edge_per_mille)):
-        _check_limits(c_uint16, falling_edge_per_mille[i],
-                      'falling_edge_per_mille')
-        falling[i] = c_uint16(falling_edge_per_mille[i])
-    rising = (c_uint16 * len(rising_edge_per_mille))()
-    for i in range(len(rising_edge_per_mille)):
-        _check_limits(c_uint16, rising_edge_per_mille[i],
-                      'rising_edge_per_mille')
-        rising[i] = c_uint16(rising_edge_per_mille[i])
+    _check_limits_list(c_uint16, falling_edge_per_mille,
+                       'falling_edge_per_mille')
+    falling = (c_uint16 * len(falling_edge_per_mille))(*falling_edge_per_mille)
+    _check_limits_list(c_uint16, rising_edge_per_mille,
+                       'rising_edge_per_mille')
+    rising = (c_uint16 * len(rising_edge_per_mille))(*rising_edge_per_mille)
     CTS3Exception._check_error(
         _MPuLib.MPC_SetModulationShape(c_uint8(pattern_index),
                                        c_uint32(len(falling_edge_per_mille)),
@@ -3682,11 +3730,9 @@ def MPC_LoadDisturbanceWaveshape(operation: DisturbanceOperation,
     if not isinstance(data, list):
         raise TypeError('data must be an instance of integers list')
     _check_limits(c_uint32, len(data), 'data')
-    data_array = (c_int16 * len(data))()
-    for i in range(len(data)):
-        value_pm = round(data[i] * 10)
-        _check_limits(c_int16, value_pm, 'data')
-        data_array[i] = c_int16(value_pm)
+    data_pm = [round(value * 10) for value in data]
+    _check_limits_list(c_int16, data_pm, 'data')
+    data_array = (c_int16 * len(data_pm))(*data_pm)
     CTS3Exception._check_error(
         _MPuLib.MPC_LoadDisturbanceWaveshape(c_uint8(0), c_uint8(operation),
                                              c_uint32(timebase),
@@ -0,0 +1,329 @@
+from json import dumps
+from threading import Lock
+from time import perf_counter
+from typing import Dict, List, Tuple, Optional, Any
+from . import _hook_library, _current_host
+
+# Histogram resolution: 16 sub-buckets per power of 2 (~6 % precision)
+_SUB_BUCKET_BITS = 4
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+
+
+def _bucket_index(value_ns: int) -> int:
+    """
+    Gets the histogram bucket of a duration
+
+    Args:
+        value_ns: Duration in ns
+
+    Returns:
+        Bucket index
+    """
+    if value_ns < _SUB_BUCKETS:
+        return value_ns
+    shift = value_ns.bit_length() - _SUB_BUCKET_BITS - 1
+    return (shift + 1) * _SUB_BUCKETS + (value_ns >> shift) - _SUB_BUCKETS
+
+
+def _bucket_upper_bound(index: int) -> int:
+    """
+    Gets the highest duration of a histogram bucket
+
+    Args:
+        index: Bucket index
+
+    Returns:
+        Highest duration in ns
+    """
+    if index < _SUB_BUCKETS:
+        return index
+    shift = index // _SUB_BUCKETS - 1
+    return ((_SUB_BUCKETS + index % _SUB_BUCKETS + 1) << shift) - 1
+
+
+class CallStatistics:
+    """
+    MPuLib function call statistics
+
+    Attributes:
+        function: MPuLib function name
+        device: Host of the communication channel used for the calls
+        count: Number of calls
+        total_time: Cumulative call duration in s
+        min_time: Shortest call duration in s
+        max_time: Longest call duration in s
+        histogram: List of (bucket upper bound in s, calls count) pairs
+    """
+
+    def __init__(self, function: str, device: str, count: int,
+                 total_time: float, min_time: float, max_time: float,
+                 histogram: List[Tuple[float, int]]):
+        """
+        Inits CallStatistics
+
+        Args:
+            function: MPuLib function name
+            device: Host of the communication channel used for the calls
+            count: Number of calls
+            total_time: Cumulative call duration in s
+            min_time: Shortest call duration in s
+            max_time: Longest call duration in s
+            histogram: List of (bucket upper bound in s, calls count) pairs
+        """
+        self.function = function
+        self.device = device
+        self.count = count
+        self.total_time = total_time
+        self.min_time = min_time
+        self.max_time = max_time
+        self.histogram = histogram
+
+    @property
+    def mean_time(self) -> float:
+        """Mean call duration in s"""
+        return self.total_time / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """
+        Estimates a call duration percentile
+
+        Args:
+            percent: Percentile to estimate (between 0 and 100)
+
+        Returns:
+            Upper bound of the bucket containing the percentile in s
+        """
+        if percent < 0.0 or percent > 100.0:
+            raise ValueError('percent must be between 0 and 100')
+        threshold = self.count * percent / 100.0
+        total = 0
+        for upper_bound, count in self.histogram:
+            total += count
+            if total >= threshold:
+                return min(upper_bound, self.max_time)
+        return self.max_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts statistics into a dictionary
+
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            'function': self.function,
+            'device': self.device,
+            'count': self.count,
+            'total_time': self.total_time,
+            'min_time': self.min_time,
+            'max_time': self.max_time,
+            'mean_time': self.mean_time,
+            'p50': self.percentile(50.0),
+            'p99': self.percentile(99.0),
+            'histogram': [[bound, count] for bound, count in self.histogram]
+        }
+
+
+class _CallRecorder:
+    """Statistics accumulator of one function on one device"""
+    __slots__ = ('count', 'total_ns', 'min_ns', 'max_ns', 'buckets')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = -1
+        self.max_ns = 0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, duration_ns: int) -> None:
+        self.count += 1
+        self.total_ns += duration_ns
+        if self.min_ns < 0 or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        index = _bucket_index(duration_ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+
+_lock = Lock()
+_recorders: Dict[Tuple[str, str], _CallRecorder] = {}
+_enabled = False
+
+
+def _record(function: str, duration: float) -> None:
+    """
+    Records a function call
+
+    Args:
+        function: MPuLib function name
+        duration: Call duration in s
+    """
+    key = (function, _current_host())
+    with _lock:
+        recorder = _recorders.get(key)
+        if recorder is None:
+            recorder = _recorders[key] = _CallRecorder()
+        recorder.add(int(duration * 1e9))
+
+
+class _ProfiledFunction:
+    """MPuLib function wrapper measuring call duration"""
+    __slots__ = ('_name', '_func')
+
+    def __init__(self, name: str, func: Any):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_func', func)
+
+    def __call__(self, *args: Any) -> Any:
+        start = perf_counter()
+        try:
+            return self._func(*args)
+        finally:
+            _record(self._name, perf_counter() - start)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._func, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Forwards restype/argtypes configuration to library function
+        setattr(self._func, name, value)
+
+
+def _unwrap(func: Any) -> Optional[Any]:
+    """
+    Gets the library function wrapped by a profiling wrapper
+
+    Args:
+        func: Library attribute
+
+    Returns:
+        Wrapped function, or None if func is not a profiling wrapper
+    """
+    if isinstance(func, _ProfiledFunction):
+        return func._func
+    return None
+
+
+def enable_profiling(reset: bool = False) -> None:
+    """
+    Starts measuring MPuLib calls
+
+    Args:
+        reset: True to clear previously recorded statistics
+    """
+    global _enabled
+    if reset:
+        reset_profiling()
+    _hook_library(_ProfiledFunction, _unwrap)
+    _enabled = True
+
+
+def disable_profiling() -> None:
+    """Stops measuring MPuLib calls (recorded statistics are kept)"""
+    global _enabled
+    _hook_library(None, _unwrap)
+    _enabled = False
+
+
+def is_profiling_enabled() -> bool:
+    """
+    Indicates whether MPuLib calls are measured
+
+    Returns:
+        True if profiling is enabled
+    """
+    return _enabled
+
+
+def reset_profiling() -> None:
+    """Clears recorded statistics"""
+    with _lock:
+        _recorders.clear()
+
+
+def get_profiling_snapshot() -> List[CallStatistics]:
+    """
+    Gets recorded statistics
+
+    Returns:
+        Statistics per function and per device,
+        sorted by decreasing cumulative duration
+    """
+    with _lock:
+        items = [(key, recorder.count, recorder.total_ns, recorder.min_ns,
+                  recorder.max_ns, sorted(recorder.buckets.items()))
+                 for key, recorder in _recorders.items()]
+    snapshot = [
+        CallStatistics(function, device, count, total_ns / 1e9,
+                       max(min_ns, 0) / 1e9, max_ns / 1e9,
+                       [(_bucket_upper_bound(index) / 1e9, bucket_count)
+                        for index, bucket_count in buckets])
+        for (function, device), count, total_ns, min_ns, max_ns, buckets in
+        items
+    ]
+    snapshot.sort(key=lambda stats: stats.total_time, reverse=True)
+    return snapshot
+
+
+def export_json(snapshot: Optional[List[CallStatistics]] = None,
+                indent: Optional[int] = None) -> str:
+    """
+    Exports statistics in JSON format
+
+    Args:
+        snapshot: Statistics to export (None to export current statistics)
+        indent: JSON indentation level
+
+    Returns:
+        JSON document
+    """
+    if snapshot is None:
+        snapshot = get_profiling_snapshot()
+    return dumps([stats.to_dict() for stats in snapshot], indent=indent)
+
+
+def _escape_label(value: str) -> str:
+    """
+    Escapes a Prometheus label value
+
+    Args:
+        value: Label value
+
+    Returns:
+        Escaped label value
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n')
+
+
+def export_prometheus(snapshot: Optional[List[CallStatistics]] = None,
+                      metric: str = 'ni_cts3_call_duration_seconds') -> str:
+    """
+    Exports statistics in Prometheus text format
+
+    Args:
+        snapshot: Statistics to export (None to export current statistics)
+        metric: Histogram metric name
+
+    Returns:
+        Prometheus text exposition
+    """
+    if snapshot is None:
+        snapshot = get_profiling_snapshot()
+    lines = [
+        f'# HELP {metric} MPuLib function call duration',
+        f'# TYPE {metric} histogram'
+    ]
+    for stats in snapshot:
+        labels = (f'function="{_escape_label(stats.function)}",'
+                  f'device="{_escape_label(stats.device)}"')
+        cumulative = 0
+        for upper_bound, count in stats.histogram:
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{labels},le="{upper_bound:.9g}"}} '
+                         f'{cumulative}')
+        lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {stats.count}')
+        lines.append(f'{metric}_sum{{{labels}}} {stats.total_time:.9g}')
+        lines.append(f'{metric}_count{{{labels}}} {stats.count}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,225 @@
+import json
+import os
+from bisect import bisect_left
+from hashlib import sha1
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Union
+from . import (GetRemoteHelp, MPS_ListVersions, _current_host,
+               _invalidation_hooks)
+
+
+class RemoteHelpIndex:
+    """
+    Remote commands catalogue
+
+    Attributes:
+        version: Firmware version the catalogue refers to
+        commands: Sorted remote commands list
+    """
+
+    def __init__(self, version: str, help: Dict[str, str]):
+        """
+        Inits RemoteHelpIndex
+
+        Args:
+            version: Firmware version the catalogue refers to
+            help: Command/Description pairs dictionary
+        """
+        self.version = version
+        self.commands: List[str] = sorted(help)
+        self._help = help
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.commands)
+
+    def __contains__(self, command: object) -> bool:
+        return command in self._help
+
+    def __getitem__(self, command: str) -> str:
+        return self._help[command]
+
+    def describe(self, command: str) -> Optional[str]:
+        """
+        Gets a remote command description
+
+        Args:
+            command: Remote command
+
+        Returns:
+            Command description, or None if command is unknown
+        """
+        return self._help.get(command)
+
+    def lookup(self, prefix: str) -> Dict[str, str]:
+        """
+        Gets remote commands starting with a prefix
+
+        Args:
+            prefix: Remote command prefix
+
+        Returns:
+            Command/Description pairs dictionary
+        """
+        commands = self.commands
+        start = bisect_left(commands, prefix)
+        end = start
+        while end < len(commands) and commands[end].startswith(prefix):
+            end += 1
+        return {cmd: self._help[cmd] for cmd in commands[start:end]}
+
+    def to_dict(self) -> Dict[str, str]:
+        """
+        Gets the whole catalogue
+
+        Returns:
+            Command/Description pairs dictionary
+        """
+        return dict(self._help)
+
+
+_lock = Lock()
+
+# Catalogues by firmware version
+_indexes: Dict[str, RemoteHelpIndex] = {}
+
+# Firmware version by host
+_host_versions: Dict[str, str] = {}
+
+
+def _forget_host(host: str) -> None:
+    """Drops firmware version known for a host"""
+    with _lock:
+        _host_versions.pop(host, None)
+
+
+_invalidation_hooks.append(_forget_host)
+
+
+def _firmware_version() -> str:
+    """
+    Gets the firmware version running on current device
+
+    Returns:
+        Version string used as cache key
+    """
+    host = _current_host()
+    with _lock:
+        version = _host_versions.get(host)
+    if version is None:
+        active = MPS_ListVersions(0)['active_partition']
+        versions = MPS_ListVersions(int(active))
+        version = '/'.join(
+            str(versions[key])
+            for key in ('os_version', 'application_version', 'fpga_version',
+                        'daq_version'))
+        with _lock:
+            _host_versions[host] = version
+    return version
+
+
+def _cache_path(cache_dir: Path, version: str) -> Path:
+    """Gets catalogue cache file path"""
+    digest = sha1(version.encode('utf-8')).hexdigest()[:16]
+    return cache_dir / f'remote_help_{digest}.json'
+
+
+def _load(path: Path, version: str) -> Optional[Dict[str, str]]:
+    """Loads a catalogue from cache file"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == version and isinstance(
+                cache.get('help'), dict):
+            return cache['help']  # type: ignore[no-any-return]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def _save(path: Path, version: str, help: Dict[str, str]) -> None:
+    """Saves a catalogue to cache file"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'help': help}, f)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+def get_remote_help_index(
+        cache_dir: Union[str, Path, None] = None) -> RemoteHelpIndex:
+    """
+    Gets the remote commands catalogue of current device
+
+    The catalogue is cached in memory and on disk for each firmware version,
+    and is read from the device only when its firmware version is unknown.
+
+    Args:
+        cache_dir: Cache directory ('~/.cache/ni_cts3' if None)
+
+    Returns:
+        Remote commands catalogue
+    """
+    version = _firmware_version()
+    with _lock:
+        index = _indexes.get(version)
+    if index is not None:
+        return index
+    if cache_dir is None:
+        directory = Path.home() / '.cache' / 'ni_cts3'
+    else:
+        directory = Path(cache_dir)
+    path = _cache_path(directory, version)
+    help = _load(path, version)
+    if help is None:
+        help = GetRemoteHelp()
+        _save(path, version, help)
+    index = RemoteHelpIndex(version, help)
+    with _lock:
+        return _indexes.setdefault(version, index)
+
+
+def get_remote_help(
+        remote: Optional[str] = None,
+        cache_dir: Union[str, Path, None] = None) -> Dict[str, str]:
+    """
+    Gets remote command help message from cache
+
+    Args:
+        remote: Remote command or command prefix (None for all commands)
+        cache_dir: Cache directory ('~/.cache/ni_cts3' if None)
+
+    Returns:
+        Command/Description pairs dictionary
+    """
+    if remote is not None and not isinstance(remote, str):
+        raise TypeError('remote must be an instance of str')
+    index = get_remote_help_index(cache_dir)
+    return index.lookup(remote) if remote else index.to_dict()
+
+
+def clear_remote_help_cache(cache_dir: Union[str, Path, None] = None) -> None:
+    """
+    Clears remote commands catalogue cache
+
+    Args:
+        cache_dir: Cache directory ('~/.cache/ni_cts3' if None)
+    """
+    with _lock:
+        _indexes.clear()
+        _host_versions.clear()
+    if cache_dir is None:
+        directory = Path.home() / '.cache' / 'ni_cts3'
+    else:
+        directory = Path(cache_dir)
+    for path in directory.glob('remote_help_*.json'):
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,469 @@
+import json
+import os
+import re
+import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum, unique
+from ipaddress import IPv4Address
+from math import isnan, nan
+from pathlib import Path
+from time import time, perf_counter
+from uuid import uuid4
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Tuple,
+                    Union, NamedTuple)
+from . import MPS_CPUAutoTest, CpuAutotestId
+from .Daq import MPS_DaqAutoTest, DaqAutotestId
+from .Nfc import MPS_CPLAutoTest, CplAutotestId
+from .Device import Device
+
+
+@unique
+class SelfTestVerdict(IntEnum):
+    """Self-test verdict"""
+    UNKNOWN = 0
+    PASS = 1
+    WARNING = 2
+    FAIL = 3
+    ERROR = 4
+
+
+class SelfTestRecord(NamedTuple):
+    """
+    Self-test result
+
+    Attributes:
+        timestamp: Campaign time (as returned by time.time)
+        host: Device host name or IP address
+        suite: Self-test suite ('cpu', 'daq' or 'cpl')
+        test: Test identifier
+        verdict: Test verdict
+        value: Measured value (None if not reported)
+        low: Lower limit (None if not reported)
+        high: Upper limit (None if not reported)
+        raw: Tab-separated result line
+    """
+    timestamp: float
+    host: str
+    suite: str
+    test: str
+    verdict: SelfTestVerdict
+    value: Optional[float]
+    low: Optional[float]
+    high: Optional[float]
+    raw: str
+
+    @property
+    def margin(self) -> Optional[float]:
+        """
+        Distance from measured value to nearest limit, relative to the
+        limits range (0 at limit, 0.5 at center, negative when out of range)
+        """
+        if self.value is None or self.low is None or self.high is None:
+            return None
+        span = self.high - self.low
+        if span <= 0:
+            return None
+        return min(self.value - self.low, self.high - self.value) / span
+
+
+class SelfTestCampaign(NamedTuple):
+    """
+    Self-test campaign result
+
+    Attributes:
+        records: Results of all devices
+        errors: Error which stopped each failed device
+        durations: Self-test duration of each device in s
+    """
+    records: List[SelfTestRecord]
+    errors: Dict[str, BaseException]
+    durations: Dict[str, float]
+
+    @property
+    def failed(self) -> List[SelfTestRecord]:
+        """Records with a fail or error verdict"""
+        return [r for r in self.records
+                if r.verdict in (SelfTestVerdict.FAIL, SelfTestVerdict.ERROR)]
+
+
+# Self-test function and default test identifier of each suite
+_SUITES: Dict[str, Tuple[Callable[..., List[List[str]]], IntEnum]] = {
+    'cpu': (MPS_CPUAutoTest, CpuAutotestId.TEST_CPU_ALL),
+    'daq': (MPS_DaqAutoTest, DaqAutotestId.TEST_DAQ_ALL),
+    'cpl': (MPS_CPLAutoTest, CplAutotestId.TEST_CPL_ALL),
+}
+
+_NUMBER = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+                     r'\s*[a-zA-Z%/]*\s*$')
+# Negated verdicts are matched first
+_VERDICTS = (
+    (re.compile(r'\b(not|never)\s+(pass(ed)?|ok|success(ful)?)\b|'
+                r'\bunsuccessful\b', re.I), SelfTestVerdict.FAIL),
+    (re.compile(r'\bno\s+(fail(ed|ures?)?|errors?)\b|\bnot\s+failed\b',
+                re.I), SelfTestVerdict.PASS),
+    (re.compile(r'\b(fail(ed|ure)?|error|ko|nok)\b', re.I),
+     SelfTestVerdict.FAIL),
+    (re.compile(r'\bwarn(ing)?\b', re.I), SelfTestVerdict.WARNING),
+    (re.compile(r'\b(pass(ed)?|ok|success(ful)?)\b', re.I),
+     SelfTestVerdict.PASS),
+)
+
+
+def _parse_number(field: str) -> Optional[float]:
+    """Parses a numeric field, with optional unit"""
+    match = _NUMBER.match(field)
+    return float(match.group(1)) if match else None
+
+
+def _parse_verdict(field: str) -> SelfTestVerdict:
+    """Parses a verdict field"""
+    for pattern, verdict in _VERDICTS:
+        if pattern.search(field):
+            return verdict
+    return SelfTestVerdict.UNKNOWN
+
+
+def parse_self_test(host: str, suite: str, rows: List[List[str]],
+                    timestamp: Optional[float] = None
+                    ) -> List[SelfTestRecord]:
+    """
+    Parses self-test function results
+
+    Each line is made of a test identifier, a verdict and, optionally,
+    the measured value followed by lower and upper limits. The first text
+    field is the test identifier, even if it contains a verdict word, and
+    the verdict is searched in the next fields. A numeric test identifier
+    is only used when a verdict field comes first.
+
+    Args:
+        host: Device host name or IP address
+        suite: Self-test suite
+        rows: Result of MPS_CPUAutoTest, MPS_DaqAutoTest or MPS_CPLAutoTest
+        timestamp: Campaign time (current time if None)
+
+    Returns:
+        Parsed records
+    """
+    if timestamp is None:
+        timestamp = time()
+    records = []
+    for row in rows:
+        fields = [field.strip() for field in row]
+        if not any(fields):
+            continue
+        test = ''
+        verdict = SelfTestVerdict.UNKNOWN
+        numbers: List[float] = []
+        for field in fields:
+            if not field:
+                continue
+            number = _parse_number(field)
+            if number is not None:
+                numbers.append(number)
+                continue
+            field_verdict = _parse_verdict(field)
+            if not test and not (numbers and
+                                 field_verdict != SelfTestVerdict.UNKNOWN):
+                test = field
+            elif verdict == SelfTestVerdict.UNKNOWN:
+                verdict = field_verdict
+        if not test and numbers:
+            # Numeric test identifier
+            test = f'{numbers.pop(0):g}'
+        value = numbers[0] if numbers else None
+        low, high = (numbers[1], numbers[2]) if len(numbers) >= 3 else (
+            None, None)
+        records.append(
+            SelfTestRecord(timestamp, host, suite, test, verdict, value,
+                           low, high, '\t'.join(row)))
+    return records
+
+
+def _error_record(timestamp: float, host: str, suite: str,
+                  error: BaseException) -> SelfTestRecord:
+    """Gets the record of a suite which could not be run"""
+    return SelfTestRecord(timestamp, host, suite, '', SelfTestVerdict.ERROR,
+                          None, None, None, f'{type(error).__name__}: {error}')
+
+
+def _run_suites(
+    host: str, suites: Dict[str, Optional[IntEnum]], timestamp: float
+) -> Tuple[List[SelfTestRecord], float, Optional[Exception]]:
+    """Runs self-test suites (called from the device thread)"""
+    start = perf_counter()
+    records = []
+    error: Optional[Exception] = None
+    for suite, test_id in suites.items():
+        function, default_id = _SUITES[suite]
+        try:
+            rows = function(default_id if test_id is None else test_id)
+            records += parse_self_test(host, suite, rows, timestamp)
+        except Exception as ex:
+            # Next suites are run anyway
+            records.append(_error_record(timestamp, host, suite, ex))
+            error = ex
+    return records, perf_counter() - start, error
+
+
+def run_self_tests(
+    devices: Iterable[Union[str, IPv4Address, Device]],
+    suites: Union[Iterable[str], Dict[str, Optional[IntEnum]]] = ('cpu',
+                                                                  'daq',
+                                                                  'cpl'),
+    history: Optional['SelfTestHistory'] = None
+) -> SelfTestCampaign:
+    """
+    Runs self-tests concurrently on several devices
+
+    Suites are run in sequence on each device, and devices are tested in
+    parallel on their session thread, once their lock is available. A suite which can not be run is
+    reported with an error verdict.
+
+    Args:
+        devices: Devices, host names or IP addresses
+        suites: Suites to run ('cpu', 'daq', 'cpl'), or dictionary of
+        suite and test identifier (all tests if None)
+        history: History store in which records are appended
+
+    Returns:
+        Campaign result
+    """
+    if isinstance(suites, dict):
+        selected = dict(suites)
+    else:
+        selected = {suite: None for suite in suites}
+    for suite in selected:
+        if suite not in _SUITES:
+            raise ValueError(f"unknown self-test suite '{suite}'")
+    sessions = [(d, False) if isinstance(d, Device) else (Device(d), True)
+                for d in devices]
+    timestamp = time()
+    opened = []
+    errors: Dict[str, BaseException] = {}
+    records: List[SelfTestRecord] = []
+    for device, owned in sessions:
+        try:
+            if owned:
+                device.open()
+            opened.append(device)
+        except Exception as ex:
+            errors[device.host] = ex
+            records += [_error_record(timestamp, device.host, suite, ex)
+                        for suite in selected]
+    durations: Dict[str, float] = {}
+    if opened:
+        with ThreadPoolExecutor(max_workers=len(opened),
+                                thread_name_prefix='CTS3 self-test') as pool:
+            futures = [(device,
+                        pool.submit(device.call, _run_suites, device.host,
+                                    selected, timestamp))
+                       for device in opened]
+            for device, future in futures:
+                try:
+                    device_records, durations[device.host], error = (
+                        future.result())
+                    records += device_records
+                    if error is not None:
+                        errors[device.host] = error
+                except Exception as ex:
+                    errors[device.host] = ex
+                    records += [_error_record(timestamp, device.host, suite,
+                                              ex) for suite in selected]
+    for device, owned in sessions:
+        if owned:
+            try:
+                device.close()
+            except Exception:
+                pass
+    if history is not None and records:
+        history.append(records)
+    return SelfTestCampaign(records, errors, durations)
+
+
+# Column name and array type code ('' for text columns)
+_COLUMNS = (('timestamp', 'd'), ('host', ''), ('suite', ''), ('test', ''),
+            ('verdict', 'b'), ('value', 'd'), ('low', 'd'), ('high', 'd'),
+            ('raw', ''))
+
+
+class SelfTestHistory:
+    """
+    Columnar self-test history store
+
+    Each append writes an immutable segment directory holding one file per
+    column, so queries only read the columns they need and segments out of
+    the requested period are skipped. Segments are renamed into place once
+    complete, which makes concurrent appends from several processes safe.
+
+    Attributes:
+        path: Store directory
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None):
+        """
+        Inits SelfTestHistory
+
+        Args:
+            path: Store directory (user cache subfolder if None)
+        """
+        if path is None:
+            path = Path.home() / '.cache' / 'ni_cts3' / 'selftest'
+        self.path = Path(path)
+
+    def append(self, records: Iterable[SelfTestRecord]) -> None:
+        """
+        Appends records
+
+        Args:
+            records: Records to store
+        """
+        records = list(records)
+        if not records:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        first = min(r.timestamp for r in records)
+        last = max(r.timestamp for r in records)
+        name = f'{int(first * 1e6):020d}_{uuid4().hex[:12]}'
+        temporary = self.path / f'.{name}'
+        temporary.mkdir()
+        for index, (column, code) in enumerate(_COLUMNS):
+            values: List[Any] = [r[index] for r in records]
+            if code:
+                numbers = array(code, [nan if v is None else v
+                                       for v in values])
+                if sys.byteorder == 'big':
+                    numbers.byteswap()
+                (temporary / f'{column}.bin').write_bytes(numbers.tobytes())
+            else:
+                (temporary / f'{column}.txt').write_text(
+                    '\n'.join(values), encoding='utf-8')
+        (temporary / 'meta.json').write_text(json.dumps({
+            'count': len(records),
+            'first': first,
+            'last': last
+        }), encoding='utf-8')
+        os.rename(temporary, self.path / name)
+
+    def query(self,
+              host: Optional[str] = None,
+              suite: Optional[str] = None,
+              test: Optional[str] = None,
+              since: float = 0.0,
+              until: Optional[float] = None) -> List[SelfTestRecord]:
+        """
+        Gets stored records
+
+        Args:
+            host: Device host name or IP address (all if None)
+            suite: Self-test suite (all if None)
+            test: Test identifier (all if None)
+            since: Minimum campaign time (as returned by time.time)
+            until: Maximum campaign time (no limit if None)
+
+        Returns:
+            Records by campaign time
+        """
+        filters = {'host': host, 'suite': suite, 'test': test}
+        records = []
+        for segment, count in self._segments(since, until):
+            # Filter columns are read first to select rows
+            columns: Dict[str, List[Any]] = {
+                'timestamp': self._read(segment, 'timestamp', 'd', count)}
+            rows = [i for i, t in enumerate(columns['timestamp'])
+                    if t >= since and (until is None or t <= until)]
+            for column, wanted in filters.items():
+                if wanted is None or not rows:
+                    continue
+                columns[column] = self._read(segment, column, '', count)
+                rows = [i for i in rows if columns[column][i] == wanted]
+            if not rows:
+                continue
+            for column, code in _COLUMNS:
+                if column not in columns:
+                    columns[column] = self._read(segment, column, code, count)
+            for i in rows:
+                value, low, high = [
+                    None if isnan(columns[c][i]) else columns[c][i]
+                    for c in ('value', 'low', 'high')]
+                records.append(
+                    SelfTestRecord(columns['timestamp'][i],
+                                   columns['host'][i], columns['suite'][i],
+                                   columns['test'][i],
+                                   SelfTestVerdict(columns['verdict'][i]),
+                                   value, low, high, columns['raw'][i]))
+        records.sort(key=lambda r: r.timestamp)
+        return records
+
+    def trend(self,
+              host: str,
+              test: str,
+              suite: Optional[str] = None,
+              since: float = 0.0) -> List[Tuple[float, float]]:
+        """
+        Gets the measured values of a test
+
+        Args:
+            host: Device host name or IP address
+            test: Test identifier
+            suite: Self-test suite (all if None)
+            since: Minimum campaign time (as returned by time.time)
+
+        Returns:
+            List of campaign time and measured value
+        """
+        return [(r.timestamp, r.value)
+                for r in self.query(host, suite, test, since)
+                if r.value is not None]
+
+    def near_limits(self,
+                    margin: float = 0.1,
+                    since: float = 0.0) -> List[SelfTestRecord]:
+        """
+        Gets tests whose last measure is close to or out of its limits
+
+        Args:
+            margin: Relative margin threshold (see SelfTestRecord.margin)
+            since: Minimum campaign time (as returned by time.time)
+
+        Returns:
+            Last record of each drifting test
+        """
+        last: Dict[Tuple[str, str, str], SelfTestRecord] = {}
+        for record in self.query(since=since):
+            last[(record.host, record.suite, record.test)] = record
+        return [r for r in last.values()
+                if r.margin is not None and r.margin < margin]
+
+    def _segments(self, since: float,
+                  until: Optional[float]) -> List[Tuple[Path, int]]:
+        """Lists segments overlapping a period"""
+        segments: List[Tuple[Path, int]] = []
+        if not self.path.is_dir():
+            return segments
+        for segment in sorted(self.path.iterdir()):
+            if segment.name.startswith('.'):
+                continue  # Segment being written
+            try:
+                meta = json.loads(
+                    (segment / 'meta.json').read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            if meta['last'] < since or (until is not None and
+                                        meta['first'] > until):
+                continue
+            segments.append((segment, meta['count']))
+        return segments
+
+    @staticmethod
+    def _read(segment: Path, column: str, code: str,
+              count: int) -> List[Any]:
+        """Reads a segment column"""
+        if not code:
+            text = (segment / f'{column}.txt').read_text(encoding='utf-8')
+            return text.split('\n') if count else []
+        numbers = array(code)
+        numbers.frombytes((segment / f'{column}.bin').read_bytes())
+        if sys.byteorder == 'big':
+            numbers.byteswap()
+        return numbers.tolist()
@@ -0,0 +1,237 @@
+from collections import deque
+from ctypes import c_uint8, c_uint16, byref, create_string_buffer, string_at
+from threading import Thread, Condition, Event
+from time import time, monotonic
+from typing import Any, Deque, Iterator, Optional, Tuple
+from . import _MPuLib
+from .MPException import CTS3Exception
+from .Device import Device
+
+_port = c_uint8(3)
+
+
+class SerialReader:
+    """
+    Serial port background reader
+
+    Data received on AUX.CPU serial port are drained into a bounded buffer.
+    The polling period is halved when data are received and doubled when
+    the port is idle, between min_interval and max_interval. When the buffer
+    is full, the oldest data are dropped and counted in overruns.
+
+    The port is read through the device thread, which owns the
+    communication channel (MPuLib must be used in MULTITHREADED mode).
+
+    Attributes:
+        device: Device session used to read the port
+        capacity: Buffer size in bytes
+        min_interval: Minimum polling period in s
+        max_interval: Maximum polling period in s
+        received: Number of bytes received
+        overruns: Number of bytes dropped because buffer was full
+        error: Error which stopped the reader
+    """
+
+    def __init__(self,
+                 device: Device,
+                 capacity: int = 1024 * 1024,
+                 min_interval: float = 0.0005,
+                 max_interval: float = 0.01):
+        """
+        Inits SerialReader
+
+        Args:
+            device: Device session used to read the port
+            capacity: Buffer size in bytes
+            min_interval: Minimum polling period in s
+            max_interval: Maximum polling period in s
+        """
+        if not isinstance(device, Device):
+            raise TypeError('device must be an instance of Device')
+        if capacity < 1:
+            raise ValueError('capacity must be positive')
+        self.device = device
+        self.capacity = capacity
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.received = 0
+        self.overruns = 0
+        self.error: Optional[CTS3Exception] = None
+        self._buffer = bytearray()
+        # Absolute position of first buffered byte
+        self._position = 0
+        # (absolute position, reception time) of each received chunk
+        self._marks: Deque[Tuple[int, float]] = deque()
+        self._rx = create_string_buffer(0x10000)
+        self._cond = Condition()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def __enter__(self) -> 'SerialReader':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def __iter__(self) -> Iterator[Tuple[float, bytes]]:
+        """
+        Iterates over received lines until the reader is stopped
+
+        Returns:
+            Iterator over (reception time, line) tuples
+        """
+        while True:
+            line = self.readline()
+            if line is None:
+                return
+            yield line
+
+    @property
+    def running(self) -> bool:
+        """True if the reader is running"""
+        return self._thread is not None and not self._stop.is_set()
+
+    @property
+    def available(self) -> int:
+        """Number of buffered bytes"""
+        return len(self._buffer)
+
+    def start(self) -> None:
+        """Starts draining the serial port"""
+        if self.running:
+            return
+        if not self.device.is_open:
+            raise RuntimeError(f'{self.device!r} is not open')
+        if self._thread is not None:
+            # Reader stopped on error
+            self._thread.join()
+        self._stop.clear()
+        self.error = None
+        self._thread = Thread(target=self._run, name='CTS3 serial reader',
+                              daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops draining the serial port (buffered data remain readable)"""
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def read(self,
+             size: int = -1,
+             timeout: Optional[float] = None) -> Tuple[float, bytes]:
+        """
+        Reads buffered data
+
+        Args:
+            size: Maximum number of bytes to read (-1 for all buffered data)
+            timeout: Maximum time to wait for data in s (None to wait
+            until data are received or the reader is stopped)
+
+        Returns:
+            Tuple made of reception time of first byte (0.0 if no data)
+            and data read
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._buffer or not self.running,
+                                timeout)
+            if not self._buffer:
+                return 0.0, b''
+            count = len(self._buffer) if size < 0 else size
+            return self._consume(min(count, len(self._buffer)))
+
+    def readline(self,
+                 timeout: Optional[float] = None
+                 ) -> Optional[Tuple[float, bytes]]:
+        """
+        Reads one line
+
+        Args:
+            timeout: Maximum time to wait for a line in s (None to wait
+            until a line is received or the reader is stopped)
+
+        Returns:
+            Tuple made of reception time of first byte and line
+            (including trailing b'\\n'), or None if no complete line has
+            been received. Data still buffered once the reader is stopped
+            are returned as a last line.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._cond:
+            start = 0
+            while True:
+                end = self._buffer.find(b'\n', start)
+                if end >= 0:
+                    return self._consume(end + 1)
+                start = len(self._buffer)
+                if not self.running:
+                    return self._consume(start) if start else None
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        return None
+                self._cond.wait(remaining)
+
+    def _consume(self, count: int) -> Tuple[float, bytes]:
+        """Removes data from buffer (called with lock held)"""
+        marks = self._marks
+        timestamp = marks[0][1]
+        data = bytes(self._buffer[:count])
+        del self._buffer[:count]
+        self._position += count
+        while len(marks) > 1 and marks[1][0] <= self._position:
+            marks.popleft()
+        if not self._buffer:
+            marks.clear()
+        elif marks[0][0] < self._position:
+            marks[0] = (self._position, marks[0][1])
+        return timestamp, data
+
+    def _store(self, data: bytes, timestamp: float) -> None:
+        """Appends received data to buffer"""
+        with self._cond:
+            self.received += len(data)
+            self._marks.append(
+                (self._position + len(self._buffer), timestamp))
+            self._buffer += data
+            excess = len(self._buffer) - self.capacity
+            if excess > 0:
+                self.overruns += excess
+                self._consume(excess)
+            self._cond.notify_all()
+
+    def _poll(self) -> bytes:
+        """Reads data currently received by the serial port"""
+        count = c_uint16()
+        CTS3Exception._check_error(_MPuLib.MPS_PortStatus(_port,
+                                                          byref(count)))
+        if not count.value:
+            return b''
+        CTS3Exception._check_error(
+            _MPuLib.MPS_PortReceive(_port, self._rx, count))
+        return string_at(self._rx, count.value)
+
+    def _run(self) -> None:
+        """Serial port reader thread"""
+        interval = self.min_interval
+        try:
+            while not self._stop.is_set():
+                data = self.device.call(self._poll)
+                if data:
+                    self._store(data, time())
+                    interval = max(self.min_interval, interval / 2)
+                else:
+                    interval = min(self.max_interval, interval * 2)
+                self._stop.wait(interval)
+        except CTS3Exception as ex:
+            self.error = ex
+        finally:
+            self._stop.set()
+            with self._cond:
+                self._cond.notify_all()
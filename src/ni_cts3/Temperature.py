@@ -0,0 +1,339 @@
+from collections import deque
+from threading import Thread, Condition, Event
+from time import time, monotonic
+from typing import (Any, Callable, Deque, Dict, Iterable, Iterator, List,
+                    Optional, Tuple, TypeVar, NamedTuple)
+from . import MPS_ProbeTemperature, MPS_GetTickCount, TemperatureSensor
+from .ClockSync import ClockSync
+from .Device import Device
+
+_T = TypeVar('_T')
+
+
+class TemperatureSample(NamedTuple):
+    """
+    Temperature sample
+
+    Attributes:
+        timestamp: Host time of the measurement
+        sensor: Sensor identifier
+        temperature: Temperature in °C
+    """
+    timestamp: float
+    sensor: TemperatureSensor
+    temperature: float
+
+
+class TemperatureMonitor:
+    """
+    Background temperature sampler
+
+    All sensors are read in a single device call per period and stored in
+    one ring buffer per sensor. When a clock correlation model is provided,
+    samples are timestamped with the device clock converted to host time.
+
+    A sensor overheats when it exceeds its threshold and cools down when
+    it falls below the threshold minus hysteresis. Campaigns can wait for
+    cooldown or use schedule to postpone heavy tests while overheated.
+
+    Sampling errors are recorded and sampling goes on, unless the device
+    has been closed: sampling then stops and waiters are released.
+
+    Attributes:
+        device: Device session used to read sensors
+        sensors: Sampled sensors
+        interval: Sampling period in s
+        clock_sync: Device clock correlation model used for timestamps
+        hysteresis: Cooldown margin below thresholds in °C
+        on_overheat: Callback called with sensor and temperature when a
+        threshold is exceeded
+        on_cooldown: Callback called with sensor and temperature when a
+        sensor cools down
+        error: Error raised by last background sample or callback
+    """
+
+    def __init__(self,
+                 device: Device,
+                 sensors: Iterable[TemperatureSensor] = tuple(
+                     TemperatureSensor),
+                 interval: float = 1.0,
+                 capacity: int = 3600,
+                 clock_sync: Optional[ClockSync] = None,
+                 thresholds: Optional[Dict[TemperatureSensor, float]] = None,
+                 hysteresis: float = 2.0):
+        """
+        Inits TemperatureMonitor
+
+        Args:
+            device: Device session used to read sensors
+            sensors: Sensors to sample
+            interval: Sampling period in s
+            capacity: Number of samples kept per sensor
+            clock_sync: Device clock correlation model used for timestamps
+            (host time if None)
+            thresholds: Overheat temperature of each sensor in °C
+            hysteresis: Cooldown margin below thresholds in °C
+        """
+        if not isinstance(device, Device):
+            raise TypeError('device must be an instance of Device')
+        if capacity < 1:
+            raise ValueError('capacity must be positive')
+        self.sensors = list(sensors)
+        for sensor in self.sensors:
+            if not isinstance(sensor, TemperatureSensor):
+                raise TypeError(
+                    'sensor must be an instance of TemperatureSensor IntEnum')
+        self.device = device
+        self.interval = interval
+        self.clock_sync = clock_sync
+        self.hysteresis = hysteresis
+        self.on_overheat: Optional[Callable[[TemperatureSensor, float],
+                                            None]] = None
+        self.on_cooldown: Optional[Callable[[TemperatureSensor, float],
+                                            None]] = None
+        self.error: Optional[Exception] = None
+        self._buffers: Dict[TemperatureSensor, Deque[TemperatureSample]] = {
+            sensor: deque(maxlen=capacity) for sensor in self.sensors}
+        self._thresholds: Dict[TemperatureSensor, float] = dict(
+            thresholds or {})
+        self._overheated: Dict[TemperatureSensor, float] = {}
+        self._cond = Condition()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def __enter__(self) -> 'TemperatureMonitor':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        """True if sampling is running"""
+        return self._thread is not None and not self._stop.is_set()
+
+    @property
+    def overheated(self) -> Dict[TemperatureSensor, float]:
+        """Last temperature of each overheated sensor"""
+        with self._cond:
+            return dict(self._overheated)
+
+    def start(self) -> None:
+        """Starts periodic sampling in background"""
+        if self._thread is not None:
+            return
+        if not self.device.is_open:
+            raise RuntimeError(f'{self.device!r} is not open')
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name='CTS3 temperature',
+                              daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops periodic sampling"""
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def set_threshold(self, sensor: TemperatureSensor,
+                      temperature: Optional[float]) -> None:
+        """
+        Sets sensor overheat temperature
+
+        Args:
+            sensor: Sensor identifier
+            temperature: Overheat temperature in °C (None to remove)
+        """
+        with self._cond:
+            if temperature is None:
+                self._thresholds.pop(sensor, None)
+                self._overheated.pop(sensor, None)
+                self._cond.notify_all()
+            else:
+                self._thresholds[sensor] = temperature
+
+    def sample(self) -> List[TemperatureSample]:
+        """
+        Reads all sensors and updates buffers and thresholds state
+
+        Returns:
+            Sample of each sensor
+        """
+        samples: List[TemperatureSample] = self.device.call(self._measure)
+        events = []
+        with self._cond:
+            for sample in samples:
+                self._buffers[sample.sensor].append(sample)
+                event = self._check(sample)
+                if event is not None:
+                    events.append(event)
+            if events:
+                self._cond.notify_all()
+        # Callbacks are called without lock held
+        for callback, sample in events:
+            if callback is not None:
+                callback(sample.sensor, sample.temperature)
+        return samples
+
+    def latest(self,
+               sensor: TemperatureSensor) -> Optional[TemperatureSample]:
+        """
+        Gets last sample of a sensor
+
+        Args:
+            sensor: Sensor identifier
+
+        Returns:
+            Last sample (None if not sampled yet)
+        """
+        with self._cond:
+            buffer = self._buffers[sensor]
+            return buffer[-1] if buffer else None
+
+    def history(self,
+                sensor: TemperatureSensor,
+                since: float = 0.0) -> List[TemperatureSample]:
+        """
+        Gets buffered samples of a sensor
+
+        Args:
+            sensor: Sensor identifier
+            since: Minimum sample time (as returned by time.time)
+
+        Returns:
+            Samples, oldest first
+        """
+        with self._cond:
+            return [s for s in self._buffers[sensor] if s.timestamp >= since]
+
+    def slope(self, sensor: TemperatureSensor, window: float = 60.0) -> float:
+        """
+        Estimates temperature variation rate
+
+        Args:
+            sensor: Sensor identifier
+            window: Analysis period ending at the last sample in s
+
+        Returns:
+            Least squares temperature slope in °C/min
+        """
+        with self._cond:
+            buffer = self._buffers[sensor]
+            if not buffer:
+                return 0.0
+            start = buffer[-1].timestamp - window
+            samples = [s for s in buffer if s.timestamp >= start]
+        if len(samples) < 2:
+            return 0.0
+        mean_t = sum(s.timestamp for s in samples) / len(samples)
+        mean_v = sum(s.temperature for s in samples) / len(samples)
+        sxx = sum((s.timestamp - mean_t)**2 for s in samples)
+        sxy = sum((s.timestamp - mean_t) * (s.temperature - mean_v)
+                  for s in samples)
+        return 60.0 * sxy / sxx if sxx > 0 else 0.0
+
+    def wait_cooldown(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until no sensor is overheated
+
+        Args:
+            timeout: Maximum waiting time in s (None to wait indefinitely)
+
+        Returns:
+            True if no sensor is overheated, False if timeout expired
+            or sampling stopped
+        """
+        with self._cond:
+            return bool(
+                self._cond.wait_for(
+                    lambda: not self._overheated or not self.running,
+                    timeout)) and not self._overheated
+
+    def schedule(self,
+                 tasks: Iterable[_T],
+                 heavy: Callable[[_T], bool],
+                 timeout: Optional[float] = None) -> Iterator[_T]:
+        """
+        Orders tasks according to thermal state
+
+        While a sensor is overheated, heavy tasks are postponed and light
+        tasks are yielded first. When only heavy tasks remain, iteration
+        pauses until cooldown.
+
+        Args:
+            tasks: Tasks in preferred order
+            heavy: Function telling if a task heats the device
+            timeout: Maximum cooldown waiting time in s, after which
+            postponed tasks are yielded anyway (None to wait indefinitely)
+
+        Returns:
+            Iterator over tasks
+        """
+        postponed: Deque[_T] = deque()
+        for task in tasks:
+            # Postponed tasks go first once cooled down
+            while postponed and not self.overheated:
+                yield postponed.popleft()
+            if heavy(task) and (postponed or self.overheated):
+                postponed.append(task)
+            else:
+                yield task
+        while postponed:
+            deadline = None if timeout is None else monotonic() + timeout
+            remaining = timeout
+            while not self.wait_cooldown(remaining) and self.running:
+                if deadline is not None:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        break
+            yield postponed.popleft()
+
+    def _measure(self) -> List[TemperatureSample]:
+        """Reads sensors (called from the device thread)"""
+        clock_sync = self.clock_sync
+        if clock_sync is not None and clock_sync.ready:
+            timestamp = clock_sync.device_to_host(MPS_GetTickCount())
+        else:
+            timestamp = time()
+        return [TemperatureSample(timestamp, sensor,
+                                  MPS_ProbeTemperature(sensor))
+                for sensor in self.sensors]
+
+    def _check(
+        self, sample: TemperatureSample
+    ) -> Optional[Tuple[Optional[Callable[[TemperatureSensor, float], None]],
+                        TemperatureSample]]:
+        """Updates sensor thermal state (called with lock held)"""
+        threshold = self._thresholds.get(sample.sensor)
+        if threshold is None:
+            return None
+        if sample.sensor in self._overheated:
+            if sample.temperature < threshold - self.hysteresis:
+                del self._overheated[sample.sensor]
+                return self.on_cooldown, sample
+            self._overheated[sample.sensor] = sample.temperature
+        elif sample.temperature >= threshold:
+            self._overheated[sample.sensor] = sample.temperature
+            return self.on_overheat, sample
+        return None
+
+    def _run(self) -> None:
+        """Periodic sampling thread"""
+        while not self._stop.is_set():
+            try:
+                self.sample()
+                self.error = None
+            except Exception as ex:
+                self.error = ex
+                if not self.device.is_open:
+                    with self._cond:
+                        self._stop.set()
+                        self._thread = None
+                        self._cond.notify_all()
+                    return
+            self._stop.wait(self.interval)
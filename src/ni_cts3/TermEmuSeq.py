@@ -2,7 +2,7 @@ from enum import IntEnum, unique
 from ctypes import c_uint8, c_int32, c_uint32, byref
 from typing import Union, Optional, overload, List
 from warnings import warn
-from . import _MPuLib, _MPuLib_variadic, _check_limits
+from . import _MPuLib, _MPuLib_variadic, _check_limits, _check_limits_list
 from .Measurement import VoltmeterRange
 from .Nfc import (TechnologyType, NfcTriggerId, NfcTrigger, DataRate,
                   VicinityCodingMode, VicinityDataRate, VicinitySubCarrier)
@@ -417,12 +417,11 @@ def MPC_AddToScenarioPicc(scenario_id, action,
         if not isinstance(args[0], list):
             raise TypeError('pulses must be an instance of floats list')
         _check_limits(c_uint32, len(args[0]), 'pulses')
-        pulses_list = (c_uint32 * len(args[0]))()
-        for i in range(len(args[0])):
-            if not isinstance(args[0][i], float) and not isinstance(args[0][i], int):
-                raise TypeError('pulses must be an instance of floats list')
-            _check_limits(c_uint32, round(args[0][i] * 1e6), 'pulses')
-            pulses_list[i] = c_uint32(round(args[0][i] * 1e6))
+        if any(not isinstance(pulse, (float, int)) for pulse in args[0]):
+            raise TypeError('pulses must be an instance of floats list')
+        pulses_us = [round(pulse * 1e6) for pulse in args[0]]
+        _check_limits_list(c_uint32, pulses_us, 'pulses')
+        pulses_list = (c_uint32 * len(pulses_us))(*pulses_us)
         CTS3Exception._check_error(
             func_pointer(
                 c_uint8(0),
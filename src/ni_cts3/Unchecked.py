@@ -0,0 +1,134 @@
+from ctypes import c_uint8, c_uint16, c_uint32, byref
+from typing import Dict, Union, Optional, cast
+from . import _MPuLib, _OutputBuffer
+from .MPException import CTS3Exception
+
+_device = c_uint8(0)
+_no_lc = c_uint32(0x80000000)
+_no_le = c_uint32(0x80000000)
+_le_256 = c_uint32(256)
+_no_bits = c_uint32(0)
+
+
+def MPC_ExchangeCmd(
+        tx_frame: bytes,
+        tx_bits_number: Optional[int] = None) -> Dict[str, Union[bytes, int]]:
+    """
+    Exchanges a low level command without arguments validation
+
+    Args:
+        tx_frame: Frame to transmit
+        tx_bits_number: Number of bits to transmit
+        (8 × tx_frame length if None)
+
+    Returns:
+        Dictionary made of:
+        - 'rx_frame': Received frame (bytes)
+        - 'rx_bits_number': Number of received bits (int)
+    """
+    data = bytes(5000)
+    rx_bits = c_uint32()
+    if tx_frame:
+        if tx_bits_number is None:
+            tx_bits_number = 8 * len(tx_frame)
+        ret = _MPuLib.MPC_ExchangeCmd(_device, tx_frame,
+                                      c_uint32(tx_bits_number), data,
+                                      byref(rx_bits))
+    else:
+        # Same as validated wrapper: tx_bits_number is ignored
+        ret = _MPuLib.MPC_ExchangeCmd(_device, None, _no_bits, data,
+                                      byref(rx_bits))
+    if ret:
+        CTS3Exception._check_error(ret)
+    return {
+        'rx_frame': data[:(rx_bits.value + 7) >> 3],
+        'rx_bits_number': rx_bits.value
+    }
+
+
+def MPC_SendFrameProtocol(tx_frame: bytes) -> bytes:
+    """
+    Exchanges an ISO14443-4 frame without arguments validation
+
+    Args:
+        tx_frame: Frame to transmit
+
+    Returns:
+        Received frame
+    """
+    length = c_uint32()
+    with _OutputBuffer(0xFFFF) as data:
+        ret = _MPuLib.MPC_SendFrameProtocol(_device, tx_frame,
+                                            c_uint32(len(tx_frame)), data,
+                                            byref(length))
+        if ret:
+            CTS3Exception._check_error(ret)
+        return cast(bytes, data[:length.value])
+
+
+def MPC_SendAPDU(header: Union[bytes, int],
+                 lc_field: Optional[bytes] = None,
+                 le: Optional[int] = 0) -> Dict[str, Union[bytes, int]]:
+    """
+    Sends an Application Protocol Data Unit command
+    without arguments validation
+
+    Args:
+        header: 4-byte APDU header
+        lc_field: Data to send
+        le: Expected data size
+
+    Returns:
+        Dictionary made of:
+        - 'le_field': Received data (bytes)
+        - 'status_word': PICC status word (int)
+    """
+    if isinstance(header, bytes):
+        header = int.from_bytes(header, 'big')
+    if lc_field:
+        if len(lc_field) > 0xFFFF:
+            lc = c_uint32(0x40000000 | len(lc_field))  # LC_EXTENDED
+        else:
+            lc = c_uint32(len(lc_field))
+    else:
+        lc = _no_lc
+    if le is None:
+        computed_le = _no_le
+    elif le == 0:
+        computed_le = _le_256
+    elif le > 256:
+        computed_le = c_uint32(0x40000000 | le)  # LE_EXTENDED
+    else:
+        computed_le = c_uint32(le)
+    le_len = c_uint32()
+    status_word = c_uint16()
+    with _OutputBuffer(0xFFFF) as data:
+        ret = _MPuLib.MPC_SendAPDU(_device, c_uint32(header), lc, lc_field,
+                                   computed_le, data, byref(le_len),
+                                   byref(status_word))
+        if ret:
+            CTS3Exception._check_error(ret)
+        return {
+            'le_field': cast(bytes, data[:le_len.value]),
+            'status_word': status_word.value
+        }
+
+
+def MPC_ExchangeCmdVicinity(tx_frame: bytes) -> bytes:
+    """
+    Exchanges a Vicinity frame without arguments validation
+
+    Args:
+        tx_frame: Frame to send
+
+    Returns:
+        Received frame
+    """
+    data = bytes(5000)
+    length = c_uint16()
+    ret = _MPuLib.MPC_ExchangeCmdVicinity(_device, tx_frame,
+                                          c_uint16(len(tx_frame)), data,
+                                          byref(length))
+    if ret:
+        CTS3Exception._check_error(ret)
+    return data[:length.value]
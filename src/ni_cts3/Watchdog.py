@@ -0,0 +1,226 @@
+from collections import deque
+from heapq import heapify, heappush, heappop
+from ipaddress import IPv4Address
+from itertools import count
+from threading import Thread, Condition, Event, current_thread
+from time import time, monotonic
+from typing import (Any, Callable, Deque, List, Optional, Tuple, Union,
+                    NamedTuple)
+from . import AbortCoupler, _current_host
+from .MPException import CTS3Exception, CTS3TimeoutException
+from .Device import Device
+
+
+class WatchdogEvent(NamedTuple):
+    """
+    Watchdog expiry
+
+    Attributes:
+        host: Host of the device on which the command was aborted
+        timeout: Watchdog timeout in s
+        started: Watched block start time (as returned by time.time)
+        released: Time needed by the watched block to return
+        after the abort request in s
+        thread: Name of the thread running the watched block
+        abort_error: Error raised by AbortCoupler (None if succeeded)
+    """
+    host: str
+    timeout: float
+    started: float
+    released: float
+    thread: str
+    abort_error: Optional[CTS3Exception]
+
+
+def _live(entry: Tuple[float, int, 'Watchdog']) -> bool:
+    """Checks if a deadline belongs to the current arming of its watchdog"""
+    watchdog = entry[2]
+    return watchdog.armed and watchdog._token == entry[1]
+
+
+class _Monitor:
+    """Single thread handling all watchdogs deadlines"""
+
+    def __init__(self) -> None:
+        self._cond = Condition()
+        self._deadlines: List[Tuple[float, int, 'Watchdog']] = []
+        self._counter = count()
+        self._thread: Optional[Thread] = None
+
+    def arm(self, watchdog: 'Watchdog', deadline: float) -> None:
+        """Schedules a watchdog deadline"""
+        with self._cond:
+            if len(self._deadlines) > 1024:
+                # Drop disarmed watchdogs hidden behind a later deadline
+                self._deadlines = [d for d in self._deadlines if _live(d)]
+                heapify(self._deadlines)
+            # Deadlines of previous armings of the watchdog become stale
+            watchdog._token = next(self._counter)
+            heappush(self._deadlines, (deadline, watchdog._token, watchdog))
+            if self._thread is None:
+                self._thread = Thread(target=self._run,
+                                      name='CTS3 watchdog',
+                                      daemon=True)
+                self._thread.start()
+            elif self._deadlines[0][2] is watchdog:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        """Monitor thread"""
+        while True:
+            with self._cond:
+                while True:
+                    # Disarmed watchdogs are dropped lazily
+                    while self._deadlines and not _live(self._deadlines[0]):
+                        heappop(self._deadlines)
+                    if not self._deadlines:
+                        self._cond.wait()
+                        continue
+                    delay = self._deadlines[0][0] - monotonic()
+                    if delay <= 0:
+                        watchdog = heappop(self._deadlines)[2]
+                        watchdog.fired = True
+                        watchdog._fired_at = monotonic()
+                        break
+                    self._cond.wait(delay)
+            # Abort of an unreachable host must not delay other deadlines
+            Thread(target=watchdog._expire,
+                   name=f'CTS3 watchdog abort {watchdog.host}',
+                   daemon=True).start()
+
+    def disarm(self, watchdog: 'Watchdog') -> bool:
+        """
+        Cancels a watchdog deadline
+
+        Returns:
+            True if the watchdog has fired
+        """
+        with self._cond:
+            watchdog.armed = False
+            return watchdog.fired
+
+
+_monitor = _Monitor()
+
+# Last watchdog expiries
+_events: Deque[WatchdogEvent] = deque(maxlen=1000)
+
+
+def get_watchdog_events() -> List[WatchdogEvent]:
+    """
+    Gets last watchdog expiries
+
+    Returns:
+        Watchdog events, oldest first
+    """
+    return list(_events)
+
+
+class Watchdog:
+    """
+    Watchdog bounding the duration of blocking calls
+
+    When the watched block does not complete before the timeout, the
+    command currently executed by the device is aborted with AbortCoupler
+    from a separate thread. CTS3TimeoutException is then raised when the
+    block returns, unless it raised an error other than CTS3Exception
+    (e.g. KeyboardInterrupt), and the expiry is recorded.
+
+    Attributes:
+        host: Host of the watched device
+        timeout: Maximum block duration in s
+        fired: True if the timeout has expired
+    """
+
+    def __init__(self,
+                 timeout: float,
+                 host: Union[str, IPv4Address, Device, None] = None):
+        """
+        Inits Watchdog
+
+        Args:
+            timeout: Maximum block duration in s
+            host: Watched device, host name or IP address
+            (channel opened by current thread if None)
+        """
+        if timeout <= 0:
+            raise ValueError('timeout must be positive')
+        self.timeout = timeout
+        if isinstance(host, Device):
+            self.host = host.host
+        elif host is None:
+            self.host = ''
+        else:
+            self.host = str(host)
+        self.fired = False
+        self.armed = False
+        # Sequence number of the current arming
+        self._token = -1
+        self._started = 0.0
+        self._fired_at = 0.0
+        self._abort_error: Optional[CTS3Exception] = None
+        self._aborted = Event()
+
+    def __enter__(self) -> 'Watchdog':
+        if self.armed:
+            raise RuntimeError('watchdog already armed')
+        if not self.host:
+            self.host = _current_host()
+            if not self.host:
+                raise RuntimeError('no communication channel opened')
+        self.fired = False
+        self.armed = True
+        self._aborted.clear()
+        self._abort_error = None
+        self._started = time()
+        _monitor.arm(self, monotonic() + self.timeout)
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        if not _monitor.disarm(self):
+            return
+        # Abort must not hit a command issued after the block
+        self._aborted.wait()
+        event = WatchdogEvent(self.host, self.timeout, self._started,
+                              monotonic() - self._fired_at,
+                              current_thread().name, self._abort_error)
+        _events.append(event)
+        if exc_type is None or issubclass(exc_type, CTS3Exception):
+            # Error caused by the abort
+            raise CTS3TimeoutException(self.host, self.timeout) from exc_value
+
+    def _expire(self) -> None:
+        """Aborts current command (called from an abort thread)"""
+        try:
+            AbortCoupler(self.host)
+        except CTS3Exception as ex:
+            self._abort_error = ex
+        finally:
+            self._aborted.set()
+
+
+def call_with_timeout(timeout: float,
+                      func: Callable[..., Any],
+                      *args: Any,
+                      host: Union[str, IPv4Address, Device, None] = None,
+                      **kwargs: Any) -> Any:
+    """
+    Calls a function under watchdog
+
+    Args:
+        timeout: Maximum call duration in s
+        func: Function to call
+        *args: Function positional arguments
+        host: Watched device, host name or IP address
+        (channel opened by current thread if None)
+        **kwargs: Function keyword arguments
+
+    Returns:
+        Function result
+    """
+    if isinstance(host, Device):
+        device = host
+        return device.call(call_with_timeout, timeout, func, *args,
+                           host=device.host, **kwargs)
+    with Watchdog(timeout, host):
+        return func(*args, **kwargs)
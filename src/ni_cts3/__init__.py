@@ -3,18 +3,18 @@ from platform import processor, architecture
 from pathlib import Path
 from time import sleep
 from atexit import register
-from subprocess import Popen, PIPE, DEVNULL
-from shlex import split
-from threading import Thread, Event
+from threading import local, Lock, get_ident
+from itertools import count
 from ipaddress import IPv4Address, IPv4Interface
-from typing import List, Dict, Type, Union, Optional, Callable, cast
+from typing import (List, Dict, Tuple, Type, Union, Optional, Callable, Any,
+                    cast)
 from enum import IntEnum, IntFlag, unique
 from xml.dom.minidom import parseString
 from datetime import datetime
 from warnings import simplefilter
 from ctypes import (c_char, c_char_p, c_uint8, c_int16, c_uint16, c_bool,
                     c_int32, c_uint32, c_double, CDLL, Structure, CFUNCTYPE,
-                    sizeof, byref, create_string_buffer)
+                    Array, sizeof, byref, create_string_buffer)
 from .MPStatus import CTS3ErrorCode
 
 if sys.version_info < (3, 6):
@@ -30,9 +30,19 @@ __copyright__ = f'Copyright 20{__version__[:2]}, FIME'
 __license__ = 'MIT'
 
 
+# Optional hook wrapping MPuLib functions on first lookup
+_func_wrapper: Optional[Callable[[str, Any], Any]] = None
+
+
 class _MpDll(CDLL):
     _func_restype_ = c_int16  # type: ignore[assignment]
 
+    def __getitem__(self, name_or_ordinal: Any) -> Any:
+        func = CDLL.__getitem__(self, name_or_ordinal)
+        if _func_wrapper is not None:
+            return _func_wrapper(str(name_or_ordinal), func)
+        return func
+
 
 if not sys.warnoptions:
     # Set warnings default behavior
@@ -48,6 +58,12 @@ if sys.platform == 'win32':
     class _MpWinDll(WinDLL):
         _func_restype_ = c_int16  # type: ignore[assignment]
 
+        def __getitem__(self, name_or_ordinal: Any) -> Any:
+            func = WinDLL.__getitem__(self, name_or_ordinal)
+            if _func_wrapper is not None:
+                return _func_wrapper(str(name_or_ordinal), func)
+            return func
+
     _lib_path = _lib_path.joinpath('Windows')
     if architecture()[0] == '32bit':
         _lib_name = 'MPuLib-win32.dll'
@@ -95,104 +111,242 @@ if sys.platform == 'win32' and architecture()[0] == '32bit':
     _MPuLib_variadic = _MpDll(str(_lib_path))
 
 
-class _FirmwareLog(Thread):
+def _hook_library(wrapper: Optional[Callable[[str, Any], Any]],
+                  unwrapper: Optional[Callable[[Any], Any]] = None) -> None:
+    """
+    Installs or removes a hook around MPuLib functions
+
+    Args:
+        wrapper: Function wrapping a library function given its name,
+        or None to remove current hook
+        unwrapper: Function returning the library function wrapped by
+        current hook, or None if the object is not a wrapper
+    """
+    global _func_wrapper
+    _func_wrapper = wrapper
+    for lib in (_MPuLib, _MPuLib_variadic):
+        if lib is None:
+            continue
+        # Functions already looked up are cached as instance attributes
+        for name, func in list(vars(lib).items()):
+            if unwrapper is not None:
+                original = unwrapper(func)
+                if original is not None:
+                    func = original
+                    setattr(lib, name, func)
+            if wrapper is not None and isinstance(func, lib._FuncPtr):
+                setattr(lib, name, wrapper(name, func))
+
+
+# Host of the communication channel opened by current thread
+_connection = local()
+_connection_host = ''
+
+
+def _current_host() -> str:
+    """
+    Gets the host of the communication channel used by current thread
+
+    Returns:
+        Host name, or empty string if no channel has been opened
+    """
+    return getattr(_connection, 'host', _connection_host)
+
+
+# Functions called with host name when device information cached by
+# helper modules becomes stale (firmware update, license update, reboot)
+_invalidation_hooks: List[Callable[[str], None]] = []
+
+
+def _invalidate_device_info(host: str) -> None:
+    """
+    Notifies helper modules that cached device information is stale
+
+    Args:
+        host: Host name
+    """
+    for hook in _invalidation_hooks:
+        hook(host)
+
+
+_IntType = Union[Type[c_uint8], Type[c_uint16], Type[c_uint32], Type[c_int16],
+                 Type[c_int32]]
+
+
+def _get_limits(c_type: _IntType) -> Tuple[int, int]:
+    """
+    Computes C type integer range
+
+    Args:
+        c_type: C integer type
+
+    Returns:
+        Minimum and maximum values
+    """
+    bit_size = sizeof(c_type) * 8
+    if c_type(-1).value < c_type(0).value:
+        return -2**(bit_size - 1), 2**(bit_size - 1) - 1
+    return 0, 2**bit_size - 1
+
+
+# C type integer ranges, completed on first use of another type
+_limits: Dict[type, Tuple[int, int]] = {
+    c_type: _get_limits(c_type)
+    for c_type in (c_uint8, c_uint16, c_uint32, c_int16, c_int32)
+}
+
+
+def _check_limits(c_type: _IntType, int_value: int, var_name: str) -> None:
     """
-    Firmware log listening thread
+    Checks if integer value is within C type integer range
+
+    Args:
+        c_type: C integer type
+        int_value: Value to check against C type
+        var_name: Variable name
+    """
+    try:
+        low, high = _limits[c_type]
+    except KeyError:
+        low, high = _limits[c_type] = _get_limits(c_type)
+    if int_value < low or int_value > high:
+        raise OverflowError(f'{var_name} is out of range')
+
+
+def _check_limits_list(c_type: _IntType, int_values: List[int],
+                       var_name: str) -> None:
+    """
+    Checks if integer values are within C type integer range
+
+    Args:
+        c_type: C integer type
+        int_values: Values to check against C type
+        var_name: Variable name
+    """
+    if len(int_values):
+        try:
+            low, high = _limits[c_type]
+        except KeyError:
+            low, high = _limits[c_type] = _get_limits(c_type)
+        if min(int_values) < low or max(int_values) > high:
+            raise OverflowError(f'{var_name} is out of range')
+
+
+class _BufferPool:
+    """
+    Pool of reusable output buffers
+
+    Buffers are pooled by exact size: wrappers request a few constant
+    sizes, and rounding them up would waste memory (e.g. 4 MiB for the
+    3 MiB + 1 SendFrame response).
 
     Attributes:
-        host: Connection string
-        started: Event raised when log redirection is established or failed
-        running: True if thread is running
-        log: Log redirection subprocess
+        free: Available buffers per size
+        retained: Total size of available buffers
     """
 
-    def __init__(self, host: str, started: Event):
+    # Maximum size of the buffers kept per thread
+    max_retained = 16 * 1024 * 1024
+
+    def __init__(self) -> None:
+        """Inits _BufferPool"""
+        self.free: Dict[int, List['Array[c_char]']] = {}
+        self.retained = 0
+
+    def acquire(self, size: int) -> 'Array[c_char]':
         """
-        Inits _FirmwareLog Thread
+        Gets an output buffer
 
         Args:
-            host: Connection string
-            started: Event raised when log redirection is established or failed
+            size: Buffer size
+
+        Returns:
+            Buffer starting with an empty string
         """
-        if sys.platform == 'linux' and processor().startswith('armv7'):
-            # Running from CTS3 embedded environment
-            self.host = 'localhost'
-        else:
-            self.host = host
-        self.started = started
-        self.running = False
-        Thread.__init__(self, daemon=True)
-
-    def run(self) -> None:
-        """Starts log redirection"""
-        # Follow log and read last entry
-        log_cmd = 'journalctl --unit=tgapp --follow --lines=1 --output=cat'
+        buffers = self.free.get(size)
+        if buffers:
+            buffer = buffers.pop()
+            self.retained -= size
+            buffer[0] = b'\x00'
+            return buffer
+        return create_string_buffer(size)
+
+    def release(self, buffer: 'Array[c_char]') -> None:
+        """
+        Gives an output buffer back to the pool
+
+        Args:
+            buffer: Buffer returned by acquire
+        """
+        size = len(buffer)
+        if self.retained + size <= self.max_retained:
+            buffers = self.free.get(size)
+            if buffers is None:
+                buffers = self.free[size] = []
+            buffers.append(buffer)
+            self.retained += size
+
+
+# Output buffers pool of each thread
+_thread_buffers = local()
+
+
+class _OutputBuffer:
+    """Output buffer borrowed from current thread pool within a context"""
+    __slots__ = ('size', 'pool', 'buffer')
+
+    def __init__(self, size: int):
+        """
+        Inits _OutputBuffer
+
+        Args:
+            size: Minimum buffer size (greater than 0)
+        """
+        self.size = size
+
+    def __enter__(self) -> 'Array[c_char]':
+        pool: _BufferPool
         try:
-            try:
-                if sys.platform == 'linux' and processor().startswith('armv7'):
-                    # Running from CTS3 embedded environment
-                    self.log = Popen(log_cmd,
-                                     bufsize=1,
-                                     universal_newlines=True,
-                                     encoding='ascii',
-                                     shell=True,
-                                     stdout=PIPE,
-                                     stderr=DEVNULL)
-                else:
-                    # Running from remote environment, open SSH connection
-                    ssh_cmd = (
-                        'ssh -Tnq -l default -o StrictHostKeyChecking=no '
-                        f'{self.host}')
-                    self.log = Popen(split(f'{ssh_cmd} {log_cmd}'),
-                                     bufsize=1,
-                                     universal_newlines=True,
-                                     encoding='ascii',
-                                     stdout=PIPE,
-                                     stderr=DEVNULL)
-                self.running = True
-                # Read last log entry to ensure link is established
-                if self.log.stdout is not None:
-                    self.log.stdout.readline()
-            finally:
-                self.started.set()
-            while self.running:
-                if self.log.stdout is not None:
-                    log = self.log.stdout.readline()
-                    if len(log) > 0:
-                        sys.stderr.write(f'{{{self.host}}}\t{log}')
-        except Exception:
-            self.running = False
-
-    def stop(self) -> None:
-        """Stops log redirection"""
-        if self.running:
-            self.running = False
-            self.log.terminate()
-            self.log.wait()
-            self.log.__exit__(None, None, None)
-            Thread.join(self)
-
-
-def _check_limits(c_type: Union[Type[c_uint8], Type[c_uint16], Type[c_uint32],
-                                Type[c_int16], Type[c_int32]], int_value: int,
-                  var_name: str) -> None:
+            pool = _thread_buffers.pool
+        except AttributeError:
+            pool = _thread_buffers.pool = _BufferPool()
+        self.pool = pool
+        self.buffer = pool.acquire(self.size)
+        return self.buffer
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.pool.release(self.buffer)
+
+
+def _rx_buffer(buffer: Union[bytearray, memoryview], min_size: int,
+               var_name: str) -> Tuple[memoryview, 'Array[c_char]']:
     """
-    Checks if integer value is within C type integer range
+    Maps a caller-provided buffer to an output buffer
 
     Args:
-        c_type: C integer type
-        int_value: Value to check against C type
+        buffer: Writable buffer
+        min_size: Minimum buffer size
         var_name: Variable name
+
+    Returns:
+        Byte view of the buffer and output buffer sharing its memory
     """
-    signed = c_type(-1).value < c_type(0).value
-    bit_size = sizeof(c_type) * 8
-    signed_limit = 2**(bit_size - 1)
-    if signed:
-        if int_value < -signed_limit or int_value > signed_limit - 1:
-            raise OverflowError(f'{var_name} is out of range')
-    else:
-        if int_value < 0 or int_value > 2 * signed_limit - 1:
-            raise OverflowError(f'{var_name} is out of range')
+    if not isinstance(buffer, (bytearray, memoryview)):
+        raise TypeError(
+            f'{var_name} must be an instance of bytearray or memoryview')
+    view = memoryview(buffer)
+    if view.readonly:
+        raise TypeError(f'{var_name} must be writable')
+    if view.format != 'B':
+        view = view.cast('B')
+    if view.nbytes < min_size:
+        raise ValueError(f'{var_name} must hold at least {min_size} bytes')
+    return view, (c_char * view.nbytes).from_buffer(view)
+
+
+# Error messages already read from MPuLib
+_error_messages: Dict[int, str] = {}
+_mifare_error_messages: Dict[int, str] = {}
 
 
 def GetErrorMessageFromCode(error_code: int) -> str:
@@ -205,13 +359,17 @@ def GetErrorMessageFromCode(error_code: int) -> str:
     Returns:
         Error message
     """
+    message = _error_messages.get(error_code)
+    if message is not None:
+        return message
     _check_limits(c_int16, error_code, 'error_code')
     _MPuLib.GetErrorMessageFromCode.restype = c_char_p
     message = cast(bytes, _MPuLib.GetErrorMessageFromCode(
         c_uint16(error_code))).decode('ascii')
-    if len(message) > 0:
-        return message
-    return f'Unknown error code 0x{error_code:04X}'
+    if len(message) == 0:
+        message = f'Unknown error code 0x{error_code:04X}'
+    _error_messages[int(error_code)] = message
+    return message
 
 
 def GetMifareErrorMessageFromCode(error_code: int) -> str:
@@ -224,19 +382,23 @@ def GetMifareErrorMessageFromCode(error_code: int) -> str:
     Returns:
         Error message
     """
+    message = _mifare_error_messages.get(error_code)
+    if message is not None:
+        return message
     _check_limits(c_int32, error_code, 'error_code')
     _MPuLib.GetMifareErrorMessageFromCode.restype = c_char_p
     message = cast(bytes,
                    _MPuLib.GetMifareErrorMessageFromCode(
                        c_int32(error_code))).decode('ascii')
-    if len(message) > 0:
-        return message
-    return f'Unknown error code 0x{error_code:02X}'
+    if len(message) == 0:
+        message = f'Unknown error code 0x{error_code:02X}'
+    _mifare_error_messages[int(error_code)] = message
+    return message
 
 
 from .MPException import CTS3Exception  # noqa: E402
 
-_logs_dict: Dict[str, _FirmwareLog] = {}
+from .FirmwareLog import _collector  # noqa: E402
 
 
 def _get_connection_string() -> str:
@@ -255,32 +417,22 @@ def _get_connection_string() -> str:
 
 def _log_start() -> None:
     """Starts firwmare log redirection to stderr"""
-    global _logs_dict
     host = _get_connection_string()
-    if len(host) > 0 and host not in _logs_dict:
-        log_started = Event()
-        log_thread = _FirmwareLog(host, log_started)
-        log_thread.start()
-        log_started.wait()
-        if log_thread.running:
-            _logs_dict[host] = log_thread
+    if len(host) > 0:
+        _collector.start(host)
 
 
 def _log_stop() -> None:
     """Stops firmware log redirection to stderr"""
-    global _logs_dict
     host = _get_connection_string()
-    if len(host) > 0 and host in _logs_dict:
+    if len(host) > 0 and _collector.is_running(host):
         sleep(0.5)  # Journal flush delay
-        _logs_dict[host].stop()
-        _logs_dict.pop(host)
+        _collector.stop(host)
 
 
 def _logs_cleanup() -> None:
     """Stops all firmware log redirections"""
-    global _logs_dict
-    for log in _logs_dict.values():
-        log.stop()
+    _collector.stop_all()
 
 
 register(_logs_cleanup)
@@ -557,15 +709,18 @@ def UpdateFirmware(path: Union[str, Path],
         file = str(path).encode('ascii')
     else:
         file = path.encode('ascii')
-    if call_back:
-        cmp_func = CFUNCTYPE(c_int32, c_int32)
+    try:
+        if call_back:
+            cmp_func = CFUNCTYPE(c_int32, c_int32)
 
-        CTS3Exception._check_error(
-            _MPuLib.UpdateFirmware(file, c_uint8(partIndex),
-                                   cmp_func(call_back)))
-    else:
-        CTS3Exception._check_error(
-            _MPuLib.UpdateFirmware(file, c_uint8(partIndex), None))
+            CTS3Exception._check_error(
+                _MPuLib.UpdateFirmware(file, c_uint8(partIndex),
+                                       cmp_func(call_back)))
+        else:
+            CTS3Exception._check_error(
+                _MPuLib.UpdateFirmware(file, c_uint8(partIndex), None))
+    finally:
+        _invalidate_device_info(_current_host())
 
 
 def GetLastFirmwareUpdateErrorMessageEx() -> str:
@@ -594,7 +749,10 @@ def ApplyLicenseUpdateFile(path: Union[str, Path]) -> None:
         file = str(path).encode('ascii')
     else:
         file = path.encode('ascii')
-    CTS3Exception._check_error(_MPuLib.ApplyLicenseUpdateFile(file))
+    try:
+        CTS3Exception._check_error(_MPuLib.ApplyLicenseUpdateFile(file))
+    finally:
+        _invalidate_device_info(_current_host())
 
 
 @unique
@@ -619,7 +777,6 @@ def MPS_CPUAutoTest(test_id: CpuAutotestId = CpuAutotestId.TEST_CPU_ALL,
     Returns:
         Test result
     """
-    global _logs_dict
     if not isinstance(test_id, CpuAutotestId):
         raise TypeError('test_id must be an instance of CpuAutotestId IntEnum')
     _check_limits(c_uint32, parameter, 'parameter')
@@ -629,7 +786,7 @@ def MPS_CPUAutoTest(test_id: CpuAutotestId = CpuAutotestId.TEST_CPU_ALL,
         (parameter & 0xF == 0 or parameter & 0xF == 6)):
         # Close 'default' user connection to allow user data partition analysis
         host = _get_connection_string()
-        if len(host) > 0 and host in _logs_dict:
+        if len(host) > 0 and _collector.is_running(host):
             restore_log = True
             _log_stop()
     result = c_char_p()
@@ -828,13 +985,13 @@ def GetRemoteHelp(remote: Optional[str] = None) -> Dict[str, str]:
     """
     if remote and (not isinstance(remote, str) or len(remote) != 4):
         raise TypeError('remote must be an instance of 4 characters string')
-    max_size = 3 * 1024 * 1024
-    message = create_string_buffer(max_size)
-    CTS3Exception._check_error(
-        _MPuLib.GetRemoteHelp(
-            remote.encode('ascii') if remote else None, message))
+    with _OutputBuffer(3 * 1024 * 1024) as message:
+        CTS3Exception._check_error(
+            _MPuLib.GetRemoteHelp(
+                remote.encode('ascii') if remote else None, message))
+        commands = message.value.decode('ascii').strip()
     help: Dict[str, str] = {}
-    for cmd in message.value.decode('ascii').strip().split(';'):
+    for cmd in commands.split(';'):
         pair = cmd.split('=')
         if len(pair) == 1 and len(pair[0]):
             help[pair[0]] = ''
@@ -845,20 +1002,24 @@ def GetRemoteHelp(remote: Optional[str] = None) -> Dict[str, str]:
 
 def Reboot() -> None:
     """Reboots the device"""
+    host = _current_host()
     try:
         _MPuLib.Reboot.restype = c_int32
         CTS3Exception._check_error(_MPuLib.Reboot())
     finally:
         CloseCommunication()
+        _invalidate_device_info(host)
 
 
 def SoftReboot() -> None:
     """Restarts the device firmware"""
+    host = _current_host()
     try:
         _MPuLib.SoftReboot.restype = c_int32
         CTS3Exception._check_error(_MPuLib.SoftReboot())
     finally:
         CloseCommunication()
+        _invalidate_device_info(host)
 
 
 def Shutdown() -> None:
@@ -1226,6 +1387,8 @@ def MPS_PortReceive(data_count: Optional[int] = None) -> bytes:
         count = c_uint16()
         CTS3Exception._check_error(
             _MPuLib.MPS_PortStatus(c_uint8(3), byref(count)))
+        if not count.value:
+            return b''
         data = bytes(count.value)
         CTS3Exception._check_error(
             _MPuLib.MPS_PortReceive(c_uint8(3), data, count))
@@ -1293,6 +1456,51 @@ def MPC_SetRelay(relay_number: AuxRelay, state: bool) -> None:
 # region Embedded applications
 
 
+# Callbacks of embedded scripts and applications by launch, with the
+# launching thread, kept alive since the library may call them after the
+# launching function has returned
+_embedded_callbacks: Dict[int, Tuple[int, Any]] = {}
+_embedded_launches = count()
+_embedded_lock = Lock()
+
+
+def _keep_embedded_callback(
+        call_back: Callable[[bytes], int]) -> Tuple[int, Any]:
+    """
+    Keeps an embedded script or application callback alive
+
+    Args:
+        call_back: Callback function
+
+    Returns:
+        Launch identifier and library callback
+    """
+    cmp_func = CFUNCTYPE(c_int32, c_char_p)
+    func = cmp_func(call_back)
+    with _embedded_lock:
+        launch = next(_embedded_launches)
+        _embedded_callbacks[launch] = (get_ident(), func)
+    return launch, func
+
+
+def _release_embedded_callback(launch: Optional[int] = None) -> None:
+    """
+    Releases embedded callbacks which can not be called anymore
+
+    Args:
+        launch: Launch identifier (None for all launches of the
+        communication channel of current thread)
+    """
+    with _embedded_lock:
+        if launch is not None:
+            _embedded_callbacks.pop(launch, None)
+            return
+        thread = get_ident()
+        for key in [key for key, (owner, _) in _embedded_callbacks.items()
+                    if owner == thread]:
+            del _embedded_callbacks[key]
+
+
 @unique
 class EmbeddedScriptMode(IntFlag):
     """Embedded script mode"""
@@ -1328,12 +1536,18 @@ def LaunchEmbeddedScript(
             'option must be an instance of EmbeddedScriptMode IntFlag')
     retCode = c_uint8(0)
     if call_back:
-        cmp_func = CFUNCTYPE(c_int32, c_char_p)
-        CTS3Exception._check_error(
-            _MPuLib.LaunchEmbeddedScript(script_command.encode('ascii'),
-                                         c_uint32(option),
-                                         c_uint32(timeout_ms), byref(retCode),
-                                         cmp_func(call_back)))
+        launch, func = _keep_embedded_callback(call_back)
+        try:
+            CTS3Exception._check_error(
+                _MPuLib.LaunchEmbeddedScript(script_command.encode('ascii'),
+                                             c_uint32(option),
+                                             c_uint32(timeout_ms),
+                                             byref(retCode), func))
+        finally:
+            # Script has terminated once waited for, otherwise the
+            # callback is released when the channel is closed
+            if option & EmbeddedScriptMode.EMBEDDED_WAIT_TERMINATION:
+                _release_embedded_callback(launch)
     else:
         CTS3Exception._check_error(
             _MPuLib.LaunchEmbeddedScript(script_command.encode('ascii'),
@@ -1356,11 +1570,16 @@ def StartEmbeddedApplication(
         call_back: Program callback function
     """
     if call_back:
-        cmp_func = CFUNCTYPE(c_int32, c_char_p)
-        CTS3Exception._check_error(
-            _MPuLib.StartEmbeddedApplication(
-                application_path.encode('ascii'),
-                args.encode('ascii') if args else None, cmp_func(call_back)))
+        # Callback is released when the channel is closed
+        launch, func = _keep_embedded_callback(call_back)
+        try:
+            CTS3Exception._check_error(
+                _MPuLib.StartEmbeddedApplication(
+                    application_path.encode('ascii'),
+                    args.encode('ascii') if args else None, func))
+        except BaseException:
+            _release_embedded_callback(launch)
+            raise
     else:
         CTS3Exception._check_error(
             _MPuLib.StartEmbeddedApplication(
@@ -1390,6 +1609,8 @@ def OpenCommunication(host: Union[str, IPv4Address], log: bool = True) -> None:
             _MPuLib.OpenCommunication(str(host).encode('ascii')))
     else:
         raise TypeError('host must be an instance of str or IPv4Interface')
+    global _connection_host
+    _connection.host = _connection_host = str(host)
     if log:
         _log_start()
 
@@ -1399,6 +1620,9 @@ def CloseCommunication() -> None:
     _log_stop()
     _MPuLib.CloseCommunication.restype = c_int32
     _MPuLib.CloseCommunication()
+    _release_embedded_callback()
+    global _connection_host
+    _connection.host = _connection_host = ''
 
 
 @unique
@@ -1495,11 +1719,11 @@ def SendFrame(command: Optional[str],
     _MPuLib.SendFrame.restype = c_int32
     max_buffer_size = 3 * 1024 * 1024 + 1
     if command is None:
-        response = create_string_buffer(max_buffer_size)
-        CTS3Exception._check_error(
-            _MPuLib.SendFrame(None, c_int32(0), c_uint16(timeout), '',
-                              response))
-        return response.value.decode('ascii').strip()
+        with _OutputBuffer(max_buffer_size) as response:
+            CTS3Exception._check_error(
+                _MPuLib.SendFrame(None, c_int32(0), c_uint16(timeout), '',
+                                  response))
+            return response.value.decode('ascii').strip()
     else:
         if not asynchronous_tx and not command.endswith('\r'):
             command += '\r'
@@ -1510,11 +1734,96 @@ def SendFrame(command: Optional[str],
                                   None))
             return None
         else:
-            response = create_string_buffer(max_buffer_size)
-            CTS3Exception._check_error(
-                _MPuLib.SendFrame(None, c_int32(0), c_uint16(timeout),
-                                  command.encode('ascii'), response))
-            return response.value.decode('ascii').strip()
+            with _OutputBuffer(max_buffer_size) as response:
+                CTS3Exception._check_error(
+                    _MPuLib.SendFrame(None, c_int32(0), c_uint16(timeout),
+                                      command.encode('ascii'), response))
+                return response.value.decode('ascii').strip()
+
+
+def SendFrames(commands: List[str],
+               timeout: int = -1,
+               window: int = 16) -> List[Dict[str, Any]]:
+    """
+    Sends remote commands back-to-back to the connected CTS3
+
+    Up to window commands are sent before their answers are read,
+    which removes the idle round trip between consecutive commands.
+    Like with SendFrame, a trailing '\\r' is added to each command.
+
+    Args:
+        commands: Remote commands to send
+        timeout: Communication timeout in s (-1 to use default value)
+        window: Maximum number of commands waiting for an answer
+
+    Returns:
+        List of dictionaries made of:
+        - 'response': CTS3 answer (str), or None if command failed
+        - 'error': Command error (CTS3Exception, or warning turned into an
+        error by the warnings filter), or None if command succeeded
+        After a communication error or a warning while reading an answer,
+        the next answers cannot be matched to their command: the remaining
+        commands are not sent and fail with that error.
+    """
+    if not isinstance(commands, list) or any(
+            not isinstance(command, str) for command in commands):
+        raise TypeError('commands must be an instance of str list')
+    if timeout != -1:
+        _check_limits(c_uint16, timeout, 'timeout')
+    if window < 1:
+        raise ValueError('window must be greater than 0')
+    _MPuLib.SendFrame.restype = c_int32
+    results: List[Dict[str, Any]] = [{
+        'response': None,
+        'error': None
+    } for _ in commands]
+    pending: List[int] = []  # Index of commands waiting for an answer
+    lost: Optional[Exception] = None
+    with _OutputBuffer(3 * 1024 * 1024 + 1) as response:
+
+        def receive(index: int) -> Optional[Exception]:
+            """Reads next answer, returns the error if answers are lost"""
+            response[0] = b'\x00'
+            ret = _MPuLib.SendFrame(None, c_int32(0), c_uint16(timeout), '',
+                                    response)
+            try:
+                CTS3Exception._check_error(ret)
+                results[index]['response'] = response.value.decode(
+                    'ascii').strip()
+            except CTS3Exception as e:
+                results[index]['error'] = e
+                if ret < 0:
+                    # Answer not received: next answers cannot be matched
+                    return e
+            except Exception as e:
+                # Warning raised as an error: the batch is stopped
+                results[index]['error'] = e
+                return e
+            return None
+
+        for index, command in enumerate(commands):
+            if len(pending) >= window:
+                lost = receive(pending.pop(0))
+                if lost is not None:
+                    break
+            if not command.endswith('\r'):
+                command += '\r'
+            try:
+                CTS3Exception._check_error(
+                    _MPuLib.SendFrame(byref(c_uint32(1)), c_int32(1),
+                                      c_uint16(timeout),
+                                      command.encode('ascii'), None))
+                pending.append(index)
+            except Exception as e:
+                results[index]['error'] = e
+        while pending and lost is None:
+            lost = receive(pending.pop(0))
+    if lost is not None:
+        # Commands waiting for an answer or not sent yet fail
+        for result in results:
+            if result['response'] is None and result['error'] is None:
+                result['error'] = lost
+    return results
 
 
 @unique
@@ -0,0 +1,163 @@
+from asyncio import CancelledError, wrap_future
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from ipaddress import IPv4Address
+from threading import Lock
+from typing import Any, Awaitable, Callable, List, Optional, Union
+from warnings import warn
+from ..MPException import CTS3Exception
+from ..Device import Device, _find_wrapper
+
+
+class AsyncDevice:
+    """
+    CTS3 session usable from an asyncio event loop
+
+    Calls are queued on the device thread, so they never block the event
+    loop and are executed one at a time. Like synchronous calls, they wait
+    for device.lock: this wait happens on a dispatcher thread owned by the
+    session, so blocking calls on one device never hold a thread shared
+    with other devices. Cancelling a call which is already running aborts
+    it with AbortCoupler.
+
+    Attributes:
+        device: Underlying device session
+    """
+
+    def __init__(self,
+                 host: Union[str, IPv4Address, Device],
+                 log: bool = False):
+        """
+        Inits AsyncDevice
+
+        Args:
+            host: Host name or IP address, or existing device session
+            log: True to output firmware log to stderr
+        """
+        if isinstance(host, Device):
+            self.device = host
+        else:
+            self.device = Device(host, log)
+        self._executors_lock = Lock()
+        # Threads waiting for device calls and running aborts
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+        self._aborter: Optional[ThreadPoolExecutor] = None
+
+    def __repr__(self) -> str:
+        return f"AsyncDevice('{self.device.host}')"
+
+    async def __aenter__(self) -> 'AsyncDevice':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        """
+        Gets an awaitable wrapper function bound to the device
+
+        Args:
+            name: Wrapper function name (e.g. 'MPS_WaitSimEvent')
+
+        Returns:
+            Coroutine function calling the wrapper on the device
+        """
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return partial(self.call, _find_wrapper(name))
+
+    @property
+    def host(self) -> str:
+        """Host name or IP address"""
+        return self.device.host
+
+    async def open(self) -> None:
+        """Opens the communication channel"""
+        await self._dispatch(self.device.open)
+
+    async def close(self) -> None:
+        """Closes the communication channel"""
+        try:
+            await self._dispatch(self.device.close)
+        finally:
+            with self._executors_lock:
+                executors = (self._dispatcher, self._aborter)
+                self._dispatcher = None
+                self._aborter = None
+            for executor in executors:
+                if executor is not None:
+                    executor.shutdown(wait=False)
+
+    def _dispatch(self, func: Callable[..., Any], *args: Any,
+                  abort: bool = False) -> Awaitable[Any]:
+        """
+        Runs a blocking function on a thread of the session
+
+        Args:
+            func: Function to run
+            *args: Function positional arguments
+            abort: True to run on the abort thread, which is not blocked
+            by pending calls
+
+        Returns:
+            Function result awaitable
+        """
+        with self._executors_lock:
+            if abort:
+                if self._aborter is None:
+                    self._aborter = ThreadPoolExecutor(
+                        max_workers=1,
+                        thread_name_prefix=f'CTS3 {self.host} abort')
+                executor = self._aborter
+            else:
+                if self._dispatcher is None:
+                    self._dispatcher = ThreadPoolExecutor(
+                        max_workers=1,
+                        thread_name_prefix=f'CTS3 {self.host} dispatcher')
+                executor = self._dispatcher
+            return wrap_future(executor.submit(func, *args))
+
+    async def call(self, func: Callable[..., Any], *args: Any,
+                   **kwargs: Any) -> Any:
+        """
+        Calls a function on the device thread
+
+        Args:
+            func: Function to call (e.g. MPS_WaitSimEvent)
+            *args: Function positional arguments
+            **kwargs: Function keyword arguments
+
+        Returns:
+            Function result
+        """
+        # Future of the call once submitted, or None when cancelled first
+        submitted: List[Optional['Future[Any]']] = []
+        guard = Lock()
+
+        def locked_call() -> Any:
+            # Same locking as synchronous calls: sequences executed by
+            # other threads under device.lock are not interleaved
+            with self.device.lock:
+                with guard:
+                    if submitted:
+                        return None  # Cancelled while waiting for lock
+                    future = self.device.submit(func, *args, **kwargs)
+                    submitted.append(future)
+                return future.result()
+
+        try:
+            return await self._dispatch(locked_call)
+        except CancelledError:
+            with guard:
+                if not submitted:
+                    submitted.append(None)
+                future = submitted[0]
+            # A call still queued is dropped, a running call is aborted
+            if (future is not None and not future.cancel() and
+                    not future.done()):
+                try:
+                    await self._dispatch(self.device.abort, abort=True)
+                except CTS3Exception as ex:
+                    warn(f'{self!r} call abort failed: {ex}', RuntimeWarning)
+            raise
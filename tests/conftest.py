@@ -0,0 +1,65 @@
+import sys
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+import pytest
+import ni_cts3
+from ni_cts3.Device import Device
+
+
+class FakeLibrary:
+    """
+    MPuLib replacement
+
+    Functions return RET_OK unless a handler is registered. Calls are
+    recorded with their arguments.
+
+    Attributes:
+        handlers: Function called instead of each MPuLib function
+        calls: Recorded (function name, arguments) calls
+    """
+
+    def __init__(self) -> None:
+        self.handlers: Dict[str, Callable[..., Any]] = {
+            'GetErrorMessageFromCode': lambda *args: b'',
+            'GetMifareErrorMessageFromCode': lambda *args: b'',
+        }
+        self.calls: List[Tuple[str, Tuple[Any, ...]]] = []
+        self._lock = Lock()
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        def function(*args: Any) -> Any:
+            with self._lock:
+                self.calls.append((name, args))
+            handler = self.handlers.get(name)
+            return 0 if handler is None else handler(*args)
+
+        return function
+
+    def called(self, name: str) -> List[Tuple[Any, ...]]:
+        """Gets arguments of the recorded calls to a function"""
+        with self._lock:
+            return [args for called, args in self.calls if called == name]
+
+
+@pytest.fixture
+def mpulib(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeLibrary]:
+    """Replaces MPuLib in every loaded ni_cts3 module"""
+    library = FakeLibrary()
+    for name, module in list(sys.modules.items()):
+        if (name == 'ni_cts3' or name.startswith('ni_cts3.')) and hasattr(
+                module, '_MPuLib'):
+            monkeypatch.setattr(module, '_MPuLib', library)
+    monkeypatch.setattr(ni_cts3, '_connection_host', '')
+    yield library
+
+
+@pytest.fixture
+def device(mpulib: FakeLibrary) -> Iterator[Device]:
+    """Device session opened on the fake library"""
+    session = Device('cts3')
+    session.open()
+    yield session
+    session.close()
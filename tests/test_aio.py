@@ -0,0 +1,122 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+from time import sleep
+import pytest
+from ni_cts3.Device import Device
+from ni_cts3.MPException import CTS3Exception
+from ni_cts3.MPStatus import CTS3ErrorCode
+from ni_cts3.aio import AsyncDevice
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_call_waits_for_device_lock(device):
+    order = []
+    locked = Event()
+
+    def sequence():
+        with device.lock:
+            locked.set()
+            device.call(order.append, 'first')
+            sleep(0.1)
+            device.call(order.append, 'second')
+
+    thread = Thread(target=sequence)
+    thread.start()
+    locked.wait()
+    _run(AsyncDevice(device).call(order.append, 'async'))
+    thread.join()
+    assert order == ['first', 'second', 'async']
+
+
+def _cancel_running(device):
+    started = Event()
+    released = Event()
+
+    def blocking():
+        started.set()
+        released.wait(5)
+
+    async def scenario():
+        task = asyncio.ensure_future(AsyncDevice(device).call(blocking))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    return scenario, released
+
+
+def test_cancel_running_call_aborts(device, mpulib):
+    scenario, released = _cancel_running(device)
+    mpulib.handlers['AbortCoupler'] = lambda *args: released.set() or 0
+    _run(scenario())
+    assert len(mpulib.called('AbortCoupler')) == 1
+
+
+def test_abort_error_is_reported(device, monkeypatch):
+    scenario, released = _cancel_running(device)
+
+    def abort():
+        released.set()
+        raise CTS3Exception(CTS3ErrorCode.DLLCOMERROR)
+
+    monkeypatch.setattr(device, 'abort', abort)
+    with pytest.warns(RuntimeWarning, match='abort failed'):
+        _run(scenario())
+
+
+def test_cancel_queued_call_is_dropped(device):
+    executed = []
+
+    async def scenario():
+        with device.lock:
+            task = asyncio.ensure_future(
+                AsyncDevice(device).call(executed.append, 1))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        await asyncio.sleep(0.05)
+
+    _run(scenario())
+    device.call(sleep, 0)
+    assert executed == []
+
+
+def test_blocked_device_does_not_stall_others(device, mpulib):
+    other = Device('cts4')
+    other.open()
+    started = Event()
+    released = Event()
+
+    def blocking():
+        started.set()
+        released.wait(5)
+
+    async def scenario():
+        # No shared thread is available to wait for device calls
+        asyncio.get_event_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=1))
+        blocked = asyncio.ensure_future(AsyncDevice(device).call(blocking))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        try:
+            return await asyncio.wait_for(
+                AsyncDevice(other).call(lambda: 'done'), 2)
+        finally:
+            released.set()
+            await blocked
+
+    try:
+        assert _run(scenario()) == 'done'
+    finally:
+        other.close()
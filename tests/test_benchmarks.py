@@ -0,0 +1,76 @@
+from ctypes import c_uint32, create_string_buffer, sizeof
+from timeit import repeat
+import pytest
+from ni_cts3 import (Nfc, Unchecked, _OutputBuffer, _check_limits,
+                     _check_limits_list)
+
+pytestmark = pytest.mark.benchmark
+
+
+def _rate(func, *args, number=2000):
+    """Measures calls per second (best of 3 runs)"""
+    best = min(repeat(lambda: func(*args), number=number, repeat=3))
+    return number / best
+
+
+def _report(name, rates):
+    """Prints compared call rates"""
+    reference = rates[0][1]
+    print(f'\n{name}')
+    for label, rate in rates:
+        print(f'  {label:<12} {rate:>10.0f} calls/s ({rate / reference:.2f}x)')
+
+
+@pytest.mark.parametrize('name, args', [
+    ('MPC_ExchangeCmd', (b'\x93\x20', )),
+    ('MPC_SendFrameProtocol', (b'\x00\xa4\x04\x00', )),
+    ('MPC_SendAPDU', (b'\x00\xa4\x04\x00', b'\xa0\x00', 0)),
+])
+def test_unchecked_call_rate(mpulib, name, args):
+    rates = [('validated', _rate(getattr(Nfc, name), *args)),
+             ('unchecked', _rate(getattr(Unchecked, name), *args))]
+    _report(name, rates)
+
+
+def _borrow(size):
+    """Pooled output buffer allocation"""
+    with _OutputBuffer(size):
+        pass
+
+
+@pytest.mark.parametrize('size', [0xFFFF, 3 * 1024 * 1024 + 1])
+def test_output_buffer_rate(size):
+    rates = [('allocated', _rate(create_string_buffer, size, number=200)),
+             ('pooled', _rate(_borrow, size, number=200))]
+    _report(f'{size} bytes output buffer', rates)
+
+
+def _computed_limits(c_type, int_value, var_name):
+    """Range check computing the C type range on each call"""
+    signed = c_type(-1).value < c_type(0).value
+    signed_limit = 2**(sizeof(c_type) * 8 - 1)
+    if signed:
+        if int_value < -signed_limit or int_value > signed_limit - 1:
+            raise OverflowError(f'{var_name} is out of range')
+    elif int_value < 0 or int_value > 2 * signed_limit - 1:
+        raise OverflowError(f'{var_name} is out of range')
+
+
+def _computed_limits_list(c_type, int_values, var_name):
+    """List range check with one check per value"""
+    for int_value in int_values:
+        _computed_limits(c_type, int_value, var_name)
+
+
+def test_check_limits_rate():
+    rates = [('computed', _rate(_computed_limits, c_uint32, 1, 'value',
+                                number=20000)),
+             ('table', _rate(_check_limits, c_uint32, 1, 'value',
+                             number=20000))]
+    _report('c_uint32 range check', rates)
+    values = list(range(1000))
+    rates = [('computed', _rate(_computed_limits_list, c_uint32, values,
+                                'values', number=50)),
+             ('table', _rate(_check_limits_list, c_uint32, values, 'values',
+                             number=50))]
+    _report('1000 values c_uint32 range check', rates)
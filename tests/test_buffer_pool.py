@@ -0,0 +1,58 @@
+from threading import Thread
+import pytest
+from ni_cts3 import _BufferPool, _OutputBuffer, _thread_buffers
+
+
+def test_released_buffer_is_reused():
+    pool = _BufferPool()
+    buffer = pool.acquire(100)
+    buffer.value = b'previous answer'
+    pool.release(buffer)
+    assert pool.retained == 100
+    reused = pool.acquire(100)
+    assert reused is buffer
+    assert reused.value == b''
+    assert pool.retained == 0
+
+
+def test_buffers_are_pooled_by_exact_size():
+    pool = _BufferPool()
+    size = 3 * 1024 * 1024 + 1
+    buffer = pool.acquire(size)
+    assert len(buffer) == size
+    pool.release(buffer)
+    assert pool.acquire(size - 1) is not buffer
+    assert pool.acquire(size) is buffer
+
+
+def test_retained_size_is_bounded(monkeypatch):
+    monkeypatch.setattr(_BufferPool, 'max_retained', 250)
+    pool = _BufferPool()
+    buffers = [pool.acquire(100) for _ in range(3)]
+    for buffer in buffers:
+        pool.release(buffer)
+    assert pool.retained == 200
+    assert len(pool.free[100]) == 2
+
+
+def test_output_buffer_released_on_error():
+    with pytest.raises(ValueError):
+        with _OutputBuffer(64) as buffer:
+            raise ValueError('wrapper failed')
+    with _OutputBuffer(64) as reused:
+        assert reused is buffer
+
+
+def test_output_buffers_are_per_thread():
+    with _OutputBuffer(64):
+        pass
+    pools = []
+
+    def borrow():
+        with _OutputBuffer(64):
+            pools.append(_thread_buffers.pool)
+
+    thread = Thread(target=borrow)
+    thread.start()
+    thread.join()
+    assert pools[0] is not _thread_buffers.pool
@@ -0,0 +1,67 @@
+import warnings
+import pytest
+import ni_cts3
+from ni_cts3 import GetErrorMessageFromCode, GetMifareErrorMessageFromCode
+from ni_cts3.MPException import CTS3Exception
+from ni_cts3.MPStatus import CTS3ErrorCode
+
+
+@pytest.fixture
+def messages(mpulib, monkeypatch):
+    """Empty error message caches and library messages"""
+    monkeypatch.setattr(ni_cts3, '_error_messages', {})
+    monkeypatch.setattr(ni_cts3, '_mifare_error_messages', {})
+    mpulib.handlers['GetErrorMessageFromCode'] = (
+        lambda code: f'error {code.value}'.encode('ascii'))
+    mpulib.handlers['GetMifareErrorMessageFromCode'] = (
+        lambda code: f'mifare error {code.value}'.encode('ascii'))
+    yield mpulib
+
+
+def test_success_does_not_read_message(messages):
+    CTS3Exception._check_error(0)
+    assert not messages.calls
+
+
+def test_error_raises_with_cached_message(messages):
+    status = CTS3ErrorCode.RET_FAIL
+    for _ in range(2):
+        with pytest.raises(CTS3Exception) as error:
+            CTS3Exception._check_error(status.value)
+        assert error.value.ErrorCode == status
+        assert str(error.value) == f'error {status.value}'
+    assert len(messages.called('GetErrorMessageFromCode')) == 1
+
+
+def test_unknown_error_code(messages):
+    with pytest.raises(CTS3Exception, match='Unknown error code 0x7ffe'):
+        CTS3Exception._check_error(0x7FFE)
+
+
+@pytest.mark.parametrize('status, category', [
+    (CTS3ErrorCode.ERR_TIME_FDT_MAX, UserWarning),
+    (CTS3ErrorCode.RET_INCOMPATIBLE_BOOT_VERSION, UserWarning),
+    (CTS3ErrorCode.ERR_NO_VALID_ATR_REQ_RECEIVED, Warning),
+])
+def test_warning_status(messages, status, category):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        CTS3Exception._check_error(status.value)
+    warning, = caught
+    assert warning.category is category
+    assert str(warning.message) == f'error {status.value}'
+
+
+def test_empty_message_is_cached(messages):
+    messages.handlers['GetErrorMessageFromCode'] = lambda code: b''
+    assert GetErrorMessageFromCode(0x1234) == 'Unknown error code 0x1234'
+    assert GetErrorMessageFromCode(0x1234) == 'Unknown error code 0x1234'
+    assert len(messages.called('GetErrorMessageFromCode')) == 1
+
+
+def test_mifare_messages_are_cached(messages):
+    assert GetMifareErrorMessageFromCode(3) == 'mifare error 3'
+    assert GetMifareErrorMessageFromCode(3) == 'mifare error 3'
+    assert len(messages.called('GetMifareErrorMessageFromCode')) == 1
+    with pytest.raises(OverflowError):
+        GetMifareErrorMessageFromCode(2**31)
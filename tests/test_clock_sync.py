@@ -0,0 +1,72 @@
+import pytest
+from ni_cts3.ClockSync import ClockSync
+from ni_cts3.MPException import CTS3Exception
+
+
+class _Clock:
+    """Host clock advancing by 1 ms at each reading"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        self.now += 0.001
+        return self.now
+
+
+def _ticks(mpulib, values):
+    mpulib.handlers['MPS_GetTickCount'] = lambda: values.pop(0)
+
+
+def _sync(device, burst=1):
+    return ClockSync(device, burst=burst, clock=_Clock())
+
+
+def test_device_is_required():
+    with pytest.raises(TypeError):
+        ClockSync(None)
+
+
+def test_link_error_is_not_a_restart(device, mpulib):
+    sync = _sync(device)
+    _ticks(mpulib, [5000, 0, 6000])
+    sync.sample()
+    with pytest.raises(CTS3Exception):
+        sync.sample()
+    sync.sample()
+    assert [s.device_time for s in sync.samples] == [5.0005, 6.0005]
+
+
+def test_null_readings_are_skipped_in_burst(device, mpulib):
+    sync = _sync(device, burst=3)
+    _ticks(mpulib, [0, 7000, 0])
+    assert sync.sample().device_time == 7.0005
+
+
+def test_slow_reading_is_rejected(device, mpulib):
+    sync = ClockSync(device, burst=1, max_rtt=0.01)
+    times = [1.0, 1.5]
+    sync.clock = lambda: times.pop(0)
+    _ticks(mpulib, [5000])
+    with pytest.raises(CTS3Exception):
+        sync.sample()
+
+
+def test_single_backwards_reading_is_a_glitch(device, mpulib):
+    sync = _sync(device)
+    _ticks(mpulib, [5000, 1000, 6000])
+    sync.sample()
+    with pytest.raises(CTS3Exception):
+        sync.sample()
+    sync.sample()
+    assert len(sync.samples) == 2
+
+
+def test_consecutive_backwards_readings_are_a_restart(device, mpulib):
+    sync = _sync(device)
+    _ticks(mpulib, [5000, 1000, 2000])
+    sync.sample()
+    with pytest.raises(CTS3Exception):
+        sync.sample()
+    sync.sample()
+    assert [s.device_time for s in sync.samples] == [2.0005]
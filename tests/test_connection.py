@@ -0,0 +1,82 @@
+from threading import Event, get_ident
+from time import monotonic
+import pytest
+from ni_cts3 import LibraryParameter
+from ni_cts3.Connection import ConnectionManager
+from ni_cts3.MPException import CTS3Exception
+from ni_cts3.MPStatus import CTS3ErrorCode
+
+
+def test_hung_probe_does_not_delay_reconnection(device):
+    release = Event()
+    probe_threads = []
+
+    def probe():
+        probe_threads.append(get_ident())
+        release.wait(10)
+
+    manager = ConnectionManager(device, probe_timeout=0.1, probe=probe)
+    try:
+        assert not manager.check()
+        start = monotonic()
+        manager.reconnect()
+        assert monotonic() - start < 0.5
+        assert device.call(get_ident) != probe_threads[0]
+    finally:
+        release.set()
+
+
+def test_reconnect_restores_connect_timeout(device, mpulib):
+    connect_timeout = LibraryParameter.TCP_CONNECT_TIMEOUT.value
+
+    def get_parameter(param, value):
+        value._obj.value = 3000
+        return 0
+
+    mpulib.handlers['GetDLLParameter'] = get_parameter
+    manager = ConnectionManager(device, connect_timeout=0.2)
+    manager.reconnect()
+    values = [value.value for param, value in mpulib.called('SetDLLParameter')
+              if param.value == connect_timeout]
+    assert values == [200, 3000]
+
+
+def test_reconnect_failure_restores_connect_timeout(device, mpulib):
+    connect_timeout = LibraryParameter.TCP_CONNECT_TIMEOUT.value
+
+    def get_parameter(param, value):
+        value._obj.value = 3000
+        return 0
+
+    mpulib.handlers['GetDLLParameter'] = get_parameter
+    mpulib.handlers['OpenCommunication'] = (
+        lambda host: CTS3ErrorCode.DLLCOMERROR.value)
+    manager = ConnectionManager(device, connect_timeout=0.2)
+    manager._stop.set()
+    with pytest.raises(CTS3Exception):
+        manager.reconnect()
+    values = [value.value for param, value in mpulib.called('SetDLLParameter')
+              if param.value == connect_timeout]
+    assert values == [200, 3000]
+
+
+def test_supervision_survives_callback_error(device, mpulib):
+    probes = []
+
+    def probe():
+        probes.append(None)
+        if len(probes) == 1:
+            raise CTS3Exception(CTS3ErrorCode.DLLCOMERROR)
+
+    def on_disconnect(manager):
+        raise KeyError('callback')
+
+    manager = ConnectionManager(device, probe_interval=0.01, probe=probe)
+    manager.on_disconnect = on_disconnect
+    with pytest.warns(RuntimeWarning):
+        manager.start()
+        deadline = monotonic() + 5
+        while len(probes) < 3 and monotonic() < deadline:
+            manager._stop.wait(0.01)
+        manager.stop()
+    assert len(probes) >= 3
@@ -0,0 +1,80 @@
+from threading import Event, Thread, get_ident
+from time import monotonic
+import pytest
+from ni_cts3.Device import Device
+
+
+def test_calls_run_on_device_thread(device, mpulib):
+    thread = device.call(get_ident)
+    assert thread != get_ident()
+    # Nested calls run directly on the device thread
+    assert device.call(device.call, get_ident) == thread
+    mpulib.handlers['MPS_GetTickCount'] = lambda: 42
+    assert device.MPS_GetTickCount() == 42e-3
+
+
+def test_closed_device_rejects_calls(mpulib):
+    device = Device('cts3')
+    with pytest.raises(RuntimeError):
+        device.call(get_ident)
+    device.open()
+    assert device.is_open
+    device.close()
+    assert not device.is_open
+    assert len(mpulib.called('CloseCommunication')) == 1
+    with pytest.raises(RuntimeError):
+        device.call(get_ident)
+
+
+def test_failed_open_leaves_device_closed(mpulib):
+    mpulib.handlers['OpenCommunication'] = lambda host: -1
+    device = Device('cts3')
+    with pytest.raises(Exception):
+        device.open()
+    assert not device.is_open
+
+
+def test_close_does_not_wait_for_hung_call(device, mpulib):
+    release = Event()
+    started = Event()
+
+    def hung():
+        started.set()
+        release.wait(10)
+
+    sequence = Thread(target=device.call, args=(hung, ))
+    sequence.start()
+    assert started.wait(5)
+    try:
+        start = monotonic()
+        with pytest.warns(RuntimeWarning):
+            device.close(timeout=0.1)
+        assert monotonic() - start < 2
+        assert not device.is_open
+        assert mpulib.called('AbortCoupler')
+    finally:
+        release.set()
+        sequence.join()
+
+
+def test_call_sequences_are_not_interleaved(device):
+    order = []
+    inside = Event()
+    release = Event()
+
+    def sequence():
+        with device.lock:
+            device.call(order.append, 'first')
+            inside.set()
+            release.wait(5)
+            device.call(order.append, 'second')
+
+    thread = Thread(target=sequence)
+    thread.start()
+    assert inside.wait(5)
+    other = Thread(target=device.call, args=(order.append, 'other'))
+    other.start()
+    release.set()
+    thread.join()
+    other.join()
+    assert order == ['first', 'second', 'other']
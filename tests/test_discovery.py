@@ -0,0 +1,69 @@
+from ipaddress import IPv4Address
+from threading import Thread
+from time import time
+from ni_cts3.Discovery import DeviceDiscovery, DiscoveredDevice
+
+
+def _failing():
+    raise OSError('enumeration failed')
+
+
+def _run(func, *args):
+    """Runs a call in a thread and tells if it completed"""
+    thread = Thread(target=func, args=args, daemon=True)
+    thread.start()
+    thread.join(5)
+    return not thread.is_alive()
+
+
+def test_enumeration_error_completes_refresh():
+    discovery = DeviceDiscovery(tcp=True, usb=False)
+    discovery._enumerators['TCP'] = _failing
+    assert _run(discovery.refresh, True)
+    assert not discovery.refreshing
+    assert isinstance(discovery.last_error, OSError)
+
+
+def test_enumeration_error_completes_resolve():
+    discovery = DeviceDiscovery(tcp=True, usb=True)
+    discovery._enumerators['TCP'] = _failing
+    discovery._enumerators['USB'] = lambda: []
+    results = []
+    assert _run(lambda: results.append(discovery.resolve('0000')))
+    assert results == [None]
+    assert not discovery.refreshing
+
+
+def test_failed_enumeration_is_not_fresh():
+    discovery = DeviceDiscovery(tcp=True, usb=True)
+    discovery._enumerators['TCP'] = _failing
+    discovery._enumerators['USB'] = lambda: []
+    assert _run(discovery.refresh, True)
+    assert discovery.age > discovery.ttl
+    discovery._enumerators['TCP'] = lambda: []
+    assert _run(discovery.refresh, True)
+    assert discovery.age < discovery.ttl
+
+
+def _complete(discovery, link, found):
+    """Merges the result of one enumeration"""
+    with discovery._cond:
+        discovery._pending += 1
+    discovery._enumerate(link, lambda: found, discovery._generation)
+
+
+def test_network_address_is_preferred(tmp_path):
+    now = time()
+    tcp = DiscoveredDevice('1234', IPv4Address('192.168.0.10'), 'TCP', now)
+    usb = DiscoveredDevice('1234', None, 'USB', now)
+    path = tmp_path / 'discovery.json'
+    for first, second in ((tcp, usb), (usb, tcp)):
+        discovery = DeviceDiscovery(cache_path=path)
+        _complete(discovery, first.link, [first])
+        _complete(discovery, second.link, [second])
+        assert discovery.resolve('1234') == tcp
+    # Entries of both links are persisted
+    reloaded = DeviceDiscovery(cache_path=path)
+    assert reloaded.resolve('1234') == tcp
+    _complete(reloaded, 'TCP', [])
+    assert reloaded.resolve('1234') == usb
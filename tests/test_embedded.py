@@ -0,0 +1,121 @@
+import gc
+from threading import Event, Thread
+from time import sleep
+import pytest
+import ni_cts3
+from ni_cts3 import (LaunchEmbeddedScript, StartEmbeddedApplication,
+                     CloseCommunication, EmbeddedScriptMode)
+from ni_cts3.EmbeddedRunner import EmbeddedRun, run_embedded_script
+
+
+def _collector(outputs):
+    """Callback appending output chunks to a list"""
+    def call_back(data):
+        outputs.append(data)
+        return 0
+    return call_back
+
+
+@pytest.fixture
+def callbacks(mpulib):
+    """Library callbacks received by StartEmbeddedApplication"""
+    received = []
+
+    def start(path, args, func):
+        received.append(func)
+        return 0
+
+    mpulib.handlers['StartEmbeddedApplication'] = start
+    yield received
+    CloseCommunication()
+
+
+def test_second_application_keeps_first_callback(callbacks):
+    outputs = []
+    StartEmbeddedApplication('/app1', '', _collector(outputs))
+    StartEmbeddedApplication('/app2', '', _collector(outputs))
+    gc.collect()
+    assert len(ni_cts3._embedded_callbacks) == 2
+    # Library still calls the first application callback
+    callbacks[0](b'first')
+    callbacks[1](b'second')
+    assert outputs == [b'first', b'second']
+
+
+def test_application_callbacks_released_on_close(callbacks):
+    StartEmbeddedApplication('/app', '', lambda data: 0)
+    CloseCommunication()
+    assert not ni_cts3._embedded_callbacks
+
+
+def test_failed_application_releases_callback(mpulib):
+    mpulib.handlers['StartEmbeddedApplication'] = lambda *args: -1
+    with pytest.raises(ni_cts3.CTS3Exception):
+        StartEmbeddedApplication('/app', '', lambda data: 0)
+    assert not ni_cts3._embedded_callbacks
+
+
+def test_waited_script_releases_its_callback_only(callbacks, mpulib):
+    def launch(command, option, timeout, code, func):
+        func(b'output')
+        return 0
+
+    mpulib.handlers['LaunchEmbeddedScript'] = launch
+    StartEmbeddedApplication('/app', '', lambda data: 0)
+    outputs = []
+    LaunchEmbeddedScript('script', 1.0, call_back=_collector(outputs))
+    assert outputs == [b'output']
+    assert len(ni_cts3._embedded_callbacks) == 1
+
+
+def test_streamed_script_requires_device():
+    with pytest.raises(TypeError):
+        run_embedded_script('script', 1.0, None)
+
+
+def test_streamed_script_runs_on_device_thread(device, mpulib):
+    def launch(command, option, timeout, code, func):
+        func(b'line 1\n')
+        func(b'line 2\n')
+        code._obj.value = 3
+        return 0
+
+    mpulib.handlers['LaunchEmbeddedScript'] = launch
+    run = run_embedded_script('script', 1.0, device)
+    assert run.output() == b'line 1\nline 2\n'
+    assert run.wait(5) == 3
+    assert not ni_cts3._embedded_callbacks
+
+
+def test_streamed_script_waits_for_device_lock(device, mpulib):
+    order = []
+    locked = Event()
+
+    def sequence():
+        with device.lock:
+            locked.set()
+            device.call(order.append, 'first')
+            sleep(0.1)
+            device.call(order.append, 'second')
+
+    mpulib.handlers['LaunchEmbeddedScript'] = (
+        lambda command, option, timeout, code, func: order.append('script')
+        or 0)
+    thread = Thread(target=sequence)
+    thread.start()
+    locked.wait()
+    run = run_embedded_script('script', 1.0, device)
+    run.wait(5)
+    thread.join()
+    assert order == ['first', 'second', 'script']
+
+
+def test_output_queue_drops_oldest_chunks():
+    run = EmbeddedRun('cts3', 'script', capacity=2)
+    for chunk in (b'1', b'2', b'3'):
+        run._callback(chunk)
+    run._finish(0, None)
+    assert run.output() == b'23'
+    assert run.dropped == 1
+    with pytest.raises(ValueError):
+        EmbeddedRun('cts3', 'script', capacity=0)
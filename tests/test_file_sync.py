@@ -0,0 +1,82 @@
+from threading import Event, Thread
+from time import sleep
+import pytest
+from ni_cts3.Device import Device
+from ni_cts3.FileSync import sync_files
+from ni_cts3.MPStatus import CTS3ErrorCode
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for name in ('a.txt', 'b.txt'):
+        path = tmp_path / name
+        path.write_text(name)
+        paths.append(path)
+    return paths
+
+
+def test_unchanged_files_are_skipped(device, mpulib, files, tmp_path):
+    mpulib.handlers['MPS_GetTickCount'] = lambda: 1000
+    manifests = tmp_path / 'manifests'
+    result = sync_files([device], files, manifests)['cts3']
+    assert sorted(result.uploaded) == ['a.txt', 'b.txt']
+    assert result.error is None
+    result = sync_files([device], files, manifests)['cts3']
+    assert result.uploaded == []
+    assert sorted(result.skipped) == ['a.txt', 'b.txt']
+
+
+def test_same_name_is_rejected(device, mpulib, files, tmp_path):
+    other = tmp_path / 'other'
+    other.mkdir()
+    (other / 'a.txt').write_text('other')
+    with pytest.raises(ValueError):
+        sync_files([device], files + [other / 'a.txt'], tmp_path)
+    assert not mpulib.called('UploadClientFile')
+
+
+def test_errors_stay_per_device(device, mpulib, files, tmp_path):
+    failing = Device('cts4')
+    failing.open()
+    mpulib.handlers['UploadClientFile'] = (
+        lambda path, name: CTS3ErrorCode.RET_FAIL.value
+        if name == b'a.txt' else 0)
+    manifests = tmp_path / 'manifests'
+    # Manifest of second device can not be written
+    manifests.mkdir()
+    (manifests / 'cts4.json.tmp').mkdir()
+    closed = Device('cts5')
+    try:
+        results = sync_files([device, failing, closed],
+                             {'a.txt': files[0], 'é.txt': files[1]},
+                             manifests)
+    finally:
+        failing.close()
+    result = results['cts3']
+    assert set(result.errors) == {'a.txt', 'é.txt'}
+    assert isinstance(result.errors['é.txt'], UnicodeEncodeError)
+    assert result.error is None
+    assert isinstance(results['cts4'].error, OSError)
+    assert isinstance(results['cts5'].error, RuntimeError)
+
+
+def test_sync_waits_for_device_lock(device, mpulib, files, tmp_path):
+    order = []
+    locked = Event()
+    mpulib.handlers['UploadClientFile'] = (
+        lambda path, name: order.append('upload') or 0)
+
+    def sequence():
+        with device.lock:
+            locked.set()
+            device.call(order.append, 'first')
+            sleep(0.1)
+            device.call(order.append, 'second')
+
+    thread = Thread(target=sequence)
+    thread.start()
+    locked.wait()
+    sync_files([device], files[:1], tmp_path)
+    thread.join()
+    assert order == ['first', 'second', 'upload']
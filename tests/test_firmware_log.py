@@ -0,0 +1,192 @@
+import os
+import sys
+from threading import Event, Thread
+from time import monotonic, sleep
+import pytest
+from ni_cts3 import FirmwareLog
+from ni_cts3.FirmwareLog import _FirmwareLogCollector, _HostLog
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32',
+                                reason='collector thread polls pipes')
+
+
+class _Process:
+    """Log subprocess reading from a local pipe"""
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def poll(self):
+        return 0
+
+    def terminate(self):
+        pass
+
+    def wait(self):
+        return 0
+
+
+class _Sink:
+
+    def __init__(self, error=None):
+        self.error = error
+        self.records = []
+        self.written = Event()
+
+    def write(self, record):
+        self.written.set()
+        if self.error is not None:
+            raise self.error
+        self.records.append(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.error = ValueError('I/O operation on closed file')
+
+
+def _attach(collector, host, stdout):
+    log = _HostLog(host, _Process(stdout), 10)
+    with collector._lock:
+        collector._logs[host] = log
+        collector._history[host] = log.records
+        collector._changes.append(log)
+        collector._ensure_thread()
+    return log
+
+
+def _line(message):
+    return b'{"MESSAGE": "%s"}\n' % message.encode()
+
+
+def test_failing_sink_keeps_collector_running():
+    collector = _FirmwareLogCollector()
+    collector.to_stderr = False
+    read_fd, write_fd = os.pipe()
+    log = _attach(collector, 'cts3', os.fdopen(read_fd, 'rb'))
+    os.write(write_fd, _line('first'))
+    assert log.started.wait(5) and log.running
+    failing = _Sink(ValueError('closed'))
+    collector.set_sink(failing)
+    with pytest.warns(RuntimeWarning):
+        os.write(write_fd, _line('lost'))
+        assert failing.written.wait(5)
+        sink = _Sink()
+        collector.set_sink(sink)
+        os.write(write_fd, _line('kept'))
+        for _ in range(500):
+            if sink.records:
+                break
+            collector._thread.join(0.01)
+    assert [r.message for r in sink.records] == ['kept']
+    os.close(write_fd)
+    thread = collector._thread
+    collector.stop('cts3')
+    thread.join(5)
+    assert collector._wakeup is None
+
+
+def test_closed_sink_is_not_written():
+    collector = _FirmwareLogCollector()
+    sink = _Sink()
+    collector.set_sink(sink)
+    collector.set_sink(None)
+    assert collector.sink is None
+    assert sink.error is not None
+
+
+def test_collector_failure_releases_waiters():
+    collector = _FirmwareLogCollector()
+    read_fd, write_fd = os.pipe()
+    stdout = os.fdopen(read_fd, 'rb')
+    stdout.close()
+    with pytest.warns(RuntimeWarning):
+        log = _attach(collector, 'cts3', stdout)
+        # Registering a closed pipe fails in the collector thread
+        assert log.started.wait(5)
+        thread = collector._thread
+        if thread is not None:
+            thread.join(5)
+    os.close(write_fd)
+    assert not log.running
+    assert collector._wakeup is None
+    assert not collector.is_running('cts3')
+
+
+class _Popen:
+    """Popen replacement whose log is written by the test"""
+
+    def __init__(self):
+        self.commands = []
+        self.write_fds = []
+
+    def __call__(self, command, **kwargs):
+        self.commands.append(command)
+        read_fd, write_fd = os.pipe()
+        self.write_fds.append(write_fd)
+        return _Process(os.fdopen(read_fd, 'rb'))
+
+    def close(self):
+        for fd in self.write_fds:
+            os.close(fd)
+
+
+def test_concurrent_starts_share_redirection(monkeypatch):
+    popen = _Popen()
+    monkeypatch.setattr(FirmwareLog, 'Popen', popen)
+    collector = _FirmwareLogCollector()
+    collector.to_stderr = False
+    results = []
+    threads = [Thread(target=lambda: results.append(
+        collector.start('cts3', timeout=5))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(500):
+        if popen.write_fds:
+            break
+        sleep(0.01)
+    os.write(popen.write_fds[0], _line('first'))
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 4
+    assert len(popen.commands) == 1
+    collector.stop('cts3')
+    popen.close()
+
+
+def test_start_times_out(monkeypatch):
+    popen = _Popen()
+    monkeypatch.setattr(FirmwareLog, 'Popen', popen)
+    collector = _FirmwareLogCollector()
+    start = monotonic()
+    assert not collector.start('cts3', timeout=0.1)
+    assert monotonic() - start < 2
+    assert not collector.is_running('cts3')
+    popen.close()
+
+
+def test_embedded_log_is_local(monkeypatch):
+    popen = _Popen()
+    monkeypatch.setattr(FirmwareLog, 'Popen', popen)
+    monkeypatch.setattr(FirmwareLog, '_embedded', True)
+    collector = _FirmwareLogCollector()
+    collector.to_stderr = False
+    thread = Thread(target=collector.start, args=('192.168.0.10', 5))
+    thread.start()
+    for _ in range(500):
+        if popen.write_fds:
+            break
+        sleep(0.01)
+    os.write(popen.write_fds[0], _line('first') + _line('second'))
+    thread.join()
+    assert popen.commands == [FirmwareLog._LOG_CMD]
+    assert collector.is_running('192.168.0.10')
+    for _ in range(500):
+        if collector.records('192.168.0.10'):
+            break
+        sleep(0.01)
+    record, = collector.records(None)
+    assert record.host == 'localhost'
+    collector.stop('192.168.0.10')
+    popen.close()
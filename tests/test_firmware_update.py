@@ -0,0 +1,91 @@
+from ctypes import memmove
+import pytest
+import ni_cts3.FirmwareUpdate
+from ni_cts3.FirmwareUpdate import FirmwareUpdater
+from ni_cts3.MPStatus import CTS3ErrorCode
+
+
+@pytest.fixture
+def firmware(mpulib, monkeypatch):
+    """Fake device firmware state"""
+    monkeypatch.setattr(ni_cts3.FirmwareUpdate, 'sleep', lambda delay: None)
+    state = {'active': 1, 'rebooted': False, 'boot_fails': False,
+             'update_errors': []}
+
+    def list_versions(partition, active, system, app, fpga, daq):
+        active._obj.value = state['active']
+        for buffer in (system, app, fpga, daq):
+            memmove(buffer, b'1.0\x00', 4)
+        return 0
+
+    def update(path, partition, func):
+        if state['update_errors']:
+            error = state['update_errors'].pop(0)
+            if isinstance(error, Exception):
+                raise error
+            return error
+        return 0
+
+    def select(partition):
+        state['active'] = partition.value
+        return 0
+
+    def reboot():
+        state['rebooted'] = True
+        return 0
+
+    def open_communication(host):
+        if state['rebooted'] and state['boot_fails']:
+            return CTS3ErrorCode.RET_FAIL.value
+        return 0
+
+    mpulib.handlers.update({
+        'MPS_ListVersions': list_versions,
+        'UpdateFirmware': update,
+        'MPS_SelectActivePartition': select,
+        'Reboot': reboot,
+        'OpenCommunication': open_communication,
+    })
+    yield state
+
+
+def _updated_partitions(mpulib):
+    return [args[1].value for args in mpulib.called('UpdateFirmware')]
+
+
+def test_update_inactive_partition(device, mpulib, firmware):
+    result, = FirmwareUpdater('fw.zip', [device]).run()
+    assert result.success
+    assert result.partition == 2
+    assert result.attempts == 1
+    assert firmware['active'] == 2
+
+
+def test_retry_keeps_target_partition(device, mpulib, firmware):
+    firmware['update_errors'] = [CTS3ErrorCode.RET_FAIL.value]
+    result, = FirmwareUpdater('fw.zip', [device], max_retries=2).run()
+    assert result.success
+    assert result.attempts == 2
+    assert _updated_partitions(mpulib) == [2, 2]
+    # Active partition is read to choose the target and after reboot only
+    reads = [args[0].value for args in mpulib.called('MPS_ListVersions')]
+    assert reads.count(0) == 2
+
+
+def test_failure_after_reboot_is_not_retried(device, mpulib, firmware):
+    firmware['boot_fails'] = True
+    result, = FirmwareUpdater('fw.zip', [device], max_retries=2,
+                              boot_timeout=0.0).run()
+    assert not result.success
+    assert result.attempts == 1
+    assert result.partition == 2
+    # Previously active partition is not overwritten
+    assert _updated_partitions(mpulib) == [2]
+    assert len(mpulib.called('Reboot')) == 1
+
+
+def test_unexpected_error_is_reported_per_device(device, mpulib, firmware):
+    firmware['update_errors'] = [ValueError('unexpected')]
+    result, = FirmwareUpdater('fw.zip', [device], max_retries=0).run()
+    assert not result.success
+    assert isinstance(result.error, ValueError)
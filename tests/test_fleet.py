@@ -0,0 +1,78 @@
+import pickle
+from multiprocessing import Pipe
+from threading import Thread
+from ni_cts3.Fleet import FleetRunner, _Worker, _READY, _FAILED, _DONE
+
+
+class _Process:
+    exitcode = 1
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return False
+
+    def terminate(self):
+        pass
+
+
+def _serve(conn, ready):
+    """Fake worker executing tasks in a thread"""
+    if not ready:
+        conn.send((_FAILED, -1, RuntimeError('no link'), 0.0))
+        conn.close()
+        return
+    conn.send((_READY, -1, None, 0.0))
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        task_id, func, args, kwargs = task
+        payload = pickle.dumps((func(*args, **kwargs), None))
+        conn.send((_DONE, task_id, payload, 0.0))
+    conn.close()
+
+
+def _runner(hosts, **kwargs):
+    """Runner whose workers are threads (host 'down' fails to connect)"""
+    runner = FleetRunner(hosts, **kwargs)
+    for host in hosts:
+        conn, child = Pipe()
+        runner._workers[conn] = _Worker(host, _Process(), conn)
+        Thread(target=_serve, args=(child, host != 'down'),
+               daemon=True).start()
+    return runner
+
+
+def test_tasks_are_only_sent_to_ready_workers():
+    runner = _runner(['down', 'up'], max_retries=1)
+    task_ids = [runner.submit(abs, -value) for value in range(4)]
+    # No worker has reported to be ready yet
+    assert not any(w.tasks for w in runner._workers.values())
+    results = list(runner.results(timeout=5))
+    runner.close()
+    assert sorted(r.task_id for r in results) == task_ids
+    assert all(r.host == 'up' and r.error is None for r in results)
+    assert runner._retries == {}
+    assert 'down' in runner.errors
+
+
+def test_failed_worker_before_ready_consumes_no_retry():
+    runner = FleetRunner(['down'], max_retries=0)
+    conn, _ = Pipe()
+    worker = _Worker('down', _Process(), conn)
+    runner._workers[conn] = worker
+    worker.tasks.append((0, abs, (-1, ), {}))
+    runner._lost(worker)
+    assert not runner._abandoned
+    assert [task[0] for task in runner._queue] == [0]
+
+
+def test_map_keeps_other_results():
+    runner = _runner(['up'])
+    first = runner.submit(abs, -1)
+    assert [r.value for r in runner.map(abs, [-2, -3])] == [2, 3]
+    assert [(r.task_id, r.value) for r in runner.results(timeout=5)] == [
+        (first, 1)]
+    runner.close()
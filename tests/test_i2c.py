@@ -0,0 +1,31 @@
+from ctypes import memmove
+import pytest
+from ni_cts3.I2c import i2c_batch
+
+
+@pytest.mark.parametrize('transaction, error', [
+    ((0x80, b'', 1), OverflowError),
+    ((0xFF, b'', 1), OverflowError),
+    ((-1, b'', 1), OverflowError),
+    (('0x50', b'', 1), TypeError),
+    ((0x50, bytes(256), 0), OverflowError),
+    ((0x50, b'', 256), OverflowError),
+    ((0x50, b'', 1.0), TypeError),
+])
+def test_invalid_transaction_rejected(mpulib, transaction, error):
+    with pytest.raises(error):
+        i2c_batch([transaction])
+    assert not mpulib.called('MPS_I2cAuxWrite')
+    assert not mpulib.called('MPS_I2cAuxRead')
+
+
+def test_batch_on_device(device, mpulib):
+    def read(address, size, buffer):
+        memmove(buffer, bytes([address.value]), 1)
+        size._obj.value = 1
+        return 0
+
+    mpulib.handlers['MPS_I2cAuxRead'] = read
+    result = i2c_batch([(0x7F, b'\x00', 1), (0x50, b'', 1)], device=device)
+    assert list(result) == [b'\x7f', b'\x50']
+    assert result.errors == 0
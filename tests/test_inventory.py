@@ -0,0 +1,103 @@
+from ctypes import memmove
+from threading import Event, Thread, get_ident
+from time import sleep
+import pytest
+from ni_cts3.Device import Device
+from ni_cts3.Inventory import (Inventory, PartitionInfo, clear_inventory_cache,
+                               get_inventories)
+from ni_cts3.MPException import CTS3Exception
+from ni_cts3.MPStatus import CTS3ErrorCode
+
+
+def _inventory():
+    partitions = tuple(
+        PartitionInfo(index, f'{index}.0', '1.0', '1.0', '1.0', True)
+        for index in (1, 2))
+    return Inventory('cts3', 'CTS3', '', 'A', 0, 2, partitions, None,
+                     frozenset(), 0.0)
+
+
+def test_partition_lookup():
+    inventory = _inventory()
+    assert inventory.partition().os_version == '2.0'
+    assert inventory.partition(1).partition == 1
+    with pytest.raises(KeyError):
+        inventory.partition(3)
+
+
+def test_partition_info_is_a_tuple():
+    info = _inventory().partition(1)
+    # Tuple methods are not shadowed by fields
+    assert info.index(info.os_version) == 1
+
+
+def _install(mpulib, failing_thread):
+    def get_hard_rev(revision, variant):
+        if get_ident() == failing_thread:
+            return CTS3ErrorCode.RET_FAIL.value
+        revision._obj.value = b'C'
+        return 0
+
+    def get_version(message):
+        memmove(message, b'CTS3\x00', 5)
+        return 0
+
+    def get_version2(message):
+        memmove(message, b'<info/>\x00', 8)
+        return 0
+
+    def list_versions(partition, active, system, app, fpga, daq):
+        active._obj.value = 1
+        for buffer in (system, app, fpga, daq):
+            memmove(buffer, b'1.0\x00', 4)
+        return 0
+
+    mpulib.handlers.update({
+        'MPS_GetHardRev': get_hard_rev,
+        'MPS_GetVersion': get_version,
+        'MPS_GetVersion2': get_version2,
+        'MPS_ListVersions': list_versions,
+    })
+
+
+def test_get_inventories(device, mpulib):
+    clear_inventory_cache()
+    failing = Device('cts4')
+    failing.open()
+    try:
+        _install(mpulib, failing.call(get_ident))
+        inventories = get_inventories([device, failing], refresh=True)
+    finally:
+        failing.close()
+        clear_inventory_cache()
+    inventory = inventories['cts3']
+    assert isinstance(inventory, Inventory)
+    assert inventory.host == 'cts3'
+    assert inventory.hardware_revision == 'C'
+    assert inventory.partition().application_version == '1.0'
+    assert isinstance(inventories['cts4'], CTS3Exception)
+
+
+def test_get_inventories_waits_for_device_lock(device, mpulib):
+    order = []
+    locked = Event()
+    _install(mpulib, None)
+
+    def sequence():
+        with device.lock:
+            locked.set()
+            device.call(order.append, 'first')
+            sleep(0.1)
+            device.call(order.append, 'second')
+
+    mpulib.handlers['MPS_GetVersion'] = (
+        lambda message: order.append('inventory') or 0)
+    thread = Thread(target=sequence)
+    thread.start()
+    locked.wait()
+    try:
+        get_inventories([device], refresh=True)
+    finally:
+        clear_inventory_cache()
+    thread.join()
+    assert order == ['first', 'second', 'inventory']
@@ -0,0 +1,80 @@
+import json
+import os
+from pathlib import Path
+from time import time
+import pytest
+from ni_cts3 import ResourceType
+from ni_cts3.Lease import Lease, LeaseManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return LeaseManager(tmp_path, poll_interval=0.01, stale_timeout=1.0)
+
+
+def test_renew_postpones_expiry_for_peers(manager, tmp_path):
+    lease = manager.acquire('cts3', duration=0.5)
+    lease.renew(60.0)
+    content = json.loads(lease._ticket.read_text())
+    # Ticket content is not rewritten, its modification time is
+    assert content['expires'] < time() + 1.0
+    assert lease._ticket.stat().st_mtime > time() + 59.0
+    assert not LeaseManager(tmp_path)._stale(lease._ticket)
+    lease.release()
+
+
+def test_renew_does_not_recreate_removed_ticket(manager, monkeypatch):
+    lease = manager.acquire('cts3', duration=60.0)
+    # Peer discards the ticket right after the holder checked it
+    monkeypatch.setattr(Lease, 'expired', property(lambda self: False))
+    lease._ticket.unlink()
+    with pytest.raises(RuntimeError):
+        lease.renew(60.0)
+    monkeypatch.undo()
+    assert not lease._ticket.exists()
+    assert lease.expired
+    assert manager.queue_length('cts3') == 0
+
+
+def test_grant_does_not_recreate_removed_ticket(manager, monkeypatch):
+    head = manager._head
+    removed = []
+
+    def discarding_head(directory):
+        path = head(directory)
+        if not removed:
+            # Ticket discarded between queue check and grant
+            path.unlink()
+            removed.append(path)
+        return path
+
+    monkeypatch.setattr(manager, '_head', discarding_head)
+    lease = manager.acquire('cts3', duration=60.0, timeout=5.0)
+    assert not removed[0].exists()
+    assert lease._ticket.exists()
+    assert lease._ticket != removed[0]
+    lease.release()
+
+
+def test_inaccessible_ticket_is_not_stale(manager, monkeypatch):
+    lease = manager.acquire('cts3', duration=60.0)
+
+    def stat(self, *args, **kwargs):
+        raise PermissionError(13, 'Permission denied')
+
+    monkeypatch.setattr(Path, 'stat', stat)
+    assert not manager._stale(lease._ticket)
+    monkeypatch.undo()
+    lease.release()
+
+
+def test_concurrent_tickets_share_queue_number(manager):
+    directory = manager._directory('cts3', ResourceType.CTS3_NFC_RESOURCE_ID)
+    tickets = manager._tickets
+    manager._tickets = lambda directory: []
+    first = manager._create_ticket(directory, time())
+    second = manager._create_ticket(directory, time())
+    manager._tickets = tickets
+    assert first != second
+    assert [path for _, path in manager._tickets(directory)] == sorted(
+        [first, second])
@@ -0,0 +1,59 @@
+from ctypes import c_int8, c_int16, c_int32, c_uint8, c_uint16, c_uint32
+import pytest
+import ni_cts3
+from ni_cts3 import _check_limits, _check_limits_list
+from ni_cts3.Nfc import FelicaBlock, FelicaService, MPC_FelicaCheck
+
+_IDM = bytes(8)
+
+
+@pytest.mark.parametrize('c_type, low, high', [
+    (c_uint8, 0, 0xFF),
+    (c_uint16, 0, 0xFFFF),
+    (c_uint32, 0, 0xFFFFFFFF),
+    (c_int16, -0x8000, 0x7FFF),
+    (c_int32, -0x80000000, 0x7FFFFFFF),
+])
+def test_integer_ranges(c_type, low, high):
+    _check_limits(c_type, low, 'value')
+    _check_limits(c_type, high, 'value')
+    _check_limits_list(c_type, [low, high], 'values')
+    for value in (low - 1, high + 1):
+        with pytest.raises(OverflowError, match='value is out of range'):
+            _check_limits(c_type, value, 'value')
+        with pytest.raises(OverflowError, match='values is out of range'):
+            _check_limits_list(c_type, [0, value], 'values')
+
+
+def test_other_type_range_added_on_first_use(monkeypatch):
+    monkeypatch.delitem(ni_cts3._limits, c_int8, raising=False)
+    _check_limits(c_int8, -128, 'value')
+    assert ni_cts3._limits[c_int8] == (-128, 127)
+    with pytest.raises(OverflowError):
+        _check_limits_list(c_int8, [128], 'values')
+
+
+def test_empty_list_is_in_range():
+    _check_limits_list(c_uint8, [], 'values')
+
+
+def test_felica_values_are_checked(mpulib):
+    service = FelicaService(0x3FF, 0x3F)
+    block = FelicaBlock(0x07, 0x0F, 0xFFFF)
+    MPC_FelicaCheck(_IDM, [service, 0xFFFF], [block, 0xFFFFFFFF])
+    args, = mpulib.called('MPC_FelicaCheck')
+    assert list(args[3]) == [service._get_int(), 0xFFFF]
+    assert list(args[5]) == [block._get_int(), 0xFFFFFFFF]
+    with pytest.raises(OverflowError, match='service_codes'):
+        MPC_FelicaCheck(_IDM, [0x10000], [0])
+    with pytest.raises(OverflowError, match='blocks'):
+        MPC_FelicaCheck(_IDM, [0], [-1])
+
+
+def test_negative_felica_fields_are_not_truncated(mpulib):
+    # Values used to be silently wrapped to the C type
+    with pytest.raises(OverflowError, match='service_codes'):
+        MPC_FelicaCheck(_IDM, [FelicaService(0, -1)], [0])
+    with pytest.raises(OverflowError, match='blocks'):
+        MPC_FelicaCheck(_IDM, [0], [FelicaBlock(0, 0, -0x100, False)])
+    assert not mpulib.called('MPC_FelicaCheck')
@@ -0,0 +1,112 @@
+import json
+import pytest
+import ni_cts3
+from ni_cts3 import Profiling
+from ni_cts3.Profiling import (CallStatistics, disable_profiling,
+                               enable_profiling, export_json,
+                               export_prometheus, get_profiling_snapshot,
+                               is_profiling_enabled)
+
+
+class _Library:
+    """Library whose functions are cached like CDLL ones"""
+
+    class _FuncPtr:
+        def __init__(self, status):
+            self.status = status
+            self.restype = None
+
+        def __call__(self, *args):
+            return self.status
+
+    def __init__(self):
+        self.GetStatus = self._FuncPtr(0)
+        self.GetError = self._FuncPtr(-1)
+
+
+@pytest.fixture
+def library(monkeypatch):
+    """Library hooked by profiling"""
+    library = _Library()
+    monkeypatch.setattr(ni_cts3, '_MPuLib', library)
+    monkeypatch.setattr(ni_cts3, '_MPuLib_variadic', None)
+    monkeypatch.setattr(ni_cts3._connection, 'host', 'cts3', raising=False)
+    yield library
+    disable_profiling()
+    Profiling.reset_profiling()
+
+
+def test_calls_are_recorded_while_enabled(library):
+    original = library.GetStatus
+    enable_profiling(reset=True)
+    assert is_profiling_enabled()
+    assert library.GetStatus is not original
+    # Library function configuration is forwarded
+    library.GetStatus.restype = int
+    assert original.restype is int
+    for _ in range(3):
+        assert library.GetStatus() == 0
+    assert library.GetError() == -1
+    disable_profiling()
+    assert not is_profiling_enabled()
+    assert library.GetStatus is original
+    library.GetStatus()
+    snapshot = {stats.function: stats for stats in get_profiling_snapshot()}
+    assert snapshot['GetStatus'].count == 3
+    assert snapshot['GetStatus'].device == 'cts3'
+    assert snapshot['GetError'].count == 1
+
+
+def test_enabling_twice_does_not_wrap_twice(library):
+    enable_profiling(reset=True)
+    enable_profiling()
+    library.GetStatus()
+    stats, = get_profiling_snapshot()
+    assert stats.count == 1
+
+
+@pytest.mark.parametrize('value', [0, 1, 15, 16, 17, 31, 32, 1000, 123456789])
+def test_histogram_buckets(value):
+    index = Profiling._bucket_index(value)
+    assert Profiling._bucket_upper_bound(index) >= value
+    if index:
+        assert Profiling._bucket_upper_bound(index - 1) < value
+
+
+def _snapshot():
+    return [CallStatistics('SendFrame', 'cts"3', 4, 0.01, 0.001, 0.006,
+                           [(0.001, 2), (0.003, 1), (0.007, 1)])]
+
+
+def test_percentiles():
+    stats, = _snapshot()
+    assert stats.mean_time == 0.0025
+    assert stats.percentile(50.0) == 0.001
+    assert stats.percentile(75.0) == 0.003
+    # Bucket bound is capped to the longest call
+    assert stats.percentile(100.0) == 0.006
+    with pytest.raises(ValueError):
+        stats.percentile(101.0)
+
+
+def test_export_json():
+    exported, = json.loads(export_json(_snapshot()))
+    assert exported['function'] == 'SendFrame'
+    assert exported['count'] == 4
+    assert exported['p50'] == 0.001
+    assert exported['histogram'] == [[0.001, 2], [0.003, 1], [0.007, 1]]
+
+
+def test_export_prometheus():
+    lines = export_prometheus(_snapshot(), 'latency').splitlines()
+    labels = 'function="SendFrame",device="cts\\"3"'
+    assert lines[:2] == ['# HELP latency MPuLib function call duration',
+                         '# TYPE latency histogram']
+    assert lines[2:] == [
+        f'latency_bucket{{{labels},le="0.001"}} 2',
+        f'latency_bucket{{{labels},le="0.003"}} 3',
+        f'latency_bucket{{{labels},le="0.007"}} 4',
+        f'latency_bucket{{{labels},le="+Inf"}} 4',
+        f'latency_sum{{{labels}}} 0.01',
+        f'latency_count{{{labels}}} 4',
+    ]
@@ -0,0 +1,73 @@
+from ctypes import memmove
+import pytest
+from ni_cts3 import OpenCommunication, Reboot, UpdateFirmware, RemoteHelp
+from ni_cts3.RemoteHelp import (clear_remote_help_cache, get_remote_help,
+                                get_remote_help_index)
+
+
+@pytest.fixture
+def firmware(mpulib, monkeypatch):
+    """Device firmware version and remote help"""
+    monkeypatch.setattr(RemoteHelp, '_indexes', {})
+    monkeypatch.setattr(RemoteHelp, '_host_versions', {})
+    state = {'version': b'1.0', 'help': b'ABCD=first;ABCE=second;XYZW'}
+
+    def list_versions(partition, active, system, app, fpga, daq):
+        active._obj.value = 1
+        for buffer in (system, app, fpga, daq):
+            memmove(buffer, state['version'] + b'\x00',
+                    len(state['version']) + 1)
+        return 0
+
+    def remote_help(remote, message):
+        memmove(message, state['help'] + b'\x00', len(state['help']) + 1)
+        return 0
+
+    mpulib.handlers['MPS_ListVersions'] = list_versions
+    mpulib.handlers['GetRemoteHelp'] = remote_help
+    yield state
+
+
+def test_help_is_read_once(device, mpulib, firmware, tmp_path):
+    index = device.call(get_remote_help_index, tmp_path)
+    assert index.version == '1.0/1.0/1.0/1.0'
+    assert list(index) == ['ABCD', 'ABCE', 'XYZW']
+    assert device.call(get_remote_help_index, tmp_path) is index
+    assert device.call(get_remote_help, 'ABC', tmp_path) == {
+        'ABCD': 'first', 'ABCE': 'second'}
+    assert index.describe('XYZW') == ''
+    assert len(mpulib.called('GetRemoteHelp')) == 1
+    # Firmware version is only read the first time
+    assert len(mpulib.called('MPS_ListVersions')) == 2
+
+
+def test_help_is_loaded_from_disk(device, mpulib, firmware, monkeypatch,
+                                  tmp_path):
+    device.call(get_remote_help_index, tmp_path)
+    # New process
+    monkeypatch.setattr(RemoteHelp, '_indexes', {})
+    monkeypatch.setattr(RemoteHelp, '_host_versions', {})
+    firmware['help'] = b'OTHR'
+    index = device.call(get_remote_help_index, tmp_path)
+    assert 'ABCD' in index
+    assert len(mpulib.called('GetRemoteHelp')) == 1
+    clear_remote_help_cache(tmp_path)
+    assert not list(tmp_path.glob('remote_help_*.json'))
+    assert list(device.call(get_remote_help_index, tmp_path)) == ['OTHR']
+
+
+@pytest.mark.parametrize('update', [
+    Reboot,
+    lambda: UpdateFirmware('firmware.zip', 2),
+])
+def test_firmware_change_invalidates_cache(device, mpulib, firmware,
+                                           tmp_path, update):
+    first = device.call(get_remote_help_index, tmp_path)
+    firmware['version'] = b'2.0'
+    firmware['help'] = b'NEWC=new'
+    device.call(update)
+    device.call(OpenCommunication, 'cts3', False)
+    index = device.call(get_remote_help_index, tmp_path)
+    assert index is not first
+    assert index.version == '2.0/2.0/2.0/2.0'
+    assert index.to_dict() == {'NEWC': 'new'}
@@ -0,0 +1,90 @@
+from array import array
+from ctypes import memmove
+import pytest
+from ni_cts3 import Nfc, _rx_buffer
+from ni_cts3.CardEmu import MPC_WaitAndGetFrame
+from ni_cts3.CardHlSim import MPC_GetRawFrame
+from ni_cts3.MPStatus import CTS3ErrorCode
+from ni_cts3.Nfc import TechnologyType
+
+_TYPE = next(iter(TechnologyType))
+
+
+@pytest.mark.parametrize('buffer, error', [
+    (bytes(16), TypeError),
+    (memoryview(bytes(16)), TypeError),
+    (bytearray(8), ValueError),
+])
+def test_invalid_buffer(buffer, error):
+    with pytest.raises(error, match='rx_buffer'):
+        _rx_buffer(buffer, 16, 'rx_buffer')
+
+
+def test_buffer_shares_memory():
+    buffer = array('H', [0] * 8)
+    view, data = _rx_buffer(memoryview(buffer), 16, 'rx_buffer')
+    assert view.nbytes == len(data) == 16
+    memmove(data, b'\x01\x00\x02\x00', 4)
+    assert buffer[:2] == array('H', [1, 2])
+
+
+def test_exchange_cmd_fills_buffer(mpulib):
+    def exchange(device, frame, bits, data, rx_bits):
+        memmove(data, b'\x44\x00', 2)
+        rx_bits._obj.value = 12
+        return 0
+
+    mpulib.handlers['MPC_ExchangeCmd'] = exchange
+    buffer = bytearray(5000)
+    result = Nfc.MPC_ExchangeCmd(b'\x26', rx_buffer=buffer)
+    assert isinstance(result['rx_frame'], memoryview)
+    assert result == {'rx_frame': b'\x44\x00', 'rx_bits_number': 12}
+    assert buffer[:2] == b'\x44\x00'
+    assert Nfc.MPC_ExchangeCmd(b'\x26') == result
+    with pytest.raises(ValueError):
+        Nfc.MPC_ExchangeCmd(b'\x26', rx_buffer=bytearray(4999))
+
+
+def test_send_frame_protocol_fills_buffer(mpulib):
+    def send(device, frame, length, data, rx_length):
+        memmove(data, b'\x90\x00', 2)
+        rx_length._obj.value = 2
+        return 0
+
+    mpulib.handlers['MPC_SendFrameProtocol'] = send
+    buffer = bytearray(0xFFFF)
+    frame = Nfc.MPC_SendFrameProtocol(b'\x00\xa4', rx_buffer=buffer)
+    assert isinstance(frame, memoryview)
+    assert frame == b'\x90\x00'
+    assert Nfc.MPC_SendFrameProtocol(b'\x00\xa4') == b'\x90\x00'
+
+
+def test_wait_and_get_frame_uses_buffer_size(mpulib):
+    def wait(device, timeout, card_type, data, max_size, length):
+        memmove(data, b'\x52', 1)
+        card_type._obj.value = _TYPE.value
+        length._obj.value = 1
+        return 0
+
+    mpulib.handlers['MPC_WaitAndGetFrame'] = wait
+    result = MPC_WaitAndGetFrame(1.0, rx_buffer=bytearray(64))
+    assert result == {'rx_frame': b'\x52', 'rx_type': _TYPE}
+    args, = mpulib.called('MPC_WaitAndGetFrame')
+    assert args[4].value == 64
+
+
+def test_get_raw_frame_fills_buffer(mpulib):
+    def get_frame(device, rx_type, data, rx_size):
+        memmove(data, b'\x93\x20', 2)
+        rx_type._obj.value = _TYPE.value
+        rx_size._obj.value = 2
+        return 0
+
+    mpulib.handlers['MPC_GetRawFrame'] = get_frame
+    buffer = bytearray(65538)
+    result = MPC_GetRawFrame(rx_buffer=buffer)
+    assert isinstance(result['rx_frame'], memoryview)
+    assert result == {'rx_frame': b'\x93\x20', 'rx_type': _TYPE}
+    mpulib.handlers['MPC_GetRawFrame'] = (
+        lambda *args: CTS3ErrorCode.ERRSIM_NO_FRAME_AVAILABLE.value)
+    assert MPC_GetRawFrame(rx_buffer=buffer) is None
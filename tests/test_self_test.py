@@ -0,0 +1,103 @@
+from pathlib import Path
+from threading import Event, Thread
+from time import sleep
+from typing import Any, List
+import pytest
+from ni_cts3 import SelfTest
+from ni_cts3.Device import Device
+from ni_cts3.SelfTest import (SelfTestHistory, SelfTestVerdict,
+                              parse_self_test, run_self_tests)
+from conftest import FakeLibrary
+
+
+@pytest.mark.parametrize('field, verdict', [
+    ('OK', SelfTestVerdict.PASS),
+    ('Not OK', SelfTestVerdict.FAIL),
+    ('not passed', SelfTestVerdict.FAIL),
+    ('unsuccessful', SelfTestVerdict.FAIL),
+    ('No error', SelfTestVerdict.PASS),
+    ('Failed', SelfTestVerdict.FAIL),
+])
+def test_negated_verdict(field: str, verdict: SelfTestVerdict) -> None:
+    record, = parse_self_test('cts3', 'cpu', [['FPGA', field]], 0.0)
+    assert record.test == 'FPGA'
+    assert record.verdict == verdict
+
+
+@pytest.mark.parametrize('row, test, verdict, value', [
+    (['Memory error check', 'PASS'], 'Memory error check',
+     SelfTestVerdict.PASS, None),
+    (['Warning LED', 'OK', '3.3 V'], 'Warning LED', SelfTestVerdict.PASS,
+     3.3),
+    (['12', 'FAIL', '4.1', '3.0', '3.6'], '12', SelfTestVerdict.FAIL, 4.1),
+])
+def test_test_identifier_is_not_verdict(row: List[str], test: str,
+                                        verdict: SelfTestVerdict,
+                                        value: Any) -> None:
+    record, = parse_self_test('cts3', 'cpu', [row], 0.0)
+    assert record.test == test
+    assert record.verdict == verdict
+    assert record.value == value
+
+
+def _broken(test_id: Any) -> List[List[str]]:
+    raise ValueError('unexpected result line')
+
+
+def test_suite_error_reported(monkeypatch: pytest.MonkeyPatch,
+                              device: Device) -> None:
+    monkeypatch.setitem(SelfTest._SUITES, 'cpu', (_broken, 0))
+    monkeypatch.setitem(SelfTest._SUITES, 'daq',
+                        (lambda test_id: [['ADC', 'PASS']], 0))
+    campaign = run_self_tests([device], ('cpu', 'daq'))
+    error, adc = campaign.records
+    assert error.suite == 'cpu'
+    assert error.verdict == SelfTestVerdict.ERROR
+    assert 'unexpected result line' in error.raw
+    assert adc.verdict == SelfTestVerdict.PASS
+    assert campaign.failed == [error]
+    assert isinstance(campaign.errors['cts3'], ValueError)
+
+
+def test_open_error_reported(mpulib: FakeLibrary) -> None:
+    def refuse(*args: Any) -> int:
+        raise OSError('connection refused')
+
+    mpulib.handlers['OpenCommunication'] = refuse
+    campaign = run_self_tests(['cts3'], ('cpu',))
+    record, = campaign.records
+    assert record.verdict == SelfTestVerdict.ERROR
+    assert isinstance(campaign.errors['cts3'], OSError)
+
+
+def test_history_keeps_error_records(monkeypatch: pytest.MonkeyPatch,
+                                     device: Device, tmp_path: Path) -> None:
+    monkeypatch.setitem(SelfTest._SUITES, 'cpu', (_broken, 0))
+    history = SelfTestHistory(tmp_path)
+    campaign = run_self_tests([device], ('cpu',), history)
+    assert history.query() == campaign.records
+
+
+def test_waits_for_device_lock(monkeypatch: pytest.MonkeyPatch,
+                               device: Device) -> None:
+    order = []
+    locked = Event()
+
+    def sequence() -> None:
+        with device.lock:
+            locked.set()
+            device.call(order.append, 'first')
+            sleep(0.1)
+            device.call(order.append, 'second')
+
+    def suite(test_id: Any) -> List[List[str]]:
+        order.append('self-test')
+        return []
+
+    monkeypatch.setitem(SelfTest._SUITES, 'cpu', (suite, 0))
+    thread = Thread(target=sequence)
+    thread.start()
+    locked.wait()
+    run_self_tests([device], ('cpu',))
+    thread.join()
+    assert order == ['first', 'second', 'self-test']
@@ -0,0 +1,75 @@
+import warnings
+from collections import deque
+from ctypes import memmove
+from ni_cts3 import SendFrames
+from ni_cts3.MPStatus import CTS3ErrorCode
+
+
+def _install(mpulib, answers):
+    """Answers queued commands with (status, text) in order"""
+    sent = []
+    queued = deque()
+
+    def send_frame(mode, asynchronous, timeout, command, response):
+        if mode is not None:
+            sent.append(command)
+            queued.append(command)
+            return 0
+        queued.popleft()
+        status, text = answers.pop(0)
+        if text is not None:
+            memmove(response, text + b'\x00', len(text) + 1)
+        return status
+
+    mpulib.handlers['SendFrame'] = send_frame
+    return sent
+
+
+def test_empty_answer_is_not_previous_answer(mpulib):
+    _install(mpulib, [(0, b'first answer'), (0, None)])
+    results = SendFrames(['A', 'B'])
+    assert [r['response'] for r in results] == ['first answer', '']
+
+
+def test_commands_terminated_like_send_frame(mpulib):
+    sent = _install(mpulib, [(0, b'1'), (0, b'2')])
+    SendFrames(['A', 'B\r'])
+    assert sent == [b'A\r', b'B\r']
+
+
+def test_answer_error_keeps_other_answers(mpulib):
+    status = CTS3ErrorCode.RET_FAIL.value
+    _install(mpulib, [(0, b'1'), (status, None), (0, b'3')])
+    results = SendFrames(['A', 'B', 'C'])
+    assert results[0]['response'] == '1'
+    assert results[1]['error'] is not None
+    assert results[2]['response'] == '3'
+
+
+def test_lost_answer_fails_remaining_commands(mpulib):
+    timeout = CTS3ErrorCode.DLLCOMERROR.value
+    sent = _install(mpulib, [(0, b'1'), (timeout, None), (0, b'3')])
+    results = SendFrames(['A', 'B', 'C', 'D', 'E'], window=2)
+    assert results[0] == {'response': '1', 'error': None}
+    error = results[1]['error']
+    assert error is not None
+    for result in results[2:]:
+        assert result['response'] is None
+        assert result['error'] is error
+    # Commands after the lost answer are not sent
+    assert sent == [b'A\r', b'B\r', b'C\r']
+
+
+def test_warning_error_stops_batch(mpulib):
+    no_atr = CTS3ErrorCode.ERR_NO_VALID_ATR_REQ_RECEIVED.value
+    sent = _install(mpulib, [(0, b'1'), (no_atr, None), (0, b'3')])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        results = SendFrames(['A', 'B', 'C', 'D'], window=2)
+    assert results[0] == {'response': '1', 'error': None}
+    error = results[1]['error']
+    assert isinstance(error, Warning)
+    for result in results[2:]:
+        assert result['response'] is None
+        assert result['error'] is error
+    assert sent == [b'A\r', b'B\r', b'C\r']
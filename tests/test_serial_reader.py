@@ -0,0 +1,38 @@
+from ctypes import memmove
+from threading import get_ident
+import pytest
+from ni_cts3.Device import Device
+from ni_cts3.SerialReader import SerialReader
+
+
+def test_device_is_required():
+    with pytest.raises(TypeError):
+        SerialReader(None)
+
+
+def test_closed_device_is_rejected(mpulib):
+    with pytest.raises(RuntimeError):
+        SerialReader(Device('cts3')).start()
+
+
+def test_port_is_read_from_device_thread(device, mpulib):
+    threads = set()
+    pending = [b'hello\n']
+
+    def port_status(port, count):
+        threads.add(get_ident())
+        count._obj.value = len(pending[0]) if pending else 0
+        return 0
+
+    def port_receive(port, buffer, count):
+        threads.add(get_ident())
+        data = pending.pop(0)
+        memmove(buffer, data, len(data))
+        return 0
+
+    mpulib.handlers['MPS_PortStatus'] = port_status
+    mpulib.handlers['MPS_PortReceive'] = port_receive
+    with SerialReader(device) as reader:
+        line = reader.readline(timeout=5)
+    assert line is not None and line[1] == b'hello\n'
+    assert threads == {device.call(get_ident)}
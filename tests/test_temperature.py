@@ -0,0 +1,73 @@
+from threading import Event, Thread, get_ident
+import pytest
+from ni_cts3 import TemperatureSensor
+from ni_cts3.Device import Device
+from ni_cts3.Temperature import TemperatureMonitor
+
+
+def test_device_is_required():
+    with pytest.raises(TypeError):
+        TemperatureMonitor(None)
+
+
+def test_closed_device_is_rejected(mpulib):
+    with pytest.raises(RuntimeError):
+        TemperatureMonitor(Device('cts3')).start()
+
+
+def test_sensors_are_read_from_device_thread(device, mpulib):
+    threads = set()
+    sampled = Event()
+
+    def probe_temperature(sensor):
+        threads.add(get_ident())
+        sampled.set()
+        return 40.0
+
+    mpulib.handlers['MPS_ProbeTemperature'] = probe_temperature
+    sensor = next(iter(TemperatureSensor))
+    with TemperatureMonitor(device, [sensor], interval=0.01) as monitor:
+        assert sampled.wait(5)
+    monitor.sample()
+    latest = monitor.latest(sensor)
+    assert latest is not None and latest.temperature == 40.0
+    assert threads == {device.call(get_ident)}
+
+
+def test_closed_device_stops_sampling(device, mpulib):
+    mpulib.handlers['MPS_ProbeTemperature'] = lambda sensor: 80.0
+    sensor = next(iter(TemperatureSensor))
+    monitor = TemperatureMonitor(device, [sensor], interval=0.01,
+                                 thresholds={sensor: 50.0})
+    monitor.sample()
+    monitor.start()
+    device.close()
+    results = []
+    waiter = Thread(target=lambda: results.append(monitor.wait_cooldown()),
+                    daemon=True)
+    waiter.start()
+    waiter.join(5)
+    assert results == [False]
+    assert not monitor.running
+    assert isinstance(monitor.error, RuntimeError)
+    monitor.stop()
+
+
+def test_callback_error_keeps_sampling(device, mpulib):
+    temperatures = iter([80.0] + [20.0] * 1000)
+    cooled = Event()
+    mpulib.handlers['MPS_ProbeTemperature'] = (
+        lambda sensor: next(temperatures))
+    sensor = next(iter(TemperatureSensor))
+    monitor = TemperatureMonitor(device, [sensor], interval=0.01,
+                                 thresholds={sensor: 50.0})
+
+    def overheat(sensor, temperature):
+        raise ValueError('callback failed')
+
+    monitor.on_overheat = overheat
+    monitor.on_cooldown = lambda sensor, temperature: cooled.set()
+    with monitor:
+        assert cooled.wait(5)
+        assert monitor.running
+    assert monitor.wait_cooldown(0)
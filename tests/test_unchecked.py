@@ -0,0 +1,31 @@
+from ctypes import memmove
+import pytest
+from ni_cts3 import Nfc, Unchecked
+
+
+def _arguments(args):
+    """Gets comparable MPC_ExchangeCmd arguments"""
+    frame, bits = args[1], args[2]
+    return frame, bits.value
+
+
+@pytest.mark.parametrize('tx_frame, tx_bits_number', [
+    (b'', None),
+    (b'', 7),
+    (None, 12),
+    (b'\x26', None),
+    (b'\x26', 7),
+    (b'\x93\x20', None),
+])
+def test_exchange_cmd_matches_validated(mpulib, tx_frame, tx_bits_number):
+    def exchange(device, frame, bits, data, rx_bits):
+        memmove(data, b'\x44\x00', 2)
+        rx_bits._obj.value = 16
+        return 0
+
+    mpulib.handlers['MPC_ExchangeCmd'] = exchange
+    validated = Nfc.MPC_ExchangeCmd(tx_frame, tx_bits_number)
+    unchecked = Unchecked.MPC_ExchangeCmd(tx_frame, tx_bits_number)
+    assert unchecked == validated
+    first, second = mpulib.called('MPC_ExchangeCmd')
+    assert _arguments(second) == _arguments(first)
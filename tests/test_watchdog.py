@@ -0,0 +1,77 @@
+from threading import Event, Thread
+from time import monotonic, sleep
+import pytest
+from ni_cts3.MPException import CTS3Exception, CTS3TimeoutException
+from ni_cts3.MPStatus import CTS3ErrorCode
+from ni_cts3.Watchdog import Watchdog, get_watchdog_events
+
+
+def test_rearmed_watchdog_ignores_previous_deadline(mpulib):
+    watchdog = Watchdog(0.5, 'cts3')
+    with watchdog:
+        # Monitor thread waits for this deadline
+        sleep(0.05)
+    sleep(0.25)
+    # Deadline of the first arming expires while the block runs
+    with watchdog:
+        sleep(0.35)
+    assert not watchdog.fired
+    assert not mpulib.called('AbortCoupler')
+
+
+def test_rearmed_watchdog_fires_on_its_deadline(mpulib):
+    watchdog = Watchdog(0.1, 'cts3')
+    with watchdog:
+        pass
+    with pytest.raises(CTS3TimeoutException):
+        with watchdog:
+            sleep(0.3)
+    assert watchdog.fired
+    assert len(mpulib.called('AbortCoupler')) == 1
+
+
+def test_hung_abort_does_not_delay_other_hosts(mpulib):
+    released = Event()
+
+    def abort(mode, host):
+        if host == b'slow':
+            released.wait(5)
+        return 0
+
+    mpulib.handlers['AbortCoupler'] = abort
+
+    def slow_block():
+        try:
+            with Watchdog(0.05, 'slow'):
+                sleep(0.1)
+        except CTS3TimeoutException:
+            pass
+
+    slow = Thread(target=slow_block)
+    slow.start()
+    try:
+        sleep(0.1)  # Abort of 'slow' is pending
+        start = monotonic()
+        with pytest.raises(CTS3TimeoutException):
+            with Watchdog(0.05, 'fast') as watchdog:
+                while not watchdog.fired and monotonic() - start < 2:
+                    sleep(0.01)
+        assert monotonic() - start < 1
+    finally:
+        released.set()
+        slow.join()
+
+
+def test_other_error_is_not_replaced(mpulib):
+    with pytest.raises(KeyboardInterrupt):
+        with Watchdog(0.05, 'cts3'):
+            sleep(0.15)
+            raise KeyboardInterrupt
+    assert get_watchdog_events()[-1].host == 'cts3'
+
+
+def test_abort_error_is_replaced(mpulib):
+    with pytest.raises(CTS3TimeoutException):
+        with Watchdog(0.05, 'cts3'):
+            sleep(0.15)
+            raise CTS3Exception(CTS3ErrorCode.DLLCOMERROR)